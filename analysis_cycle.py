@@ -0,0 +1,419 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+import config
+from api_client import iter_odds
+from analyzer import fingerprint
+from bet_record import Bet
+from bet_selector import TopKSelector
+from league_snapshot import LeagueSnapshot
+from metrics import metrics, write_summary
+from pipeline import Pipeline, Stage
+
+def shard_leagues(leagues, index, count):
+    """
+    Leagues analyzed by worker `index` out of `count`.
+
+    Leagues are dealt round-robin in league id order, so every worker derives
+    the same disjoint split from the same config.
+    """
+    ordered = sorted(leagues.items(), key=lambda item: item[1])
+    return dict(item for i, item in enumerate(ordered) if i % count == index)
+
+class AnalysisCycle:
+    """
+    One analysis cycle, run as a staged pipeline:
+
+    fixture fetch -> enrichment -> feature build -> market analysis -> ranking -> persistence
+
+    Each stage has its own worker count (config.PIPELINE_WORKERS) and bounded
+    input queue, so slow API calls in one league don't stall analysis of
+    fixtures already fetched.
+    """
+
+    def __init__(self, api, analyzer, tracker, kelly, memo, leagues=None, ratings=None, snapshots=None):
+        """
+        Args:
+            memo: bet_key -> (inputs, bet or None) from the previous cycle,
+                updated in place with this cycle's results
+            leagues: {name: id} to analyze, this worker's shard (default: config.LEAGUES)
+            ratings: TeamRatings used instead of the teams/statistics call when available
+            snapshots: SnapshotStore the league snapshots are published to
+        """
+        self.api = api
+        self.analyzer = analyzer
+        self.tracker = tracker
+        self.kelly = kelly
+        self.memo = memo
+        self.leagues = leagues if leagues is not None else config.LEAGUES
+        self.ratings = ratings
+        self.snapshots = snapshots
+        self.logger = logging.getLogger(__name__)
+
+        self.kickoffs = []
+        # Each worker only sees its shard: split TOP_BETS between them so the
+        # cycle keeps about TOP_BETS in total (the best bets of a single shard
+        # beyond its share are dropped, there is no cross-worker ranking)
+        self.selector = TopKSelector(k=math.ceil(config.TOP_BETS / config.WORKER_COUNT))
+        self._new_memo = {}
+        self._reused = 0
+        self._lock = threading.Lock()
+
+    def build_pipeline(self):
+        workers = config.PIPELINE_WORKERS
+        size = config.PIPELINE_QUEUE_SIZE
+        return Pipeline([
+            Stage("fetch", self.fetch_league, workers["fetch"], size),
+            Stage("enrich", self.enrich_fixture, workers["enrich"], size),
+            Stage("features", self.build_features, workers["features"], size,
+                  batch_size=config.PIPELINE_FEATURE_BATCH),
+            Stage("analysis", self.analyze_fixture, workers["analysis"], size),
+            Stage("ranking", self.rank_bet, 1, size, on_close=self.emit_top_bets),
+            Stage("persistence", self.persist_bet, 1, size),
+        ])
+
+    def run(self):
+        """Run the whole cycle; returns the kickoff times seen."""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        before = metrics.snapshot()
+
+        pipeline = self.build_pipeline()
+        pipeline.run(self.leagues.items())
+
+        # Only keep memo entries for candidates still on the board
+        self.memo.clear()
+        self.memo.update(self._new_memo)
+        analyzed = len(self._new_memo) - self._reused
+        metrics.inc("analysis_candidates_total", analyzed, result="analyzed")
+        metrics.inc("analysis_candidates_total", self._reused, result="reused")
+        self.logger.info("Analyzed %s candidates (%s unchanged, reused)", analyzed, self._reused)
+        if not self.selector.seen:
+            self.logger.info("No value bets found this cycle.")
+        else:
+            self.logger.info(
+                "Selected %d of %s value bets (%s below minimum EV)",
+                len(self.selector.results()), self.selector.seen, self.selector.rejected_ev,
+            )
+
+        duration = time.perf_counter() - start
+        metrics.observe("cycle_seconds", duration, cycle="analysis")
+        self._write_summary(started_at, duration, pipeline, before)
+        return self.kickoffs
+
+    def _write_summary(self, started_at, duration, pipeline, before):
+        """Append this cycle's structured summary record (stage times, API/DB usage deltas)."""
+        after = metrics.snapshot()
+        record = {
+            "cycle": "analysis",
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "duration_s": round(duration, 3),
+            "fixtures": len(self.kickoffs),
+            "candidates": len(self._new_memo),
+            "reused": self._reused,
+            "bets": self.selector.seen,
+            "selected": len(self.selector.results()),
+            "stages": {
+                s.name: {"items": s.processed, "busy_s": round(s.busy_seconds, 3)} for s in pipeline.stages
+            },
+            "counters": {
+                k: round(v - before.get(k, 0), 3) for k, v in after.items()
+                if v != before.get(k, 0) and k.startswith(("api_", "db_", "telegram_"))
+            },
+        }
+        try:
+            write_summary(config.CYCLE_SUMMARY_FILE, record)
+        except OSError as e:
+            self.logger.error("Could not write cycle summary: %s", e)
+
+    # --- Stage 1: fixture fetch (per league) ---
+    def fetch_league(self, league, emit):
+        league_name, league_id = league
+        self.logger.info("Checking %s...", league_name)
+
+        # 0. Get Top Scorers & Standings, indexed once for the whole cycle
+        snapshot = LeagueSnapshot.build(
+            league_id, league_name, self.api.get_standings(league_id), self.api.get_top_scorers(league_id), self.ratings,
+        )
+        if self.snapshots:
+            self.snapshots.publish(snapshot)
+
+        # 1. Get Fixtures with Odds
+        fixtures = self.api.get_fixtures_with_odds(league_id)
+
+        if not fixtures:
+            self.logger.warning("No fixtures found for %s", league_name)
+            return
+
+        league_ctx = {
+            "league_name": league_name,
+            "league_id": league_id,
+            "snapshot": snapshot,
+        }
+
+        for fixture_obj in fixtures:
+            try:
+                fixture = fixture_obj["fixture"]
+
+                # Date Filter (Next 3 days)
+                match_date = datetime.fromisoformat(fixture["date"].replace("Z", "+00:00"))
+                if match_date > datetime.now(match_date.tzinfo) + timedelta(days=3):
+                    continue
+                with self._lock:
+                    self.kickoffs.append(match_date.timestamp())
+
+                # Check Odds availability
+                if not fixture_obj.get("bookmakers"):
+                    continue
+
+                emit(dict(league_ctx, fixture_obj=fixture_obj, fixture=fixture))
+            except Exception as e:
+                self.logger.error("Error processing fixture: %s", e)
+
+    # --- Stage 2: enrichment (team stats, I/O bound) ---
+    def enrich_fixture(self, c, emit):
+        fixture_obj = c["fixture_obj"]
+        odds = fixture_obj["bookmakers"][0]["bets"][0]["values"]
+        home_odd = next((float(o["odd"]) for o in odds if o["value"] == "Home"), 0)
+        away_odd = next((float(o["odd"]) for o in odds if o["value"] == "Away"), 0)
+
+        if home_odd == 0 or away_odd == 0:
+            return
+
+        # Get Team Stats
+        home_team = fixture_obj["teams"]["home"]
+        away_team = fixture_obj["teams"]["away"]
+
+        home_stats = self._team_stats(home_team["id"], c)
+        away_stats = self._team_stats(away_team["id"], c)
+
+        if not home_stats or not away_stats:
+            return
+
+        c.update(
+            home_team=home_team, away_team=away_team,
+            home_stats=home_stats, away_stats=away_stats,
+            home_odd=home_odd, away_odd=away_odd,
+        )
+        emit(c)
+
+    def _team_stats(self, team_id, c):
+        # Local ratings (the snapshot is built from them), the API only for teams without enough stored results
+        stats = c["snapshot"].stats(team_id)
+        if stats is None:
+            stats = self.api.get_team_stats(team_id, c["league_id"])
+        return stats
+
+    # --- Stage 3: feature build (batched for one DB round-trip per batch) ---
+    def build_features(self, batch, emit):
+        odds_by_match = {}
+        odds_ticks = []
+        for c in batch:
+            fixture, fixture_obj = c["fixture"], c["fixture_obj"]
+            home_team, away_team = c["home_team"], c["away_team"]
+
+            # Helper to get odds by ID
+            def get_bet_values(bet_id, bets=fixture_obj["bookmakers"][0]["bets"]):
+                for b in bets:
+                    if b["id"] == bet_id:
+                        return b["values"]
+                return []
+
+            ou_values = get_bet_values(5)
+            btts_values = get_bet_values(8)
+            scorer_values = get_bet_values(4) if c["snapshot"].top_scorers else []
+
+            # Create a unique match ID (e.g., "2024-05-20_PSG_Lyon")
+            match_id = f"{fixture['date'][:10]}_{home_team['name']}_{away_team['name']}".replace(" ", "")
+
+            # Every price we analyze, for the bulk dropping-odds check
+            market_odds = {(1, "Home"): c["home_odd"], (1, "Away"): c["away_odd"]}
+            market_odds[(5, "Over 1.5")] = next((float(o["odd"]) for o in ou_values if o["value"] == "Over 1.5"), 0)
+            market_odds[(8, "Yes")] = next((float(o["odd"]) for o in btts_values if o["value"] == "Yes"), 0)
+            for odd_obj in scorer_values:
+                market_odds[(4, odd_obj["value"])] = float(odd_obj["odd"])
+            odds_by_match[match_id] = market_odds
+
+            # Snapshot every price for line-movement tracking
+            odds_ticks.extend((fixture["id"], *tick) for tick in iter_odds(fixture_obj))
+
+            c.update(
+                match_id=match_id,
+                market_odds=market_odds,
+                scorer_values=scorer_values,
+                home_rank=c["snapshot"].rank(home_team["id"]),
+                away_rank=c["snapshot"].rank(away_team["id"]),
+            )
+
+        # --- LEVEL 3: DROPPING ODDS CHECK (one round-trip per batch) ---
+        try:
+            drop_alerts = self.tracker.check_dropping_odds_bulk(odds_by_match)
+        except Exception as e:
+            self.logger.error("Error checking dropping odds: %s", e)
+            drop_alerts = {}
+
+        try:
+            self.tracker.record_odds_ticks(odds_ticks)
+        except Exception as e:
+            self.logger.error("Error recording odds ticks: %s", e)
+
+        for c in batch:
+            c["drops"] = drop_alerts.get(c["match_id"], {})
+            emit(c)
+
+    # --- Stage 4: market analysis (CPU bound) ---
+    def analyze_fixture(self, c, emit):
+        analyzer, kelly = self.analyzer, self.kelly
+        fixture = c["fixture"]
+        home_team, away_team = c["home_team"], c["away_team"]
+        home_stats, away_stats = c["home_stats"], c["away_stats"]
+        home_rank, away_rank = c["home_rank"], c["away_rank"]
+        league_name, match_id = c["league_name"], c["match_id"]
+        market_odds = c["market_odds"]
+        home_odd, away_odd = c["home_odd"], c["away_odd"]
+
+        # If significant drop, we boost confidence and add it to reasons
+        drops = c["drops"]
+        home_drop = drops.get((1, "Home"))
+        away_drop = drops.get((1, "Away"))
+
+        # --- NEW: STANDINGS CHECK ---
+        rank_reason = analyzer.analyze_standings(home_rank, away_rank)
+        # ----------------------------
+
+        # Inputs shared by every market of this fixture; the kickoff is part of the
+        # cached bet, so a rescheduled match must not reuse it
+        fixture_inputs = (fixture["date"], home_stats, away_stats, home_rank, away_rank)
+
+        def with_drop(reason, key):
+            """Prefix a market reason with its dropping-odds alert, if any."""
+            return f"{drops[key]} | {reason}" if key in drops else reason
+
+        # Shared by every candidate of this fixture
+        match_name = f"{home_team['name']} vs {away_team['name']}"
+        kickoff_date, kickoff_time = fixture["date"][:10], fixture["date"][11:16]
+
+        def make_bet(pari, cote, raison, confiance):
+            bet = Bet(match_name, kickoff_date, kickoff_time, league_name, pari, cote, confiance, raison,
+                      fixture_id=fixture["id"], match_id=match_id)
+            return kelly.apply(bet)
+
+        def evaluate(market_id, selection, compute, *inputs):
+            """Run compute() unless this candidate's inputs are unchanged since last cycle."""
+            bet_key = f"{fixture['id']}:{market_id}:{selection}"
+            # Compared as is (no hashing on the hot path), hashed only for the stored fingerprint
+            key = (fixture_inputs, market_odds.get((market_id, selection)), drops.get((market_id, selection)), inputs)
+            cached = self.memo.get(bet_key)
+            reused = bool(cached and cached[0] == key)
+            if reused:
+                bet = cached[1]
+                if bet:
+                    # The bankroll may have moved since: restake, and let the upsert see the change
+                    stake = bet.stake
+                    kelly.apply(bet)
+                    if bet.stake != stake:
+                        bet.fingerprint = fingerprint(key, bet.stake)
+            else:
+                bet = compute()
+                if bet:
+                    bet.bet_key = bet_key
+                    bet.fingerprint = fingerprint(key, bet.stake)
+            with self._lock:
+                self._new_memo[bet_key] = (key, bet)
+                self._reused += reused
+            if bet:
+                emit(bet)
+
+        # 1. MATCH WINNER (ID 1)
+        # Analyze Home Bet
+        def analyze_home():
+            reason_home = analyzer.analyze_bet(home_stats, away_stats, home_odd, "home", home_team["name"], away_team["name"])
+            if reason_home or home_drop or (rank_reason and "Avantage" in rank_reason and home_rank < away_rank):
+                full_reason = reason_home if reason_home else ""
+                if home_drop:
+                    full_reason = f"{home_drop} | {full_reason}" if full_reason else home_drop
+                if rank_reason and home_rank < away_rank:
+                     full_reason = f"{rank_reason} | {full_reason}" if full_reason else rank_reason
+
+                if full_reason:
+                    confidence = analyzer.calculate_confidence(home_stats, home_odd, "home")
+                    if home_drop: confidence = min(100, confidence + 15)
+                    if rank_reason and home_rank < away_rank: confidence = min(100, confidence + 10) # Boost for rank
+                    return make_bet(f"Victoire {home_team['name']}", home_odd, full_reason, confidence)
+            return None
+        evaluate(1, "Home", analyze_home)
+
+        # Analyze Away Bet
+        def analyze_away():
+            reason_away = analyzer.analyze_bet(home_stats, away_stats, away_odd, "away", away_team["name"], home_team["name"])
+            if reason_away or away_drop or (rank_reason and "Avantage" in rank_reason and away_rank < home_rank):
+                full_reason = reason_away if reason_away else ""
+                if away_drop:
+                    full_reason = f"{away_drop} | {full_reason}" if full_reason else away_drop
+                if rank_reason and away_rank < home_rank:
+                     full_reason = f"{rank_reason} | {full_reason}" if full_reason else rank_reason
+
+                if full_reason:
+                    confidence = analyzer.calculate_confidence(away_stats, away_odd, "away")
+                    if away_drop: confidence = min(100, confidence + 15)
+                    if rank_reason and away_rank < home_rank: confidence = min(100, confidence + 10) # Boost for rank
+                    return make_bet(f"Victoire {away_team['name']}", away_odd, full_reason, confidence)
+            return None
+        evaluate(1, "Away", analyze_away)
+
+        # 2. OVER/UNDER 1.5 GOALS (ID 5)
+        over_15_odd = market_odds[(5, "Over 1.5")]
+        if over_15_odd > 0:
+            def analyze_over15():
+                reason_ou = analyzer.analyze_over15(home_stats, away_stats, over_15_odd)
+                if reason_ou:
+                    confidence = 80 # High base confidence for Over 1.5 strategy
+                    if (5, "Over 1.5") in drops: confidence = min(100, confidence + 15)
+                    return make_bet("Plus de 1.5 Buts", over_15_odd, with_drop(reason_ou, (5, "Over 1.5")), confidence)
+                return None
+            evaluate(5, "Over 1.5", analyze_over15)
+
+        # 3. BOTH TEAMS TO SCORE (ID 8)
+        btts_yes_odd = market_odds[(8, "Yes")]
+        if btts_yes_odd > 0:
+            def analyze_btts():
+                reason_btts = analyzer.analyze_btts(home_stats, away_stats, btts_yes_odd)
+                if reason_btts:
+                    confidence = 75
+                    if (8, "Yes") in drops: confidence = min(100, confidence + 15)
+                    return make_bet("Les 2 équipes marquent", btts_yes_odd, with_drop(reason_btts, (8, "Yes")), confidence)
+                return None
+            evaluate(8, "Yes", analyze_btts)
+
+        # 4. GOALSCORERS (ID 4)
+        # Check only players with odds > 2.0 (filtered in analyzer)
+        for odd_obj in c["scorer_values"]:
+            player_name = odd_obj["value"]
+            player_odd = float(odd_obj["odd"])
+
+            def analyze_scorer(player_name=player_name, player_odd=player_odd):
+                scorer = c["snapshot"].scorer(player_name)
+                reason_scorer = analyzer.analyze_goalscorer(player_name, player_odd, [scorer] if scorer else [])
+                if reason_scorer:
+                    confidence = 70 # Base confidence for goalscorers
+                    if (4, player_name) in drops: confidence = min(100, confidence + 15)
+                    return make_bet(f"Buteur: {player_name}", player_odd, with_drop(reason_scorer, (4, player_name)), confidence)
+                return None
+            evaluate(4, player_name, analyze_scorer, c["snapshot"].scorers_fp)
+
+    # --- Stage 5: ranking (bounded, only the current top k are kept) ---
+    def rank_bet(self, bet, emit):
+        self.selector.push(bet)
+
+    def emit_top_bets(self, emit):
+        for bet in self.selector.results():
+            emit(bet)
+
+    # --- Stage 6: persistence ---
+    def persist_bet(self, bet, emit):
+        # Upsert on (fixture, market, selection): unchanged bets are left as they are
+        if self.tracker.add_pending_bet(bet, bet.fixture_id, bet.match_id, bet.bet_key, bet.fingerprint):
+            self.logger.info("Saved pending bet %s", bet.bet_key)
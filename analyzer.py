@@ -1,5 +1,12 @@
 import config
 import math
+import json
+import hashlib
+
+def fingerprint(*parts):
+    """Stable hash of analysis inputs (dicts, lists, numbers, strings)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
 class BetAnalyzer:
     def poisson_probability(self, lmbda, k):
@@ -35,6 +42,19 @@ class BetAnalyzer:
         fair_away = 1 / prob_away_win if prob_away_win > 0 else 999
         
         return fair_home, fair_draw, fair_away
+
+    def expected_goals(self, home_stats, away_stats):
+        """
+        Poisson lambdas (home, away) from venue goal averages, either API
+        season stats or TeamRatings.stats(): each side's attack averaged with
+        the opponent's defense.
+        """
+        h_gf = float(home_stats["goals"]["for"]["average"]["home"])
+        h_ga = float(home_stats["goals"]["against"]["average"]["home"])
+        a_gf = float(away_stats["goals"]["for"]["average"]["away"])
+        a_ga = float(away_stats["goals"]["against"]["average"]["away"])
+        return (h_gf + a_ga) / 2, (a_gf + h_ga) / 2
+
     def analyze_bet(self, home_stats, away_stats, odd, location, team_name, opponent_name):
         """
         Analyze if a bet is valuable based on improved criteria.
@@ -190,13 +210,8 @@ class BetAnalyzer:
             return None
             
         try:
-            # Get averages
-            h_gf = float(home_stats["goals"]["for"]["average"]["home"])
-            a_gf = float(away_stats["goals"]["for"]["average"]["away"])
-            h_ga = float(home_stats["goals"]["against"]["average"]["home"])
-            a_ga = float(away_stats["goals"]["against"]["average"]["away"])
-            
-            avg_total_goals = (h_gf + a_gf + h_ga + a_ga) / 2
+            # Expected goals of both sides
+            avg_total_goals = sum(self.expected_goals(home_stats, away_stats))
             
             reasons = []
             if avg_total_goals > 2.5: # High scoring potential
@@ -245,12 +260,16 @@ class BetAnalyzer:
                 
         return None
 
-    def validate_lineup(self, bet_data, lineup_home, lineup_away):
+    def validate_lineup(self, bet_data, lineup_home, lineup_away, top_scorers=()):
         """
         Validate a bet against confirmed lineups.
+
+        Args:
+            top_scorers: League top scorers (from the league snapshot), used to
+                flag a Win bet whose team leaves its top scorer out
         Returns (is_valid, reason)
         """
-        bet_type = bet_data['pari']
+        bet_type = bet_data.bet_type
         
         # Helper to check player presence
         def is_in_lineup(name, lineup):
@@ -276,6 +295,15 @@ class BetAnalyzer:
             else:
                 return False, "❌ Joueur non titulaire (Remplaçant ou Absent)"
                 
-        # 2. For other bets (Win, Over/Under), we assume valid if lineups are out
-        # We could add logic here to check if Top Scorer is missing for a Win bet
+        # 2. Win bet: still valid, but warn when the team's top scorer does not start
+        if bet_type.startswith("Victoire "):
+            team_name = bet_type[len("Victoire "):]
+            team_scorers = [s for s in top_scorers if s['statistics'][0]['team']['name'] == team_name]
+            if team_scorers:
+                best = max(team_scorers, key=lambda s: s['statistics'][0]['goals']['total'] or 0)
+                name = best['player']['name']
+                if not is_in_lineup(name, lineup_home) and not is_in_lineup(name, lineup_away):
+                    return True, f"✅ Compo officielle disponible | ⚠️ Top buteur absent: {name}"
+
+        # 3. For other bets (Over/Under, BTTS), we assume valid if lineups are out
         return True, "✅ Compo officielle disponible"
@@ -1,6 +1,19 @@
 import requests
 import logging
+import threading
+from datetime import date
 import config
+from metrics import metrics
+
+def iter_odds(fixture_obj):
+    """Yield (market_id, selection, bookmaker_id, odd) for every price in an odds payload."""
+    for bookmaker in fixture_obj.get("bookmakers", []):
+        for bet in bookmaker.get("bets", []):
+            for value in bet.get("values", []):
+                try:
+                    yield bet["id"], str(value["value"]), bookmaker["id"], float(value["odd"])
+                except (KeyError, TypeError, ValueError):
+                    continue
 
 class FootballAPI:
     def __init__(self):
@@ -8,16 +21,37 @@ class FootballAPI:
         self.headers = {
             "x-apisports-key": config.API_KEY
         }
+        # One keep-alive Session per thread: pipeline stages call the API
+        # concurrently and requests.Session is not thread-safe
+        self._local = threading.local()
         self.logger = logging.getLogger(__name__)
+        # Requests left in the current minute, as last reported by the API
+        self.minute_remaining = None
+
+    @property
+    def session(self):
+        """This thread's Session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
 
     def _get(self, endpoint, params=None):
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, headers=self.headers, params=params)
+            with metrics.timer("api_request_seconds", endpoint=endpoint):
+                response = self.session.get(url, params=params)
             response.raise_for_status()
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None and remaining.isdigit():
+                self.minute_remaining = int(remaining)
+            metrics.inc("api_requests_total", endpoint=endpoint, status="ok")
             return response.json().get("response", [])
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"API Request Error ({endpoint}): {e}")
+            metrics.inc("api_requests_total", endpoint=endpoint, status="error")
+            self.logger.error("API Request Error (%s): %s", endpoint, e)
             return None
 
     def get_fixtures_with_odds(self, league_id, season=2024, days_ahead=3):
@@ -34,6 +68,40 @@ class FootballAPI:
         
         # We might need to filter by date manually if the API doesn't support a range in this endpoint
         
+    def get_finished_fixtures(self, league_id, season=2024, since=None):
+        """Get finished fixtures (with final scores) of a league, optionally only from a date (YYYY-MM-DD) on."""
+        params = {
+            "league": league_id,
+            "season": season,
+            "status": "FT-AET-PEN"
+        }
+        if since:
+            params["from"] = since
+            params["to"] = date.today().isoformat()
+        data = self._get("fixtures", params)
+        return data if data else []
+
+    def get_fixtures_by_ids(self, fixture_ids):
+        """Get fixtures (score, status and events) by ID, FIXTURES_PER_REQUEST per call."""
+        fixture_ids = list(fixture_ids)
+        fixtures = []
+        for i in range(0, len(fixture_ids), config.FIXTURES_PER_REQUEST):
+            chunk = fixture_ids[i:i + config.FIXTURES_PER_REQUEST]
+            data = self._get("fixtures", {"ids": "-".join(str(fid) for fid in chunk)})
+            if data:
+                fixtures.extend(data)
+        return fixtures
+
+    def get_live_fixtures(self, league_ids):
+        """Get the fixtures in play (status, minute, score) of some leagues."""
+        data = self._get("fixtures", {"live": "-".join(str(league_id) for league_id in league_ids)})
+        return data if data else []
+
+    def get_live_odds(self):
+        """Get the in-play odds of every live fixture (one call, filtered by the caller)."""
+        data = self._get("odds/live")
+        return data if data else []
+
     def get_top_scorers(self, league_id, season=2024):
         """Get top 20 scorers for a league."""
         params = {
@@ -0,0 +1,67 @@
+import logging
+import os
+import socket
+import time
+
+import config
+from api_client import FootballAPI
+from analyzer import BetAnalyzer
+from analysis_cycle import shard_leagues
+from telegram_bot import BettingBot
+from bet_tracker import BetTracker
+from kelly_criterion import KellyCriterion
+from league_snapshot import SnapshotStore
+from lineup_cache import LineupCache
+from scheduler import KickoffScheduler
+from team_ratings import TeamRatings
+from profiler import profiler
+
+class AppContext:
+    """
+    Long-lived components shared by the scheduler, the validation jobs and the
+    bot poller/webhook. Built once at startup instead of once per cycle, so
+    the database schema check, HTTP session setup and Telegram sender thread
+    are paid for a single time.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        start = time.perf_counter()
+
+        # Horizontal scaling: this worker's leagues, and whether it owns the singletons
+        # (Telegram polling/webhook, welcome message, maintenance)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader = config.WORKER_INDEX == 0
+        self.leagues = shard_leagues(config.LEAGUES, config.WORKER_INDEX, config.WORKER_COUNT)
+        self.logger.info(
+            "Worker %s/%s (%s): %s",
+            config.WORKER_INDEX + 1, config.WORKER_COUNT, self.worker_id, ", ".join(self.leagues) or "no leagues",
+        )
+
+        self.api = FootballAPI()
+        self.analyzer = BetAnalyzer()
+        # Webhook mode dispatches updates to its own worker pool
+        self.bot = BettingBot(threaded=not config.WEBHOOK_URL)
+        self.tracker = BetTracker()
+        # Lineups cached until kickoff, shared by all validation runs
+        self.lineups = LineupCache(self.api)
+        # The bankroll follows the settled bets
+        self.kelly = KellyCriterion(config.BANKROLL + self.tracker.get_realized_profit(), config.KELLY_FRACTION)
+        self.scheduler = KickoffScheduler()
+
+        self.profiler = profiler
+        profiler.report = self.bot.send_admin
+        if config.PROFILE_CYCLES:
+            profiler.arm(*config.PROFILE_CYCLES)
+
+        # bet_key -> (fingerprint, bet or None) from the previous analysis cycle
+        self.analysis_memo = {}
+
+        # Team ratings, rebuilt from the local results store then updated per new result
+        self.ratings = TeamRatings()
+        self.ratings.replay(self.tracker.iter_results())
+
+        # League snapshots of the last analysis cycle, this worker's and the other workers'
+        self.snapshots = SnapshotStore(config.SNAPSHOT_DIR)
+
+        self.logger.info("Application context ready in %.2fs", time.perf_counter() - start)
@@ -0,0 +1,253 @@
+"""
+Benchmark suite: analyzer micro-benchmarks, BetTracker throughput on SQLite
+and end-to-end analysis cycle time against a synthetic API client.
+
+    python -m benchmarks.run                     # run and compare to the baseline
+    python -m benchmarks.run --save              # run and store a new baseline
+    python -m benchmarks.run --scale 4 --only cycle
+
+Exit status is 1 when a benchmark is slower than its baseline by more than
+--tolerance, so the suite can gate a CI job.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from analyzer import BetAnalyzer
+from analysis_cycle import AnalysisCycle
+from bet_record import Bet
+from bet_tracker import BetTracker
+from kelly_criterion import KellyCriterion
+from benchmarks.synthetic import SyntheticAPI, SyntheticData
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def measure(fn, repeat=5, number=1):
+    """Best seconds per call of fn over `repeat` rounds of `number` calls (min is the least noisy)."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return min(rounds)
+
+# --- Analyzer micro-benchmarks ---
+
+def bench_analyzer(data):
+    analyzer = BetAnalyzer()
+    fixtures = [f for league in data.fixtures.values() for f in league]
+    pairs = [(data.stats[f["teams"]["home"]["id"]], data.stats[f["teams"]["away"]["id"]]) for f in fixtures]
+    lineups = [data.lineups(f["fixture"]["id"]) for f in fixtures]
+    scorers = data.scorers[data.league_ids[0]]
+    n = len(pairs)
+
+    def fair_odds():
+        for home, away in pairs:
+            analyzer.calculate_fair_odds(float(home["goals"]["for"]["average"]["home"]),
+                                         float(away["goals"]["for"]["average"]["away"]))
+
+    def analyze_bet():
+        for home, away in pairs:
+            analyzer.analyze_bet(home, away, 1.9, "home", "Home", "Away")
+            analyzer.analyze_bet(home, away, 2.4, "away", "Away", "Home")
+
+    def secondary_markets():
+        for home, away in pairs:
+            analyzer.analyze_over15(home, away, 1.45)
+            analyzer.analyze_btts(home, away, 1.85)
+            analyzer.analyze_goalscorer("Player X", 2.6, scorers)
+
+    def validate_lineup():
+        for home_xi, away_xi in ((l[0]["startXI"], l[1]["startXI"]) for l in lineups):
+            bet = Bet("", "", "", "", "Buteur: " + home_xi[5]["player"]["name"], 2.5, 70, "")
+            analyzer.validate_lineup(bet, home_xi, away_xi)
+
+    return {
+        "analyzer.calculate_fair_odds": measure(fair_odds, number=5) / n,
+        "analyzer.analyze_bet": measure(analyze_bet, number=5) / n,
+        "analyzer.secondary_markets": measure(secondary_markets, number=5) / n,
+        "analyzer.validate_lineup": measure(validate_lineup, number=5) / n,
+    }
+
+def synthetic_bets(fixtures):
+    return [
+        Bet(
+            f"{f['teams']['home']['name']} vs {f['teams']['away']['name']}",
+            f["fixture"]["date"][:10], f["fixture"]["date"][11:16],
+            f"Synthetic League {f['league']['id']}", f"Victoire {f['teams']['home']['name']}",
+            1.9, 72, "✅ Solide à home (60% victoires) | 🔥 Forme récente: 4/5 victoires",
+            stake=2.5, recommendation="Mise recommandée: 2.5€ (0.3% de la banque) - Risque: 🟢 Très faible",
+            fixture_id=f["fixture"]["id"], match_id=f"bench_{f['fixture']['id']}",
+            bet_key=f"{f['fixture']['id']}:1:Home", fingerprint="0" * 40,
+        )
+        for f in fixtures
+    ]
+
+# --- Bet record serialization ---
+
+def bench_record(data):
+    import json
+    bets = synthetic_bets([f for league in data.fixtures.values() for f in league])
+    records = [b.encode() for b in bets]
+    legacy = [json.dumps(b.to_dict()) for b in bets]
+    n = len(bets)
+    return {
+        "record.encode": measure(lambda: [b.encode() for b in bets], number=20) / n,
+        "record.decode": measure(lambda: [Bet.decode(r) for r in records], number=20) / n,
+        "record.decode_legacy_json": measure(lambda: [Bet.decode(j) for j in legacy], number=20) / n,
+    }
+
+# --- BetTracker throughput (SQLite) ---
+
+def bench_tracker(data):
+    tracker = BetTracker()
+    fixtures = [f for league in data.fixtures.values() for f in league]
+
+    ticks = []
+    odds_by_match = {}
+    for f in fixtures:
+        match_id = f"bench_{f['fixture']['id']}"
+        for bookmaker in f["bookmakers"]:
+            for bet in bookmaker["bets"]:
+                for value in bet["values"]:
+                    odd = float(value["odd"])
+                    ticks.append((f["fixture"]["id"], bet["id"], value["value"], bookmaker["id"], odd))
+                    if bookmaker["id"] == 8:
+                        odds_by_match.setdefault(match_id, {})[(bet["id"], value["value"])] = odd
+
+    bets = synthetic_bets(fixtures)
+
+    ts = iter(range(int(time.time()), 2 ** 31))
+    results = {
+        "tracker.record_odds_ticks": measure(lambda: tracker.record_odds_ticks(ticks, ts=next(ts)), repeat=5) / len(ticks),
+        "tracker.check_dropping_odds_bulk": measure(lambda: tracker.check_dropping_odds_bulk(odds_by_match), repeat=5) / len(odds_by_match),
+        "tracker.record_bet": measure(lambda: [tracker.record_bet(b, b.stake) for b in bets], repeat=5) / len(bets),
+        "tracker.add_pending_bet": measure(lambda: [
+            tracker.add_pending_bet(b, f["fixture"]["id"], f"bench_{f['fixture']['id']}", bet_key=f"{f['fixture']['id']}:1:Home")
+            for b, f in zip(bets, fixtures)
+        ], repeat=5) / len(bets),
+        "tracker.get_breakdown": measure(lambda: tracker.get_breakdown("league"), repeat=5),
+    }
+    return results
+
+# --- End-to-end analysis cycle ---
+
+def bench_cycle(data, latency):
+    api = SyntheticAPI(data, latency=latency)
+    analyzer = BetAnalyzer()
+    tracker = BetTracker()
+    kelly = KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
+    memo = {}
+    leagues, config.LEAGUES = config.LEAGUES, data.leagues()
+    try:
+        # Cold: empty memo; warm: same payloads, every candidate reused
+        cold = measure(lambda: (memo.clear(), AnalysisCycle(api, analyzer, tracker, kelly, memo).run()), repeat=5)
+        warm = measure(lambda: AnalysisCycle(api, analyzer, tracker, kelly, memo).run(), repeat=5)
+
+        # The market analysis stage alone, the part the memo skips (the whole
+        # cycle is dominated by the fetch and database stages)
+        contexts = []
+        cycle = AnalysisCycle(api, analyzer, tracker, kelly, {})
+        for league in data.leagues().items():
+            enriched = []
+            cycle.fetch_league(league, lambda c: cycle.enrich_fixture(c, enriched.append))
+            cycle.build_features(enriched, contexts.append)
+
+        def analyze(memo):
+            cycle = AnalysisCycle(api, analyzer, tracker, kelly, memo)
+            for c in contexts:
+                cycle.analyze_fixture(c, lambda bet: None)
+            return cycle
+
+        stage_memo = analyze({})._new_memo
+        stage_cold = measure(lambda: analyze({}), repeat=5)
+        stage_warm = measure(lambda: analyze(stage_memo), repeat=5)
+    finally:
+        config.LEAGUES = leagues
+    return {
+        "cycle.analysis_cold": cold, "cycle.analysis_warm": warm,
+        "cycle.analysis_stage_cold": stage_cold, "cycle.analysis_stage_warm": stage_warm,
+    }
+
+SUITES = {"analyzer": bench_analyzer, "record": bench_record, "tracker": bench_tracker, "cycle": bench_cycle}
+
+def compare(results, baseline, tolerance):
+    """Print each result against the baseline; returns the names that regressed."""
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        if base:
+            change = seconds / base - 1
+            flag = "REGRESSION" if change > tolerance else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:36} {seconds * 1e6:12.1f} µs   baseline {base * 1e6:12.1f} µs   {change:+7.1%} {flag}")
+        else:
+            print(f"{name:36} {seconds * 1e6:12.1f} µs   (no baseline)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--scale", type=int, default=1, help="Fixtures per league multiplier (10 fixtures x 6 leagues at 1)")
+    parser.add_argument("--leagues", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated API latency per request (seconds)")
+    parser.add_argument("--only", choices=sorted(SUITES), action="append", help="Run only these suites")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    data = SyntheticData(leagues=args.leagues, fixtures_per_league=10 * args.scale)
+
+    results = {}
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # BetTracker writes bets.db in the working directory
+        os.chdir(tmp)
+        try:
+            for name in args.only or SUITES:
+                suite = SUITES[name]
+                results.update(suite(data, args.latency) if name == "cycle" else suite(data))
+        finally:
+            os.chdir(workdir)
+
+    key = f"scale={args.scale},leagues={args.leagues},latency={args.latency}"
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+    baseline = stored.get(key, {})
+    if baseline and baseline.get("machine") != platform.node():
+        print(f"Note: baseline recorded on {baseline.get('machine')} ({baseline.get('python')})")
+
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+
+    if args.save:
+        stored[key] = {
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "results": {**baseline.get("results", {}), **results},
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline} [{key}]")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# API-Football bet ids used by the analysis
+MATCH_WINNER, GOALSCORER, GOALS_OVER_UNDER, BTTS = 1, 4, 5, 8
+
+class SyntheticData:
+    """
+    Deterministic API-Football-shaped payloads for benchmarks.
+
+    Same seed and scale always give the same leagues, teams, fixtures,
+    multi-market odds, team statistics, standings, top scorers and lineups.
+    """
+
+    def __init__(self, leagues=6, fixtures_per_league=10, bookmakers=3, seed=42):
+        self.rng = random.Random(seed)
+        self.league_ids = [1000 + i for i in range(leagues)]
+        self.fixtures_per_league = fixtures_per_league
+        self.bookmaker_ids = [8] + [100 + i for i in range(bookmakers - 1)]
+        self.now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+        self.teams = {}      # league_id -> [team dicts]
+        self.players = {}    # team_id -> [player names]
+        self.stats = {}      # team_id -> teams/statistics payload
+        self.fixtures = {}   # league_id -> [fixture payloads with odds]
+        self.scorers = {}    # league_id -> players/topscorers payload
+        for league_id in self.league_ids:
+            self._build_league(league_id)
+
+    def leagues(self):
+        """{name: id} in the shape of config.LEAGUES."""
+        return {f"Synthetic League {league_id}": league_id for league_id in self.league_ids}
+
+    def _build_league(self, league_id):
+        rng = self.rng
+        teams = [
+            {"id": league_id * 100 + i, "name": f"Team {league_id}-{i}"}
+            for i in range(max(2 * self.fixtures_per_league, 20))
+        ]
+        self.teams[league_id] = teams
+        for team in teams:
+            self.players[team["id"]] = [f"Player {team['id']}-{n}" for n in range(18)]
+            self.stats[team["id"]] = self._team_stats(team)
+
+        fixtures = []
+        order = teams[:]
+        rng.shuffle(order)
+        for i in range(self.fixtures_per_league):
+            home, away = order[2 * i], order[2 * i + 1]
+            kickoff = self.now + timedelta(hours=rng.randint(2, 70))
+            fixtures.append({
+                "fixture": {"id": league_id * 10000 + i, "date": kickoff.strftime("%Y-%m-%dT%H:%M:00+00:00")},
+                "league": {"id": league_id},
+                "teams": {"home": home, "away": away},
+                "bookmakers": [self._bookmaker(bid, home, away) for bid in self.bookmaker_ids],
+            })
+        self.fixtures[league_id] = fixtures
+
+        scorers = [
+            {"player": {"name": name}, "statistics": [{"goals": {"total": rng.randint(3, 25)}}]}
+            for team in teams[:10] for name in self.players[team["id"]][:2]
+        ]
+        scorers.sort(key=lambda s: s["statistics"][0]["goals"]["total"], reverse=True)
+        self.scorers[league_id] = scorers[:20]
+
+    def _team_stats(self, team):
+        rng = self.rng
+        played_home, played_away = rng.randint(6, 19), rng.randint(6, 19)
+        return {
+            "team": team,
+            "form": "".join(rng.choice("WWDL") for _ in range(rng.randint(5, 20))),
+            "fixtures": {
+                "played": {"home": played_home, "away": played_away},
+                "wins": {"home": rng.randint(0, played_home), "away": rng.randint(0, played_away)},
+            },
+            "goals": {
+                "for": {"average": {"home": f"{rng.uniform(0.6, 2.6):.1f}", "away": f"{rng.uniform(0.4, 2.2):.1f}"}},
+                "against": {"average": {"home": f"{rng.uniform(0.5, 2.0):.1f}", "away": f"{rng.uniform(0.6, 2.4):.1f}"}},
+            },
+        }
+
+    def _bookmaker(self, bookmaker_id, home, away):
+        rng = self.rng
+        # Bookmakers quote around the same prices
+        def odd(base):
+            return f"{max(1.01, base * rng.uniform(0.95, 1.05)):.2f}"
+
+        home_base = rng.uniform(1.3, 4.5)
+        away_base = rng.uniform(1.3, 4.5)
+        scorers = self.players[home["id"]][:4] + self.players[away["id"]][:4]
+        return {
+            "id": bookmaker_id,
+            "bets": [
+                {"id": MATCH_WINNER, "values": [
+                    {"value": "Home", "odd": odd(home_base)},
+                    {"value": "Draw", "odd": odd(rng.uniform(2.8, 4.2))},
+                    {"value": "Away", "odd": odd(away_base)},
+                ]},
+                {"id": GOALS_OVER_UNDER, "values": [
+                    {"value": f"{side} {line}", "odd": odd(rng.uniform(1.2, 3.5))}
+                    for line in ("0.5", "1.5", "2.5", "3.5") for side in ("Over", "Under")
+                ]},
+                {"id": BTTS, "values": [
+                    {"value": "Yes", "odd": odd(rng.uniform(1.5, 2.3))},
+                    {"value": "No", "odd": odd(rng.uniform(1.5, 2.3))},
+                ]},
+                {"id": GOALSCORER, "values": [
+                    {"value": name, "odd": odd(rng.uniform(1.8, 6.0))} for name in scorers
+                ]},
+            ],
+        }
+
+    def standings(self, league_id):
+        teams = sorted(self.teams[league_id], key=lambda t: self.stats[t["id"]]["form"].count("W"), reverse=True)
+        return [{"rank": rank, "team": team} for rank, team in enumerate(teams, start=1)]
+
+    def lineups(self, fixture_id):
+        league_id = fixture_id // 10000
+        fixture = self.fixtures[league_id][fixture_id % 10000]
+        return [
+            {
+                "team": fixture["teams"][side],
+                "startXI": [{"player": {"name": name}} for name in self.players[fixture["teams"][side]["id"]][:11]],
+            }
+            for side in ("home", "away")
+        ]
+
+class SyntheticAPI:
+    """
+    Drop-in FootballAPI replacement serving SyntheticData, with an optional
+    per-request latency to mimic HTTP round-trips.
+    """
+
+    def __init__(self, data, latency=0.0):
+        self.data = data
+        self.latency = latency
+        self.calls = 0
+
+    def _request(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_fixtures_with_odds(self, league_id, season=2024, days_ahead=3):
+        self._request()
+        return self.data.fixtures.get(league_id, [])
+
+    def get_top_scorers(self, league_id, season=2024):
+        self._request()
+        return self.data.scorers.get(league_id, [])
+
+    def get_standings(self, league_id, season=2024):
+        self._request()
+        return self.data.standings(league_id)
+
+    def get_team_stats(self, team_id, league_id, season=2024):
+        self._request()
+        return self.data.stats.get(team_id)
+
+    def get_fixture_lineups(self, fixture_id):
+        self._request()
+        return self.data.lineups(fixture_id)
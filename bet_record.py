@@ -0,0 +1,160 @@
+import json
+import struct
+from datetime import datetime
+
+# Record layout v1: header, then each of STRING_FIELDS as a u16 length + UTF-8 bytes
+VERSION = 1
+_HEADER = struct.Struct("<BBqddd")  # version, flags, fixture_id, odds, confidence, stake
+_LENGTH = struct.Struct("<H")
+
+_HAS_STAKE = 1
+_HAS_FIXTURE = 2
+_INT_CONFIDENCE = 4
+
+# Keys of the dicts bets used to be passed around (and stored) as
+LEGACY_KEYS = {
+    "match": "match", "date": "date", "time": "heure", "league": "ligue", "bet_type": "pari",
+    "odds": "cote", "confidence": "confiance", "reason": "raison", "stake": "stake",
+    "recommendation": "recommendation", "fixture_id": "fixture_id", "match_id": "match_id",
+    "bet_key": "bet_key", "fingerprint": "fingerprint",
+}
+
+class Bet:
+    """
+    One bet candidate, from analysis through validation, storage and Telegram.
+
+    Uses __slots__ (no per-instance dict) and serializes to a compact,
+    versioned binary record for the pending_bets table.
+    """
+
+    __slots__ = (
+        "match", "date", "time", "league", "bet_type", "odds", "confidence", "reason",
+        "stake", "recommendation", "fixture_id", "match_id", "bet_key", "fingerprint",
+    )
+    STRING_FIELDS = (
+        "match", "date", "time", "league", "bet_type", "reason",
+        "recommendation", "match_id", "bet_key", "fingerprint",
+    )
+
+    def __init__(self, match, date, time, league, bet_type, odds, confidence, reason,
+                 stake=None, recommendation="", fixture_id=None, match_id="", bet_key="", fingerprint=""):
+        """
+        Args:
+            date, time: Kickoff as "YYYY-MM-DD" and "HH:MM"
+            bet_type: Displayed bet, e.g. "Victoire PSG" or "Buteur: Mbappé"
+            confidence: Confidence score (0-100)
+            reason: Reasons joined with " | "
+            bet_key: "<fixture_id>:<market_id>:<selection>", stable across cycles
+        """
+        self.match = match
+        self.date = date
+        self.time = time
+        self.league = league
+        self.bet_type = bet_type
+        self.odds = odds
+        self.confidence = confidence
+        self.reason = reason
+        self.stake = stake
+        self.recommendation = recommendation
+        self.fixture_id = fixture_id
+        self.match_id = match_id
+        self.bet_key = bet_key
+        self.fingerprint = fingerprint
+
+    def __repr__(self):
+        return f"Bet({self.bet_type!r} @ {self.odds} - {self.match!r}, {self.confidence}%)"
+
+    def __eq__(self, other):
+        if not isinstance(other, Bet):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    # Deliberately unhashable: bets are mutable (stake, reason and fingerprint
+    # are set as they move through the cycle), so key sets and dicts on bet_key
+    __hash__ = None
+
+    @property
+    def market_id(self):
+        """API-Football bet id (1 = match winner, 4 = scorer, 5 = goals, 8 = BTTS), from bet_key."""
+        parts = self.bet_key.split(":")
+        return parts[1] if len(parts) > 2 else None
+
+    @property
+    def kickoff(self):
+        """Kickoff as a Unix time (date and time are local); ValueError if they don't parse."""
+        return datetime.strptime(f"{self.date} {self.time}", "%Y-%m-%d %H:%M").timestamp()
+
+    @property
+    def expected_value(self):
+        """EV per unit staked, reading the confidence as the win probability."""
+        return self.confidence / 100.0 * self.odds - 1
+
+    def encode(self):
+        """Serialize to the current binary record version."""
+        flags = 0
+        if self.stake is not None:
+            flags |= _HAS_STAKE
+        if self.fixture_id is not None:
+            flags |= _HAS_FIXTURE
+        if isinstance(self.confidence, int):
+            flags |= _INT_CONFIDENCE
+
+        parts = [_HEADER.pack(
+            VERSION, flags, self.fixture_id or 0, self.odds, self.confidence, self.stake or 0.0,
+        )]
+        for name in self.STRING_FIELDS:
+            raw = (getattr(self, name) or "").encode("utf-8")
+            parts.append(_LENGTH.pack(len(raw)))
+            parts.append(raw)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data):
+        """
+        Rebuild a bet from a binary record, or from the JSON text rows written
+        before binary records existed.
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        if isinstance(data, str):
+            return cls.from_dict(json.loads(data))
+        if data[:1] == b"{":
+            return cls.from_dict(json.loads(data.decode("utf-8")))
+        if data[0] != VERSION:
+            raise ValueError(f"Unsupported bet record version: {data[0]}")
+
+        _, flags, fixture_id, odds, confidence, stake = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        values = []
+        for _ in cls.STRING_FIELDS:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            values.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        match, date, time, league, bet_type, reason, recommendation, match_id, bet_key, fingerprint = values
+        return cls(
+            match, date, time, league, bet_type, odds,
+            int(confidence) if flags & _INT_CONFIDENCE else confidence,
+            reason,
+            stake=stake if flags & _HAS_STAKE else None,
+            recommendation=recommendation,
+            fixture_id=fixture_id if flags & _HAS_FIXTURE else None,
+            match_id=match_id, bet_key=bet_key, fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a bet from a legacy French-keyed dict (or an English-keyed one)."""
+        fields = {
+            name: data[legacy] if legacy in data else data.get(name)
+            for name, legacy in LEGACY_KEYS.items()
+        }
+        for name in cls.STRING_FIELDS:
+            if fields[name] is None:
+                fields[name] = ""
+        return cls(**fields)
+
+    def to_dict(self):
+        """Legacy French-keyed dict, for JSON exports."""
+        return {legacy: getattr(self, name) for name, legacy in LEGACY_KEYS.items()}
@@ -0,0 +1,85 @@
+import heapq
+import itertools
+
+import config
+
+class TopKSelector:
+    """
+    Streaming top-k selection of bet candidates.
+
+    Candidates are pushed one at a time and only the current best k are kept
+    in a min-heap, so a cycle costs O(n log k) time and O(k) memory no matter
+    how many goalscorer odds it scans. Ranking is by confidence, then EV
+    (Bet.expected_value, which reads the confidence as the win probability
+    like KellyCriterion does).
+
+    Diversity caps limit how many selected bets may share a fixture, a
+    league or a market. A candidate hitting a cap can only replace the
+    weakest selected bet of that group (greedy: a bet dropped for it is not
+    reconsidered later).
+    """
+
+    def __init__(self, k=None, max_per_fixture=None, max_per_league=None, max_per_market=None, min_ev=None):
+        """
+        Args:
+            k: Number of bets to keep
+            max_per_fixture, max_per_league, max_per_market: Caps, 0 = no cap
+            min_ev: Candidates with a lower expected value are dropped outright
+        """
+        self.k = k if k is not None else config.TOP_BETS
+        self.caps = {
+            "fixture": max_per_fixture if max_per_fixture is not None else config.MAX_BETS_PER_FIXTURE,
+            "league": max_per_league if max_per_league is not None else config.MAX_BETS_PER_LEAGUE,
+            "market": max_per_market if max_per_market is not None else config.MAX_BETS_PER_MARKET,
+        }
+        self.min_ev = min_ev if min_ev is not None else config.MIN_EXPECTED_VALUE
+
+        self._heap = []    # (score, seq, groups, bet), weakest first
+        self._seq = itertools.count()
+        self._counts = {}  # (dimension, value) -> selected bets in that group
+        self.seen = 0
+        self.rejected_ev = 0
+
+    @staticmethod
+    def _groups(bet):
+        return (("fixture", bet.fixture_id), ("league", bet.league), ("market", bet.market_id or bet.bet_type))
+
+    def push(self, bet):
+        """Offer one candidate; returns True if it is (for now) among the selected bets."""
+        self.seen += 1
+        ev = bet.expected_value
+        if ev < self.min_ev:
+            self.rejected_ev += 1
+            return False
+
+        # Final tie-break on the key keeps the result independent of arrival order
+        score = (bet.confidence, round(ev, 6), bet.bet_key)
+        if len(self._heap) >= self.k and score <= self._heap[0][0]:
+            return False
+
+        groups = self._groups(bet)
+        full = [g for g in groups if self.caps[g[0]] and self._counts.get(g, 0) >= self.caps[g[0]]]
+        if full:
+            # Only a weaker bet sharing every saturated group can make room
+            victims = [entry for entry in self._heap if all(g in entry[2] for g in full)]
+            victim = min(victims, key=lambda entry: entry[0], default=None)
+            if victim is None or victim[0] >= score:
+                return False
+            self._remove(victim)
+        elif len(self._heap) >= self.k:
+            self._remove(self._heap[0])
+
+        heapq.heappush(self._heap, (score, next(self._seq), groups, bet))
+        for g in groups:
+            self._counts[g] = self._counts.get(g, 0) + 1
+        return True
+
+    def _remove(self, entry):
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        for g in entry[2]:
+            self._counts[g] -= 1
+
+    def results(self):
+        """Selected bets, best first."""
+        return [bet for _, _, _, bet in sorted(self._heap, reverse=True)]
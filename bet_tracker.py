@@ -1,10 +1,48 @@
 import sqlite3
-import pandas as pd
+import csv
 import logging
 import os
-import psycopg2
+import time
+from datetime import datetime, timedelta
 from urllib.parse import urlparse
 
+import config
+from bet_record import Bet
+from metrics import metrics
+
+# Alert wording for the 1X2 selections (other markets use the selection name)
+DROP_LABELS = {
+    (1, "Home"): "DOMICILE",
+    (1, "Away"): "EXTÉRIEUR",
+}
+
+# SQL bucket expressions for get_breakdown()
+REPORT_DIMENSIONS = {
+    "league": "league",
+    "market": """CASE WHEN bet_type LIKE 'Victoire %' THEN '1X2'
+                      WHEN bet_type LIKE 'Buteur:%' THEN 'Buteur'
+                      ELSE bet_type END""",
+    "odds": """CASE WHEN odds < 1.5 THEN '1.00-1.49'
+                    WHEN odds < 2.0 THEN '1.50-1.99'
+                    WHEN odds < 2.5 THEN '2.00-2.49'
+                    WHEN odds < 3.0 THEN '2.50-2.99'
+                    ELSE '3.00+' END""",
+    "confidence": "(confidence / 10) * 10",
+}
+
+# Exportable tables and the column used for their date-range filter
+EXPORT_TABLES = {
+    "bets": "date",
+    "pending_bets": "created_at",
+    "opening_odds": "created_at",
+    "odds_ticks": "ts",
+}
+# Date columns stored as Unix seconds: export bounds are converted to match
+UNIX_TIME_COLUMNS = {"ts"}
+
+# Columns read back for a pending bet (see BetTracker._pending_row)
+PENDING_COLUMNS = "id, fixture_id, match_id, bet_data, bet_record, created_at, bet_key"
+
 class BetTracker:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -13,23 +51,76 @@ class BetTracker:
         
         if not self.is_postgres:
             self.db_path = "bets.db"
-            self.logger.info(f"Using SQLite database at {self.db_path}")
+            self.logger.info("Using SQLite database at %s", self.db_path)
         else:
             self.logger.info("Using PostgreSQL database")
-            
+
+        self._selection_cache = {}
+        self._fragment_cache = {}
+        self._downsampled_until = 0
         self._init_db()
 
     def _get_connection(self):
         """Get database connection based on configuration."""
         if self.is_postgres:
+            # Imported lazily: the SQLite path never loads the driver
+            import psycopg2
             return psycopg2.connect(self.db_url)
         else:
-            return sqlite3.connect(self.db_path)
+            # Several worker processes may share the file: wait for the write lock
+            return sqlite3.connect(self.db_path, timeout=30)
+
+    def _sql(self, query):
+        """Adapt '?' placeholders to the paramstyle of the active driver."""
+        return query.replace("%", "%%").replace("?", "%s") if self.is_postgres else query
+
+    def _executemany(self, cursor, query, rows):
+        """Run a parametrized statement for many rows in as few round-trips as possible."""
+        if self.is_postgres:
+            from psycopg2.extras import execute_batch
+            execute_batch(cursor, self._sql(query), rows, page_size=500)
+        else:
+            cursor.executemany(query, rows)
+
+    def _ensure_column(self, cursor, table, column, ddl):
+        """Add a column to an existing table if it is missing (schema migration)."""
+        if self.is_postgres:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl}")
+            return
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+            except sqlite3.OperationalError as e:
+                # Another worker starting at the same time added it first
+                if "duplicate column" not in str(e):
+                    raise
+
+    def _backfill_kickoffs(self, cursor):
+        """Set the kickoff of pending rows stored before the column existed."""
+        cursor.execute(f"SELECT {PENDING_COLUMNS} FROM pending_bets WHERE kickoff IS NULL")
+        updates = []
+        for row in cursor.fetchall():
+            try:
+                updates.append((int(self._pending_row(row)["bet_data"].kickoff), row[0]))
+            except (TypeError, ValueError):
+                continue
+        self._executemany(cursor, "UPDATE pending_bets SET kickoff = ? WHERE id = ?", updates)
+
+    def _table_exists(self, cursor, table):
+        if self.is_postgres:
+            cursor.execute("SELECT to_regclass(%s)", (table,))
+            return cursor.fetchone()[0] is not None
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
 
     def _init_db(self):
         """Initialize the database with tables."""
         conn = self._get_connection()
         cursor = conn.cursor()
+        if not self.is_postgres:
+            # Workers starting together set up the schema one after the other
+            cursor.execute("BEGIN IMMEDIATE")
         
         # SQL syntax differences
         id_type = "SERIAL PRIMARY KEY" if self.is_postgres else "INTEGER PRIMARY KEY AUTOINCREMENT"
@@ -55,88 +146,360 @@ class BetTracker:
         ''')
             
         cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS odds_history (
-                match_id TEXT PRIMARY KEY,
-                opening_home_odd REAL,
-                opening_away_odd REAL,
-                last_updated TIMESTAMP DEFAULT {timestamp_default}
+            CREATE TABLE IF NOT EXISTS pending_bets (
+                id {id_type},
+                fixture_id INTEGER,
+                match_id TEXT,
+                bet_data TEXT,
+                created_at TIMESTAMP DEFAULT {timestamp_default}
             )
         ''')
 
+        # Indexes backing the grouped analytics queries
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bets_date ON bets (date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bets_league ON bets (league, result)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bets_bet_type ON bets (bet_type, result)")
+
+        # Odds tick store: integer keys + fixed-point prices keep rows small
         cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS pending_bets (
+            CREATE TABLE IF NOT EXISTS odds_selections (
                 id {id_type},
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS odds_ticks (
+                fixture_id INTEGER NOT NULL,
+                market_id INTEGER NOT NULL,
+                selection_id INTEGER NOT NULL,
+                bookmaker_id INTEGER NOT NULL,
+                ts BIGINT NOT NULL,
+                price INTEGER NOT NULL,
+                PRIMARY KEY (fixture_id, market_id, selection_id, bookmaker_id, ts)
+            ){"" if self.is_postgres else " WITHOUT ROWID"}
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_odds_ticks_ts ON odds_ticks (ts)")
+
+        # Opening price per (match, market, selection) for dropping-odds alerts
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS opening_odds (
+                match_id TEXT NOT NULL,
+                market_id INTEGER NOT NULL,
+                selection TEXT NOT NULL,
+                odd REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT {timestamp_default},
+                PRIMARY KEY (match_id, market_id, selection)
+            )
+        ''')
+        
+        # Finished fixtures, the source of the local team ratings
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                fixture_id BIGINT PRIMARY KEY,
+                league_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                home_id INTEGER NOT NULL,
+                away_id INTEGER NOT NULL,
+                home_goals INTEGER NOT NULL,
+                away_goals INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_league_date ON results (league_id, date)")
+
+        # Archive for the retention job
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pending_bets_archive (
+                id INTEGER PRIMARY KEY,
                 fixture_id INTEGER,
                 match_id TEXT,
                 bet_data TEXT,
-                created_at TIMESTAMP DEFAULT {timestamp_default}
+                created_at TIMESTAMP
+            )
+        ''')
+
+        # Dictionary-encoded reasons for compacted bets
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS reason_fragments (
+                id {id_type},
+                fragment TEXT NOT NULL UNIQUE
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bet_reasons (
+                bet_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                fragment_id INTEGER NOT NULL,
+                PRIMARY KEY (bet_id, position)
             )
         ''')
+
+        # Pending bets are keyed by (fixture, market, selection) so cycles upsert instead of piling up
+        for table in ("pending_bets", "pending_bets_archive"):
+            self._ensure_column(cursor, table, "bet_key", "TEXT")
+            self._ensure_column(cursor, table, "fingerprint", "TEXT")
+            self._ensure_column(cursor, table, "status", "TEXT DEFAULT 'pending'")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_pending_bets_key ON pending_bets (bet_key)")
+
+        # Pending bets are stored as binary Bet records (bet_data only holds legacy JSON rows)
+        blob_type = "BYTEA" if self.is_postgres else "BLOB"
+        for table in ("pending_bets", "pending_bets_archive"):
+            self._ensure_column(cursor, table, "bet_record", blob_type)
+
+        # Row leases, so several workers can validate pending bets without duplicates
+        self._ensure_column(cursor, "pending_bets", "lease_owner", "TEXT")
+        self._ensure_column(cursor, "pending_bets", "lease_until", "BIGINT")
+
+        # Pending rows expire on kickoff, not on creation time
+        for table in ("pending_bets", "pending_bets_archive"):
+            self._ensure_column(cursor, table, "kickoff", "BIGINT")
+        self._backfill_kickoffs(cursor)
+
+        # Recorded bets keep their fixture and market so they can be settled automatically
+        self._ensure_column(cursor, "bets", "fixture_id", "BIGINT")
+        self._ensure_column(cursor, "bets", "bet_key", "TEXT")
         
         conn.commit()
-        conn.close()
+        try:
+            self._migrate_odds_history(conn)
+        finally:
+            conn.close()
         self.logger.info("Database initialized")
 
-    def check_dropping_odds(self, match_id, current_home, current_away):
-        """Check for dropping odds."""
+    def _migrate_odds_history(self, conn):
+        """
+        One-off migration: copy the 1X2 openings of the old odds_history table
+        to opening_odds, then drop it. odds_history_archive is left as it is.
+
+        Runs in its own transaction under a lock (advisory lock on Postgres,
+        BEGIN IMMEDIATE on SQLite), so workers starting together migrate once
+        and the others find the table already gone.
+        """
+        cursor = conn.cursor()
+        try:
+            if self.is_postgres:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('odds_history_migration'))")
+            else:
+                cursor.execute("BEGIN IMMEDIATE")
+            if self._table_exists(cursor, "odds_history"):
+                for selection, column in (("Home", "opening_home_odd"), ("Away", "opening_away_odd")):
+                    cursor.execute(f'''
+                        INSERT INTO opening_odds (match_id, market_id, selection, odd, created_at)
+                        SELECT match_id, 1, '{selection}', {column}, last_updated
+                        FROM odds_history WHERE {column} > 0
+                        ON CONFLICT (match_id, market_id, selection) DO NOTHING
+                    ''')
+                cursor.execute("DROP TABLE IF EXISTS odds_history")
+                self.logger.info("Migrated odds_history openings to opening_odds")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _intern(self, cursor, table, column, values, cache):
+        """Map strings to their integer IDs in a dictionary table, creating missing ones."""
+        missing = [v for v in set(values) if v not in cache]
+        if missing:
+            self._executemany(
+                cursor,
+                f"INSERT INTO {table} ({column}) VALUES (?) ON CONFLICT ({column}) DO NOTHING",
+                [(v,) for v in missing]
+            )
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(self._sql(f"SELECT id, {column} FROM {table} WHERE {column} IN ({placeholders})"), chunk)
+                for value_id, value in cursor.fetchall():
+                    cache[value] = value_id
+        return cache
+
+    @metrics.timed("db_query_seconds", op="record_odds_ticks")
+    def record_odds_ticks(self, ticks, ts=None):
+        """
+        Append a batch of odds snapshots to the tick store.
+
+        Args:
+            ticks: Iterable of (fixture_id, market_id, selection, bookmaker_id, odd)
+            ts: Unix timestamp of the snapshot (defaults to now)
+
+        Returns:
+            Number of ticks written
+        """
+        ticks = list(ticks)
+        if not ticks:
+            return 0
+        ts = int(ts if ts is not None else time.time())
+
         conn = self._get_connection()
         cursor = conn.cursor()
-        
-        query = "SELECT opening_home_odd, opening_away_odd FROM odds_history WHERE match_id = %s" if self.is_postgres else "SELECT opening_home_odd, opening_away_odd FROM odds_history WHERE match_id = ?"
-        cursor.execute(query, (match_id,))
-        row = cursor.fetchone()
-        
-        alerts = []
-        
-        if row:
-            open_home, open_away = row
-            
-            # Check Home Drop
-            if open_home > 0:
-                drop_home = (open_home - current_home) / open_home
-                if drop_home >= 0.10: # 10% drop
-                    alerts.append(f"📉 CHUTE COTE DOMICILE: {open_home} -> {current_home} (-{int(drop_home*100)}%)")
-            
-            # Check Away Drop
-            if open_away > 0:
-                drop_away = (open_away - current_away) / open_away
-                if drop_away >= 0.10: # 10% drop
-                    alerts.append(f"📉 CHUTE COTE EXTÉRIEUR: {open_away} -> {current_away} (-{int(drop_away*100)}%)")
-        else:
-            # First time seeing this match, record opening odds
-            query = "INSERT INTO odds_history (match_id, opening_home_odd, opening_away_odd) VALUES (%s, %s, %s)" if self.is_postgres else "INSERT INTO odds_history (match_id, opening_home_odd, opening_away_odd) VALUES (?, ?, ?)"
-            cursor.execute(query, (match_id, current_home, current_away))
+
+        ids = self._intern(cursor, "odds_selections", "name", [t[2] for t in ticks], self._selection_cache)
+        rows = [
+            (fixture_id, market_id, ids[selection], bookmaker_id, ts, int(round(odd * config.ODDS_PRICE_SCALE)))
+            for fixture_id, market_id, selection, bookmaker_id, odd in ticks
+        ]
+        self._executemany(cursor, '''
+            INSERT INTO odds_ticks (fixture_id, market_id, selection_id, bookmaker_id, ts, price)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (fixture_id, market_id, selection_id, bookmaker_id, ts) DO UPDATE SET price = excluded.price
+        ''', rows)
+        conn.commit()
+
+        self._downsample_odds_ticks(cursor, ts)
+        conn.commit()
+        conn.close()
+        self.logger.info("Recorded %d odds ticks", len(rows))
+        return len(rows)
+
+    def _downsample_odds_ticks(self, cursor, now):
+        """Keep only the last tick per bucket for ticks older than the raw retention window."""
+        bucket = config.ODDS_TICK_BUCKET_MINUTES * 60
+        cutoff = (now - config.ODDS_TICK_RAW_HOURS * 3600) // bucket * bucket
+        start = self._downsampled_until
+        if cutoff <= start:
+            return
+
+        cursor.execute(self._sql('''
+            DELETE FROM odds_ticks
+            WHERE ts >= ? AND ts < ?
+              AND (fixture_id, market_id, selection_id, bookmaker_id, ts) NOT IN (
+                SELECT fixture_id, market_id, selection_id, bookmaker_id, MAX(ts)
+                FROM odds_ticks
+                WHERE ts >= ? AND ts < ?
+                GROUP BY fixture_id, market_id, selection_id, bookmaker_id, ts / ?
+              )
+        '''), (start, cutoff, start, cutoff, bucket))
+        if cursor.rowcount > 0:
+            self.logger.info("Downsampled %s old odds ticks", cursor.rowcount)
+        self._downsampled_until = cutoff
+
+    @metrics.timed("db_query_seconds", op="get_odds_ticks")
+    def get_odds_ticks(self, fixture_id, market_id=None, selection=None, bookmaker_id=None, since=None, until=None):
+        """
+        Range query over the tick store for one fixture.
+
+        Returns:
+            List of (ts, market_id, selection, bookmaker_id, odd) ordered by time
+        """
+        query = '''
+            SELECT t.ts, t.market_id, s.name, t.bookmaker_id, t.price
+            FROM odds_ticks t
+            JOIN odds_selections s ON s.id = t.selection_id
+            WHERE t.fixture_id = ?
+        '''
+        params = [fixture_id]
+        for clause, value in (
+            ("t.market_id = ?", market_id),
+            ("s.name = ?", selection),
+            ("t.bookmaker_id = ?", bookmaker_id),
+            ("t.ts >= ?", since),
+            ("t.ts < ?", until),
+        ):
+            if value is not None:
+                query += f" AND {clause}"
+                params.append(value)
+        query += " ORDER BY t.ts"
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self._sql(query), params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [(ts, m_id, name, b_id, price / config.ODDS_PRICE_SCALE) for ts, m_id, name, b_id, price in rows]
+
+    @metrics.timed("db_query_seconds", op="check_dropping_odds_bulk")
+    def check_dropping_odds_bulk(self, odds_by_match, threshold=0.10):
+        """
+        Check dropping odds for a whole cycle at once.
+
+        Args:
+            odds_by_match: {match_id: {(market_id, selection): current_odd}}
+            threshold: Relative drop from the opening odd that triggers an alert
+
+        Returns:
+            {match_id: {(market_id, selection): alert_text}} for matches with drops
+        """
+        if not odds_by_match:
+            return {}
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        match_ids = list(odds_by_match)
+        opening = {}
+        for i in range(0, len(match_ids), 500):
+            chunk = match_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(self._sql(
+                f"SELECT match_id, market_id, selection, odd FROM opening_odds WHERE match_id IN ({placeholders})"
+            ), chunk)
+            for match_id, market_id, selection, odd in cursor.fetchall():
+                opening[(match_id, market_id, selection)] = odd
+
+        alerts = {}
+        new_openings = []
+        for match_id, prices in odds_by_match.items():
+            for (market_id, selection), current in prices.items():
+                if not current:
+                    continue
+                open_odd = opening.get((match_id, market_id, selection))
+                if open_odd is None:
+                    # First time seeing this price, record it as the opening odd
+                    new_openings.append((match_id, market_id, selection, current))
+                    continue
+                if open_odd <= 0:
+                    continue
+
+                drop = (open_odd - current) / open_odd
+                if drop >= threshold:
+                    label = DROP_LABELS.get((market_id, selection), selection.upper())
+                    alerts.setdefault(match_id, {})[(market_id, selection)] = (
+                        f"📉 CHUTE COTE {label}: {open_odd} -> {current} (-{int(drop*100)}%)"
+                    )
+
+        if new_openings:
+            self._executemany(cursor, '''
+                INSERT INTO opening_odds (match_id, market_id, selection, odd)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (match_id, market_id, selection) DO NOTHING
+            ''', new_openings)
             conn.commit()
-            
+
         conn.close()
+        self.logger.info("Checked odds drops for %d matches (%d new openings)", len(match_ids), len(new_openings))
         return alerts
-    
+
+    @metrics.timed("db_query_seconds", op="record_bet")
     def record_bet(self, bet_data, stake=None):
-        """Record a bet in the database."""
+        """Record a Bet in the database."""
         conn = self._get_connection()
         cursor = conn.cursor()
         
         query = '''
-            INSERT INTO bets (date, time, league, match, bet_type, odds, confidence, reason, stake)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO bets (date, time, league, match, bet_type, odds, confidence, reason, stake, fixture_id, bet_key)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         ''' if self.is_postgres else '''
-            INSERT INTO bets (date, time, league, match, bet_type, odds, confidence, reason, stake)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO bets (date, time, league, match, bet_type, odds, confidence, reason, stake, fixture_id, bet_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         '''
         
         if self.is_postgres:
             query += " RETURNING id"
         
         cursor.execute(query, (
-            bet_data['date'],
-            bet_data['heure'],
-            bet_data['ligue'],
-            bet_data['match'],
-            bet_data['pari'],
-            bet_data['cote'],
-            bet_data['confiance'],
-            bet_data['raison'],
-            stake
+            bet_data.date,
+            bet_data.time,
+            bet_data.league,
+            bet_data.match,
+            bet_data.bet_type,
+            bet_data.odds,
+            bet_data.confidence,
+            bet_data.reason,
+            stake,
+            bet_data.fixture_id,
+            bet_data.bet_key or None
         ))
         
         if self.is_postgres:
@@ -146,11 +509,20 @@ class BetTracker:
             
         conn.commit()
         conn.close()
-        self.logger.info(f"Recorded bet: {bet_data['match']} (ID: {bet_id})")
+        self.logger.info("Recorded bet: %s (ID: %s)", bet_data.match, bet_id)
         return bet_id
     
-    def update_result(self, bet_id, result, profit=0):
-        """Update the result of a bet (won/lost)."""
+    @metrics.timed("db_query_seconds", op="update_result")
+    def update_result(self, bet_id, result, profit=0, only_unsettled=False):
+        """
+        Update the result of a bet (won/lost).
+
+        With only_unsettled=True the update is a no-op if the bet already has a
+        result, which makes repeated settlement requests idempotent.
+
+        Returns:
+            True if the bet was updated
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -177,74 +549,548 @@ class BetTracker:
             SET result = ?, profit = ?
             WHERE id = ?
         '''
+        if only_unsettled:
+            query += " AND result IS NULL"
         
         cursor.execute(query, (result, profit, bet_id))
+        updated = cursor.rowcount > 0
         
         conn.commit()
         conn.close()
-        self.logger.info(f"Updated bet {bet_id}: {result} ({profit}€)")
+        if updated:
+            self.logger.info("Updated bet %s: %s (%s€)", bet_id, result, profit)
+        else:
+            self.logger.info("Bet %s not updated (missing or already settled)", bet_id)
+        return updated
     
-    def get_statistics(self):
-        """Get overall betting statistics."""
+    @metrics.timed("db_query_seconds", op="get_unsettled_bets")
+    def get_unsettled_bets(self):
+        """Bets without a result that can be settled automatically (recorded with their fixture)."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, fixture_id, bet_key, date, time, match, bet_type, odds, stake
+            FROM bets
+            WHERE result IS NULL AND fixture_id IS NOT NULL AND bet_key IS NOT NULL
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        return [
+            {
+                "id": r[0], "fixture_id": r[1], "bet_key": r[2], "date": r[3], "time": r[4],
+                "match": r[5], "bet_type": r[6], "odds": r[7], "stake": r[8],
+            }
+            for r in rows
+        ]
+
+    @metrics.timed("db_query_seconds", op="update_results")
+    def update_results(self, settlements):
+        """
+        Settle many bets in one transaction (the batched form of update_result).
+
+        Bets that already have a result are left alone, so a bet settled
+        manually in the meantime keeps its result.
+
+        Args:
+            settlements: (bet_id, result, profit) tuples
+        Returns:
+            Set of the bet IDs actually updated
+        """
+        if not settlements:
+            return set()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        query = self._sql("UPDATE bets SET result = ?, profit = ? WHERE id = ? AND result IS NULL")
+        updated = set()
+        try:
+            for bet_id, result, profit in settlements:
+                cursor.execute(query, (result, profit, bet_id))
+                if cursor.rowcount > 0:
+                    updated.add(bet_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        self.logger.info("Settled %d bets", len(updated))
+        return updated
+
+    @metrics.timed("db_query_seconds", op="get_realized_profit")
+    def get_realized_profit(self):
+        """Total profit of all settled bets."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(SUM(profit), 0) FROM bets WHERE result IS NOT NULL")
+        profit = cursor.fetchone()[0]
+        conn.close()
+        return profit
+
+    @metrics.timed("db_query_seconds", op="get_breakdown")
+    def get_breakdown(self, dimension=None, since=None, until=None):
+        """
+        Aggregate bet results in SQL, grouped by a report dimension.
+
+        Args:
+            dimension: One of REPORT_DIMENSIONS ("league", "market", "odds",
+                "confidence"), or None for overall totals
+            since, until: Optional date bounds (YYYY-MM-DD), until is exclusive
+
+        Returns:
+            List of dicts with bets, won, lost, staked, profit, win_rate and roi
+        """
+        if dimension is not None and dimension not in REPORT_DIMENSIONS:
+            raise ValueError(f"Unknown report dimension: {dimension}")
+
+        bucket = REPORT_DIMENSIONS[dimension] if dimension else "'total'"
+        query = f'''
+            SELECT {bucket} AS bucket,
+                   COUNT(*),
+                   SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN result = 'lost' THEN 1 ELSE 0 END),
+                   COALESCE(SUM(CASE WHEN result IN ('won', 'lost') THEN stake ELSE 0 END), 0),
+                   COALESCE(SUM(profit), 0)
+            FROM bets
+            WHERE 1 = 1
+        '''
+        params = []
+        if since:
+            query += " AND date >= ?"
+            params.append(since)
+        if until:
+            query += " AND date < ?"
+            params.append(until)
+        query += " GROUP BY 1 ORDER BY 1"
+
         conn = self._get_connection()
-        # pandas read_sql works with psycopg2 connection too
-        df = pd.read_sql_query("SELECT * FROM bets", conn)
+        cursor = conn.cursor()
+        cursor.execute(self._sql(query), params)
+        rows = cursor.fetchall()
         conn.close()
+
+        report = []
+        for key, total, won, lost, staked, profit in rows:
+            settled = won + lost
+            report.append({
+                "key": key,
+                "bets": total,
+                "won": won,
+                "lost": lost,
+                "staked": round(staked, 2),
+                "profit": round(profit, 2),
+                "win_rate": (won / settled * 100) if settled > 0 else 0,
+                "roi": (profit / staked * 100) if staked else 0,
+            })
+        return report
+
+    def get_statistics(self):
+        """Get overall betting statistics."""
+        report = self.get_breakdown()
         
-        if df.empty:
+        if not report:
             return "Aucun pari enregistré."
             
-        total_bets = len(df)
-        won_bets = len(df[df['result'] == 'won'])
-        lost_bets = len(df[df['result'] == 'lost'])
-        win_rate = (won_bets / total_bets * 100) if total_bets > 0 else 0
-        total_profit = df['profit'].sum()
+        totals = report[0]
+        win_rate = (totals['won'] / totals['bets'] * 100) if totals['bets'] > 0 else 0
         
         return f"""
 📊 STATISTIQUES
-Total Paris: {total_bets}
-Gagnés: {won_bets} | Perdus: {lost_bets}
+Total Paris: {totals['bets']}
+Gagnés: {totals['won']} | Perdus: {totals['lost']}
 Win Rate: {win_rate:.1f}%
-Profit Total: {total_profit:.2f}€
+Profit Total: {totals['profit']:.2f}€
         """
-        
-        df.to_csv("bets_export.csv", index=False)
-        self.logger.info("Exported bets to bets_export.csv")
 
-    def add_pending_bet(self, bet_data, fixture_id, match_id):
-        """Add a bet to the pending queue."""
+    def _iter_chunks(self, query, params, chunk_size):
+        """
+        Stream a query result in chunks without materializing it.
+
+        Uses a server-side (named) cursor on Postgres and fetchmany on SQLite.
+        Yields (column_names, rows) for each chunk.
+        """
+        conn = self._get_connection()
+        try:
+            if self.is_postgres:
+                cursor = conn.cursor(name="bet_tracker_export")
+                cursor.itersize = chunk_size
+            else:
+                cursor = conn.cursor()
+            cursor.execute(self._sql(query), params)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                # Named cursors only expose description after the first fetch
+                yield [col[0] for col in cursor.description], rows
+            cursor.close()
+        finally:
+            conn.close()
+
+    @metrics.timed("db_query_seconds", op="export_table")
+    def export_table(self, table, path, fmt="csv", since=None, until=None, chunk_size=1000):
+        """
+        Export a tracker table to a file in constant memory.
+
+        Args:
+            table: One of EXPORT_TABLES ("bets", "pending_bets", "opening_odds",
+                "odds_ticks"; tick prices are in 1/ODDS_PRICE_SCALE units)
+            path: Output file path
+            fmt: "csv" or "parquet" (zstd-compressed, needs pyarrow)
+            since, until: Optional date bounds on the table's date column, until is exclusive
+            chunk_size: Rows fetched and written per chunk
+
+        Returns:
+            Number of rows exported
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        date_col = EXPORT_TABLES[table]
+        if date_col in UNIX_TIME_COLUMNS:
+            since = int(datetime.fromisoformat(str(since)).timestamp()) if since else None
+            until = int(datetime.fromisoformat(str(until)).timestamp()) if until else None
+        query = f"SELECT * FROM {table} WHERE 1 = 1"
+        params = []
+        if since:
+            query += f" AND {date_col} >= ?"
+            params.append(since)
+        if until:
+            query += f" AND {date_col} < ?"
+            params.append(until)
+        query += " ORDER BY 1"
+
+        # Known up front, so empty exports still get a header and every chunk the same schema
+        columns = self._table_columns(table)
+        chunks = self._iter_chunks(query, params, chunk_size)
+        if table == "bets":
+            chunks = self._expand_reasons(chunks)
+        elif table == "pending_bets":
+            chunks = self._decode_bet_records(chunks)
+            columns = [c for c in columns if c[0] != "bet_record"]
+        if fmt == "csv":
+            total = self._write_csv(chunks, path, [name for name, _ in columns])
+        else:
+            total = self._write_parquet(chunks, path, columns)
+
+        self.logger.info("Exported %s rows from %s to %s", total, table, path)
+        return total
+
+    def _table_columns(self, table):
+        """(name, declared type) of a table's columns, in SELECT * order."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        if self.is_postgres:
+            cursor.execute('''
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_name = %s ORDER BY ordinal_position
+            ''', (table,))
+            columns = cursor.fetchall()
+        else:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [(row[1], row[2]) for row in cursor.fetchall()]
+        conn.close()
+        return columns
+
+    def _load_reasons(self, bet_ids):
+        """Rebuild the reason strings of compacted bets from their fragment IDs."""
+        if not bet_ids:
+            return {}
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        parts = {}
+        for i in range(0, len(bet_ids), 500):
+            chunk = bet_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(self._sql(f'''
+                SELECT br.bet_id, rf.fragment
+                FROM bet_reasons br
+                JOIN reason_fragments rf ON rf.id = br.fragment_id
+                WHERE br.bet_id IN ({placeholders})
+                ORDER BY br.bet_id, br.position
+            '''), chunk)
+            for bet_id, fragment in cursor.fetchall():
+                parts.setdefault(bet_id, []).append(fragment)
+        conn.close()
+        return {bet_id: " | ".join(fragments) for bet_id, fragments in parts.items()}
+
+    def _expand_reasons(self, chunks):
+        """Fill in the reason column of compacted bets while streaming an export."""
+        for columns, rows in chunks:
+            id_idx, reason_idx = columns.index("id"), columns.index("reason")
+            reasons = self._load_reasons([row[id_idx] for row in rows if row[reason_idx] is None])
+            if reasons:
+                rows = [
+                    row[:reason_idx] + (reasons.get(row[id_idx]),) + row[reason_idx + 1:]
+                    if row[reason_idx] is None else row
+                    for row in rows
+                ]
+            yield columns, rows
+
+    def _decode_bet_records(self, chunks):
+        """Export binary pending bets as JSON in the bet_data column (and drop bet_record)."""
         import json
+        for columns, rows in chunks:
+            data_idx, record_idx = columns.index("bet_data"), columns.index("bet_record")
+            decoded = []
+            for row in rows:
+                row = list(row)
+                if row[record_idx] is not None:
+                    row[data_idx] = json.dumps(Bet.decode(row[record_idx]).to_dict(), ensure_ascii=False)
+                del row[record_idx]
+                decoded.append(tuple(row))
+            yield [c for c in columns if c != "bet_record"], decoded
+
+    @metrics.timed("db_query_seconds", op="get_bet_reason")
+    def get_bet_reason(self, bet_id):
+        """Get the full reason of a bet, whether or not it has been compacted."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self._sql("SELECT reason FROM bets WHERE id = ?"), (bet_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if row and row[0] is not None:
+            return row[0]
+        return self._load_reasons([bet_id]).get(bet_id)
+
+    def _write_csv(self, chunks, path, columns):
+        total = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for _, rows in chunks:
+                writer.writerows(rows)
+                total += len(rows)
+        return total
+
+    def _write_parquet(self, chunks, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Parquet export requires pyarrow, an optional dependency (see requirements.txt): pip install pyarrow"
+            )
+
+        # Schema from the declared column types: a chunk of NULLs or of whole
+        # numbers in a REAL column must not decide a column's type
+        def arrow_type(declared):
+            declared = declared.upper()
+            if "INT" in declared or "SERIAL" in declared:
+                return pa.int64()
+            if any(t in declared for t in ("REAL", "DOUBLE", "FLOAT", "NUMERIC")):
+                return pa.float64()
+            return pa.string()
+
+        schema = pa.schema([pa.field(name, arrow_type(declared)) for name, declared in columns])
+        string_cols = [i for i, field in enumerate(schema) if pa.types.is_string(field.type)]
+        total = 0
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for _, rows in chunks:
+                values = [list(col) for col in zip(*rows)]
+                for i in string_cols:
+                    # Timestamps come back as datetimes on Postgres, strings on SQLite
+                    values[i] = [v if v is None or isinstance(v, str) else str(v) for v in values[i]]
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(col, type=field.type) for col, field in zip(values, schema)], schema=schema,
+                ))
+                total += len(rows)
+        return total
+
+    @metrics.timed("db_query_seconds", op="record_results")
+    def record_results(self, results):
+        """
+        Store finished fixtures, each one only once.
+
+        Args:
+            results: result_from_fixture tuples
+                (fixture_id, league_id, date, home_id, away_id, home_goals, away_goals)
+        Returns:
+            The results that were not stored yet, oldest first
+        """
+        results = {r[0]: r for r in results if r}
+        if not results:
+            return []
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        known = set()
+        ids = list(results)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cursor.execute(self._sql(
+                f"SELECT fixture_id FROM results WHERE fixture_id IN ({', '.join('?' * len(chunk))})"
+            ), chunk)
+            known.update(row[0] for row in cursor.fetchall())
+
+        new = sorted((r for fid, r in results.items() if fid not in known), key=lambda r: r[2])
+        self._executemany(cursor, '''
+            INSERT INTO results (fixture_id, league_id, date, home_id, away_id, home_goals, away_goals)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (fixture_id) DO NOTHING
+        ''', new)
+        conn.commit()
+        conn.close()
+        if new:
+            self.logger.info("Stored %d new results", len(new))
+        return new
+
+    @metrics.timed("db_query_seconds", op="get_latest_result_date")
+    def get_latest_result_date(self, league_id):
+        """Date (YYYY-MM-DD) of the most recent stored result of a league, or None."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self._sql("SELECT MAX(date) FROM results WHERE league_id = ?"), (league_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0][:10] if row and row[0] else None
+
+    def iter_results(self, chunk_size=1000):
+        """All stored results, oldest first, in the tuple format of record_results."""
+        query = "SELECT fixture_id, league_id, date, home_id, away_id, home_goals, away_goals FROM results ORDER BY date, fixture_id"
+        for _, rows in self._iter_chunks(query, [], chunk_size):
+            yield from rows
+
+    @metrics.timed("db_query_seconds", op="add_pending_bet")
+    def add_pending_bet(self, bet_data, fixture_id, match_id, bet_key=None, fingerprint=None):
+        """
+        Add a Bet to the pending queue, stored as its binary record.
+
+        With a bet_key (fixture:market:selection) this is an upsert: an existing
+        pending row is only rewritten when its fingerprint changed, and bets
+        already sent or rejected are left alone.
+
+        Returns:
+            True if a row was inserted or updated
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        query = "INSERT INTO pending_bets (fixture_id, match_id, bet_data) VALUES (%s, %s, %s)" if self.is_postgres else "INSERT INTO pending_bets (fixture_id, match_id, bet_data) VALUES (?, ?, ?)"
+        try:
+            kickoff = int(bet_data.kickoff)
+        except (TypeError, ValueError):
+            kickoff = None
+
+        query = "INSERT INTO pending_bets (fixture_id, match_id, bet_record, bet_key, fingerprint, kickoff) VALUES (?, ?, ?, ?, ?, ?)"
+        if bet_key is not None:
+            query += '''
+                ON CONFLICT (bet_key) DO UPDATE
+                SET bet_record = excluded.bet_record, bet_data = NULL, fingerprint = excluded.fingerprint,
+                    kickoff = excluded.kickoff
+                WHERE pending_bets.status = 'pending' AND pending_bets.fingerprint <> excluded.fingerprint
+            '''
         
-        cursor.execute(query, (fixture_id, match_id, json.dumps(bet_data)))
+        cursor.execute(self._sql(query), (fixture_id, match_id, bet_data.encode(), bet_key, fingerprint, kickoff))
+        changed = cursor.rowcount > 0
         conn.commit()
         conn.close()
-        self.logger.info(f"Added pending bet for match {match_id}")
+        if changed:
+            self.logger.info("Added pending bet for match %s", match_id)
+        return changed
 
+    @metrics.timed("db_query_seconds", op="get_pending_bets")
     def get_pending_bets(self):
-        """Get all pending bets."""
-        import json
+        """Get all bets still waiting for lineup validation."""
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT id, fixture_id, match_id, bet_data, created_at FROM pending_bets")
+        cursor.execute(f"SELECT {PENDING_COLUMNS} FROM pending_bets WHERE status = 'pending'")
         rows = cursor.fetchall()
         conn.close()
         
-        results = []
-        for row in rows:
-            results.append({
-                "id": row[0],
-                "fixture_id": row[1],
-                "match_id": row[2],
-                "bet_data": json.loads(row[3]),
-                "created_at": row[4]
-            })
-        return results
+        return [self._pending_row(row) for row in rows]
+
+    @staticmethod
+    def _pending_row(row):
+        """Dict for a pending_bets row selected with PENDING_COLUMNS; bet_data is a Bet."""
+        return {
+            "id": row[0],
+            "fixture_id": row[1],
+            "match_id": row[2],
+            "bet_data": Bet.decode(row[3] if row[3] is not None else row[4]),
+            "created_at": row[5],
+            "bet_key": row[6]
+        }
+
+    @metrics.timed("db_query_seconds", op="claim_pending_bets")
+    def claim_pending_bets(self, owner, lease_seconds, fixture_ids=None, limit=None):
+        """
+        Lease pending bets to one worker so concurrent workers never validate the same row.
+
+        Only rows whose lease is free or expired are claimed. On Postgres the
+        candidate rows are locked with FOR UPDATE SKIP LOCKED, so concurrent
+        claims skip each other's rows instead of waiting; on SQLite the claim
+        runs inside a BEGIN IMMEDIATE transaction, which serializes writers.
+
+        Args:
+            owner: Unique token for this claim (worker id plus a nonce)
+            lease_seconds: How long the rows stay reserved if never released
+            fixture_ids: Only claim bets on these fixtures
+            limit: Claim at most this many rows
+        Returns:
+            The claimed rows, in the format of get_pending_bets()
+        """
+        now = int(time.time())
+
+        where = "status = 'pending' AND (lease_until IS NULL OR lease_until < ?)"
+        params = [now]
+        if fixture_ids is not None:
+            fixture_ids = list(fixture_ids)
+            if not fixture_ids:
+                return []
+            where += f" AND fixture_id IN ({', '.join('?' * len(fixture_ids))})"
+            params += fixture_ids
+        candidates = f"SELECT id FROM pending_bets WHERE {where} ORDER BY id"
+        if limit:
+            candidates += f" LIMIT {int(limit)}"
+        columns = PENDING_COLUMNS
+        params = [owner, now + lease_seconds] + params
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            if self.is_postgres:
+                cursor.execute(self._sql(
+                    f"UPDATE pending_bets SET lease_owner = ?, lease_until = ? "
+                    f"WHERE id IN ({candidates} FOR UPDATE SKIP LOCKED) RETURNING {columns}"
+                ), params)
+                rows = cursor.fetchall()
+            else:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(
+                    f"UPDATE pending_bets SET lease_owner = ?, lease_until = ? WHERE id IN ({candidates})", params
+                )
+                cursor.execute(f"SELECT {columns} FROM pending_bets WHERE lease_owner = ? ORDER BY id", (owner,))
+                rows = cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+
+        return [self._pending_row(row) for row in rows]
+
+    @metrics.timed("db_query_seconds", op="release_pending_bet")
+    def release_pending_bet(self, bet_id, owner):
+        """Give a leased bet back (e.g. lineups not out yet) so the next check can claim it right away."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self._sql(
+            "UPDATE pending_bets SET lease_owner = NULL, lease_until = NULL WHERE id = ? AND lease_owner = ?"
+        ), (bet_id, owner))
+        conn.commit()
+        conn.close()
+
+    @metrics.timed("db_query_seconds", op="close_pending_bet")
+    def close_pending_bet(self, bet_id, status):
+        """Mark a pending bet as handled ('sent' or 'rejected') so later cycles don't re-queue it."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self._sql("UPDATE pending_bets SET status = ? WHERE id = ?"), (status, bet_id))
+        conn.commit()
+        conn.close()
 
+    @metrics.timed("db_query_seconds", op="remove_pending_bet")
     def remove_pending_bet(self, bet_id):
         """Remove a pending bet."""
         conn = self._get_connection()
@@ -254,3 +1100,96 @@ Profit Total: {total_profit:.2f}€
         cursor.execute(query, (bet_id,))
         conn.commit()
         conn.close()
+
+    @metrics.timed("db_query_seconds", op="run_maintenance")
+    def run_maintenance(self):
+        """
+        Retention and compaction job for long-running deployments.
+
+        Archives pending_bets rows whose match is long past, drops expired
+        openings and odds ticks, dictionary-encodes the reasons of old settled
+        bets, then reclaims space and refreshes planner statistics.
+
+        Returns:
+            Dictionary with the number of rows affected per step
+        """
+        now = datetime.utcnow()
+        odds_cutoff = (now - timedelta(days=config.ODDS_RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+        pending_cutoff = (now - timedelta(hours=config.PENDING_RETENTION_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+        tick_cutoff = int(time.time()) - config.ODDS_TICK_RETENTION_DAYS * 86400
+        kickoff_cutoff = int(time.time()) - config.PENDING_RETENTION_HOURS * 3600
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        summary = {}
+
+        cursor.execute(self._sql("DELETE FROM opening_odds WHERE created_at < ?"), (odds_cutoff,))
+        summary["opening_odds"] = cursor.rowcount
+
+        cursor.execute(self._sql("DELETE FROM odds_ticks WHERE ts < ?"), (tick_cutoff,))
+        summary["odds_ticks"] = cursor.rowcount
+
+        # Expired on kickoff (creation time only for rows without one), never while a worker holds the lease
+        expired = '''
+            (kickoff < ? OR (kickoff IS NULL AND created_at < ?))
+            AND (lease_until IS NULL OR lease_until < ?)
+        '''
+        params = (kickoff_cutoff, pending_cutoff, int(time.time()))
+        cursor.execute(self._sql(f'''
+            INSERT INTO pending_bets_archive (id, fixture_id, match_id, bet_data, bet_record, created_at, bet_key, fingerprint, status, kickoff)
+            SELECT id, fixture_id, match_id, bet_data, bet_record, created_at, bet_key, fingerprint, status, kickoff
+            FROM pending_bets WHERE {expired}
+            ON CONFLICT (id) DO NOTHING
+        '''), params)
+        cursor.execute(self._sql(f"DELETE FROM pending_bets WHERE {expired}"), params)
+        summary["pending_bets"] = cursor.rowcount
+        conn.commit()
+
+        summary["compacted_reasons"] = self._compact_reasons(cursor, conn)
+        conn.close()
+
+        self._vacuum()
+        self.logger.info("Maintenance done: %s", summary)
+        return summary
+
+    def _compact_reasons(self, cursor, conn, chunk_size=500):
+        """Replace the reason text of old settled bets with fragment IDs."""
+        date_cutoff = (datetime.utcnow() - timedelta(days=config.REASON_COMPACT_DAYS)).strftime("%Y-%m-%d")
+        total = 0
+        while True:
+            cursor.execute(self._sql('''
+                SELECT id, reason FROM bets
+                WHERE reason IS NOT NULL AND result IS NOT NULL AND date < ?
+                ORDER BY id LIMIT ?
+            '''), (date_cutoff, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            split = [(bet_id, reason.split(" | ")) for bet_id, reason in rows]
+            ids = self._intern(
+                cursor, "reason_fragments", "fragment",
+                [f for _, fragments in split for f in fragments], self._fragment_cache
+            )
+            self._executemany(cursor, '''
+                INSERT INTO bet_reasons (bet_id, position, fragment_id) VALUES (?, ?, ?)
+                ON CONFLICT (bet_id, position) DO NOTHING
+            ''', [(bet_id, pos, ids[f]) for bet_id, fragments in split for pos, f in enumerate(fragments)])
+            self._executemany(cursor, "UPDATE bets SET reason = NULL WHERE id = ?", [(bet_id,) for bet_id, _ in rows])
+            conn.commit()
+            total += len(rows)
+        return total
+
+    def _vacuum(self):
+        """Reclaim space and refresh planner statistics (must run outside a transaction)."""
+        conn = self._get_connection()
+        if self.is_postgres:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            for table in ("bets", "opening_odds", "odds_ticks", "pending_bets"):
+                cursor.execute(f"VACUUM ANALYZE {table}")
+        else:
+            conn.isolation_level = None
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+        conn.close()
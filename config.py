@@ -31,3 +31,121 @@ VICTORIES_MIN = 3  # Minimum wins in last 5 games
 # Bankroll Management
 BANKROLL = float(os.getenv("BANKROLL", "100"))  # Default 100€
 KELLY_FRACTION = 0.25  # Quarter Kelly (conservative)
+
+# Odds Tick Store
+ODDS_PRICE_SCALE = 1000  # Fixed-point odds (1.85 -> 1850)
+ODDS_TICK_RAW_HOURS = int(os.getenv("ODDS_TICK_RAW_HOURS", "24"))  # Keep every tick this long
+ODDS_TICK_BUCKET_MINUTES = int(os.getenv("ODDS_TICK_BUCKET_MINUTES", "60"))  # Then one tick per bucket
+
+# Retention & Maintenance
+ODDS_RETENTION_DAYS = int(os.getenv("ODDS_RETENTION_DAYS", "30"))  # opening_odds
+ODDS_TICK_RETENTION_DAYS = int(os.getenv("ODDS_TICK_RETENTION_DAYS", "365"))
+PENDING_RETENTION_HOURS = int(os.getenv("PENDING_RETENTION_HOURS", "48"))  # After kickoff
+REASON_COMPACT_DAYS = int(os.getenv("REASON_COMPACT_DAYS", "7"))  # Settled bets older than this get compacted
+MAINTENANCE_TIME = os.getenv("MAINTENANCE_TIME", "04:00")  # Daily, local time
+
+# Telegram Outbound Queue
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))  # Messages/second across all chats
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1.0"))  # Seconds between messages to one chat
+TELEGRAM_MERGE_WINDOW_MINUTES = int(os.getenv("TELEGRAM_MERGE_WINDOW_MINUTES", "30"))  # Bets kicking off together share a message
+TELEGRAM_BATCH_LINGER = float(os.getenv("TELEGRAM_BATCH_LINGER", "2.0"))  # Seconds to wait for more bets to merge
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # Telegram rejects longer messages: merged bets are split to fit
+
+# Telegram Webhook (polling is used when WEBHOOK_URL is unset)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")  # Override, e.g. a local fake: http://127.0.0.1:8081/bot{0}/{1}
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public base URL, e.g. https://my-app.herokuapp.com
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+
+# Scheduling
+VALIDATION_OFFSETS_MINUTES = (60, 30, 10)  # Lineup checks before each pending bet's kickoff
+VALIDATION_MIN_MINUTES = 5  # Don't send a bet closer to kickoff than this
+LINEUP_WINDOW_MINUTES = 75  # Lineups are usually published about an hour before kickoff
+LINEUP_POLL_MIN_SECONDS = 60  # Re-poll bounds for fixtures whose lineups are not out yet
+LINEUP_POLL_MAX_SECONDS = 600
+ANALYSIS_INTERVAL_HOURS = 2  # On matchdays
+ANALYSIS_IDLE_HOURS = 12  # Longest sleep when no fixture is close
+ANALYSIS_LOOKAHEAD_HOURS = 24  # Matchday mode starts this long before the next kickoff
+PRE_KICKOFF_ANALYSIS_MINUTES = 90  # Refresh picks before each kickoff's lineup window
+
+# Automatic Settlement
+SETTLEMENT_INTERVAL_MINUTES = int(os.getenv("SETTLEMENT_INTERVAL_MINUTES", "60"))
+SETTLEMENT_DELAY_MINUTES = 120  # After kickoff before a bet is looked up
+POSTPONED_VOID_HOURS = 48  # A postponed match not played this long after kickoff is settled void
+FIXTURES_PER_REQUEST = 20  # API-Football limit for fixtures?ids=
+
+# Live (in-play) Monitoring
+LIVE_MODE = os.getenv("LIVE_MODE", "0") == "1"
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "15"))  # Fastest poll while fixtures are in play
+LIVE_IDLE_SECONDS = 300  # Poll interval when nothing is in play
+LIVE_API_CALLS_PER_MINUTE = int(os.getenv("LIVE_API_CALLS_PER_MINUTE", "6"))  # Share of the API quota for live polls, split across workers
+LIVE_MIN_EDGE = 0.05  # Minimum expected value per unit staked
+LIVE_MIN_PROBABILITY = 0.40
+LIVE_MAX_PROBABILITY = 0.97  # The model is never trusted beyond this (a late goal is always possible)
+LIVE_STOPPAGE_MINUTES = 5  # Added time expected after 90' while the API has not reported more
+LIVE_MIN_MINUTES_LEFT = 2  # Time left never drops below this while the match is in play
+LIVE_RECORD_FILE = os.getenv("LIVE_RECORD_FILE")  # Append every live poll here, for replays
+
+# Analysis Pipeline (workers per stage, bounded queues between stages)
+PIPELINE_WORKERS = {
+    "fetch": 2,     # League fixtures/standings/scorers (HTTP)
+    "enrich": 4,    # Team stats (HTTP)
+    "features": 1,  # Market odds + batched dropping-odds check (DB)
+    "analysis": 1,  # Market analyzers: pure Python, a second thread only contends for the GIL
+}
+PIPELINE_QUEUE_SIZE = 32
+PIPELINE_FEATURE_BATCH = 50  # Fixtures per dropping-odds round-trip
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")  # Per-league snapshot files, shared by all workers on the host
+
+# Startup
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))  # Warn when a cold start is slower
+
+# Metrics
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus /metrics endpoint, 0 = disabled
+CYCLE_SUMMARY_FILE = os.getenv("CYCLE_SUMMARY_FILE", "cycle_metrics.jsonl")  # One JSON record per analysis cycle
+
+# Logging (JSON lines file written by a background thread)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "bot.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # Rotate at this size...
+LOG_ROTATE_HOURS = int(os.getenv("LOG_ROTATE_HOURS", "24"))  # ...or this often, 0 = size only
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = 10000  # Records waiting for the writer; more are dropped rather than block
+
+# Profiling
+ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID", TELEGRAM_CHAT_ID)  # Only chat allowed to run admin commands
+PROFILE_CYCLES = [c.strip() for c in os.getenv("PROFILE_CYCLES", "").split(",") if c.strip()]  # Profile the next run of these cycles, e.g. "analysis,validation"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "10"))
+
+# Horizontal Scaling
+# Heroku names dynos web.1, worker.1, worker.2, ...; elsewhere set WORKER_INDEX (0-based) explicitly.
+# Polling: worker.1 is the leader; a web dyno has nothing to do and exits at startup.
+# Webhook: only the web dyno receives HTTP traffic, so web.1 is the leader and worker.N follow it.
+_DYNO_TYPE, _, _DYNO_NUMBER = os.getenv("DYNO", "").rpartition(".")
+IS_WEB_DYNO = _DYNO_TYPE == "web"
+if IS_WEB_DYNO and WEBHOOK_URL:
+    _DYNO_INDEX = 0
+elif _DYNO_NUMBER.isdigit():
+    _DYNO_INDEX = int(_DYNO_NUMBER) - (0 if WEBHOOK_URL else 1)
+else:
+    _DYNO_INDEX = 0
+WORKER_INDEX = int(os.getenv("WORKER_INDEX", _DYNO_INDEX))
+WORKER_COUNT = int(os.getenv("WORKER_COUNT", "1"))  # Must match the number of running dynos (web included in webhook mode)
+LEASE_SECONDS = int(os.getenv("LEASE_SECONDS", "300"))  # A claimed pending bet is free again after this
+
+# Bet Selection
+TOP_BETS = int(os.getenv("TOP_BETS", "5"))  # Bets kept per analysis cycle, all workers together (ceil(TOP_BETS / WORKER_COUNT) each)
+MAX_BETS_PER_FIXTURE = int(os.getenv("MAX_BETS_PER_FIXTURE", "2"))  # 0 = no cap
+MAX_BETS_PER_LEAGUE = int(os.getenv("MAX_BETS_PER_LEAGUE", "3"))
+MAX_BETS_PER_MARKET = int(os.getenv("MAX_BETS_PER_MARKET", "3"))  # Market = API bet id (1X2, goals, BTTS, scorer)
+MIN_EXPECTED_VALUE = float(os.getenv("MIN_EXPECTED_VALUE", "-1.0"))  # confidence/100 * odds - 1; -1.0 = no filter (0.0 would drop low-odds picks such as Over 1.5 at 1.20)
+
+# Team Ratings
+RATINGS_ALPHA = float(os.getenv("RATINGS_ALPHA", "0.15"))  # Weight of the newest result in the goal averages
+RATINGS_MIN_MATCHES = int(os.getenv("RATINGS_MIN_MATCHES", "4"))  # Results needed at each venue (home and away), else the teams/statistics API is used
+RATINGS_PRIOR_HOME_GOALS = 1.5  # Starting goal averages of a team without results
+RATINGS_PRIOR_AWAY_GOALS = 1.2
@@ -0,0 +1,93 @@
+import logging
+import math
+
+import config
+
+MAX_GOALS = 10  # Remaining goals per side considered
+OVER_LINES = (0.5, 1.5, 2.5, 3.5, 4.5, 5.5)
+
+class InPlayModel:
+    """
+    Match probabilities updated while a fixture is played.
+
+    Goals still to come follow a Poisson law per side whose mean is the
+    pre-match expectation scaled by the share of playing time left, added
+    time included (never less than LIVE_MIN_MINUTES_LEFT in play). The
+    pre-match expectation is computed once per fixture; an update only
+    redoes the small remaining-goals grid for the new minute and score.
+    Probabilities are for the 90-minute result, like the settlement.
+    """
+
+    def __init__(self, analyzer, ratings=None):
+        self.analyzer = analyzer
+        self.ratings = ratings
+        self._priors = {}  # fixture_id -> (home_xg, away_xg)
+        self.logger = logging.getLogger(__name__)
+
+    def prior(self, fixture_id, home_id, away_id):
+        """Pre-match expected goals (home, away), from the team ratings when available."""
+        prior = self._priors.get(fixture_id)
+        if prior is None:
+            home_stats = self.ratings.stats(home_id) if self.ratings else None
+            away_stats = self.ratings.stats(away_id) if self.ratings else None
+            if home_stats and away_stats:
+                prior = self.analyzer.expected_goals(home_stats, away_stats)
+            else:
+                prior = (config.RATINGS_PRIOR_HOME_GOALS, config.RATINGS_PRIOR_AWAY_GOALS)
+            self._priors[fixture_id] = prior
+        return prior
+
+    def update(self, fixture_id, home_id, away_id, minute, home_goals, away_goals, extra=None):
+        """
+        Args:
+            minute: Elapsed minutes as reported by the API (stops at 45/90)
+            extra: Added time played so far (status.extra), if any
+        Returns:
+            {(market_id, selection): probability} for 1X2, BTTS and the
+            goal lines, with market ids as in bet keys
+        """
+        home_xg, away_xg = self.prior(fixture_id, home_id, away_id)
+        left = time_left(minute, extra) / (90 + config.LIVE_STOPPAGE_MINUTES)
+        home_pmf = _poisson(home_xg * left)
+        away_pmf = _poisson(away_xg * left)
+
+        probs = dict.fromkeys([(1, "Home"), (1, "Draw"), (1, "Away"), (8, "Yes")], 0.0)
+        totals = [0.0] * (2 * MAX_GOALS + 1)
+        for i, p_home in enumerate(home_pmf):
+            final_home = home_goals + i
+            for j, p_away in enumerate(away_pmf):
+                p = p_home * p_away
+                final_away = away_goals + j
+                if final_home > final_away:
+                    probs[(1, "Home")] += p
+                elif final_home == final_away:
+                    probs[(1, "Draw")] += p
+                else:
+                    probs[(1, "Away")] += p
+                if final_home > 0 and final_away > 0:
+                    probs[(8, "Yes")] += p
+                totals[i + j] += p
+
+        probs[(8, "No")] = 1 - probs[(8, "Yes")]
+        scored = home_goals + away_goals
+        for line in OVER_LINES:
+            over = sum(p for extra, p in enumerate(totals) if scored + extra > line)
+            probs[(5, f"Over {line}")] = over
+            probs[(5, f"Under {line}")] = 1 - over
+        return probs
+
+    def forget(self, fixture_id):
+        self._priors.pop(fixture_id, None)
+
+def time_left(minute, extra=None):
+    """Minutes still to play, counting the expected added time after 90'."""
+    played = min(minute or 0, 90) + (extra or 0)
+    return max(90 + config.LIVE_STOPPAGE_MINUTES - played, config.LIVE_MIN_MINUTES_LEFT)
+
+def _poisson(lmbda):
+    """P(0..MAX_GOALS-1) of a Poisson law, the tail folded into the last value."""
+    pmf = [math.exp(-lmbda)]
+    for k in range(1, MAX_GOALS):
+        pmf.append(pmf[-1] * lmbda / k)
+    pmf[-1] += max(0.0, 1 - sum(pmf))
+    return pmf
@@ -57,6 +57,13 @@ class KellyCriterion:
         """Update the bankroll amount."""
         self.bankroll = new_bankroll
     
+    def apply(self, bet):
+        """Set a Bet's stake and recommendation text; returns the bet."""
+        stake_info = self.get_recommendation(bet.odds, bet.confidence)
+        bet.stake = stake_info['stake']
+        bet.recommendation = stake_info['recommendation']
+        return bet
+
     def get_recommendation(self, odds, confidence):
         """
         Get a human-readable betting recommendation.
@@ -0,0 +1,217 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+from analyzer import fingerprint
+
+DEFAULT_RANK = 10  # Middle of the table for teams missing from the standings
+
+# File layout v1: header, rank table, stats index, meta JSON, stats JSON blobs.
+# Both tables are sorted by team id so readers binary-search them in place.
+MAGIC = b"LSNP"
+VERSION = 1
+_HEADER = struct.Struct("<4sBqdIII")  # magic, version, league_id, built_at, ranks, stats, meta length
+_RANK = struct.Struct("<qI")  # team_id, rank
+_STATS = struct.Struct("<qII")  # team_id, blob offset, blob length
+
+class LeagueSnapshot:
+    """
+    Immutable context of one league for one analysis cycle: standings,
+    top scorers and team stats, indexed by team ID and player name.
+
+    Built once per league per cycle and published through a SnapshotStore,
+    so other threads and worker processes read it instead of refetching.
+    """
+
+    __slots__ = ("league_id", "league_name", "built_at", "top_scorers", "scorers_fp", "_ranks", "_stats", "_scorers")
+
+    def __init__(self, league_id, league_name, ranks, top_scorers, team_stats, built_at=None, scorers_fp=None):
+        """
+        Args:
+            ranks: {team_id: rank}
+            top_scorers: Top scorers in the API's players/topscorers shape
+            team_stats: {team_id: stats in the teams/statistics shape}
+        """
+        self.league_id = league_id
+        self.league_name = league_name
+        self.built_at = built_at or time.time()
+        self.top_scorers = tuple(top_scorers)
+        self.scorers_fp = scorers_fp or fingerprint(list(self.top_scorers))
+        self._ranks = dict(ranks)
+        self._stats = dict(team_stats)
+        self._scorers = {s["player"]["name"]: s for s in self.top_scorers}
+
+    @classmethod
+    def build(cls, league_id, league_name, standings, top_scorers, ratings=None):
+        """
+        Args:
+            standings: Standings rows from the API
+            ratings: TeamRatings for the team stats (teams without enough results are left out)
+        """
+        ranks = {row["team"]["id"]: row["rank"] for row in standings}
+        team_stats = {}
+        if ratings:
+            for team_id in ranks:
+                stats = ratings.stats(team_id)
+                if stats is not None:
+                    team_stats[team_id] = stats
+        return cls(league_id, league_name, ranks, top_scorers, team_stats)
+
+    def rank(self, team_id):
+        return self._ranks.get(team_id, DEFAULT_RANK)
+
+    def stats(self, team_id):
+        """Team stats, or None when the snapshot has none for this team."""
+        return self._stats.get(team_id)
+
+    def scorer(self, player_name):
+        return _find_scorer(self._scorers, self.top_scorers, player_name)
+
+    def encode(self):
+        """Serialize to the current snapshot file version."""
+        ranks = sorted(self._ranks.items())
+        blobs, index, offset = [], [], 0
+        for team_id, stats in sorted(self._stats.items()):
+            blob = json.dumps(stats, separators=(",", ":")).encode("utf-8")
+            index.append(_STATS.pack(team_id, offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+        meta = json.dumps({
+            "league_name": self.league_name,
+            "scorers_fp": self.scorers_fp,
+            "top_scorers": list(self.top_scorers),
+        }, separators=(",", ":")).encode("utf-8")
+
+        parts = [_HEADER.pack(MAGIC, VERSION, self.league_id, self.built_at, len(ranks), len(index), len(meta))]
+        parts.extend(_RANK.pack(team_id, rank) for team_id, rank in ranks)
+        parts.extend(index)
+        parts.append(meta)
+        parts.extend(blobs)
+        return b"".join(parts)
+
+class MappedSnapshot:
+    """
+    Read-only view of a snapshot file through mmap.
+
+    Rank and stats lookups binary-search the tables in the mapping; only the
+    stats of the requested team (and the meta block, once) are decoded.
+    Same lookup interface as LeagueSnapshot.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, self.league_id, self.built_at, self._n_ranks, self._n_stats, meta_len = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported snapshot file: {path}")
+        self._ranks_at = _HEADER.size
+        self._stats_at = self._ranks_at + self._n_ranks * _RANK.size
+        meta_at = self._stats_at + self._n_stats * _STATS.size
+        self._blobs_at = meta_at + meta_len
+        meta = json.loads(bytes(self._view[meta_at:self._blobs_at]))
+        self.league_name = meta["league_name"]
+        self.scorers_fp = meta["scorers_fp"]
+        self.top_scorers = tuple(meta["top_scorers"])
+        self._scorers = {s["player"]["name"]: s for s in self.top_scorers}
+
+    def _search(self, table_at, count, record, team_id):
+        """Unpacked record of team_id in a sorted table, or None."""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = record.unpack_from(self._view, table_at + mid * record.size)
+            if row[0] < team_id:
+                lo = mid + 1
+            elif row[0] > team_id:
+                hi = mid
+            else:
+                return row
+        return None
+
+    def rank(self, team_id):
+        row = self._search(self._ranks_at, self._n_ranks, _RANK, team_id)
+        return row[1] if row else DEFAULT_RANK
+
+    def stats(self, team_id):
+        row = self._search(self._stats_at, self._n_stats, _STATS, team_id)
+        if row is None:
+            return None
+        start = self._blobs_at + row[1]
+        return json.loads(bytes(self._view[start:start + row[2]]))
+
+    def scorer(self, player_name):
+        return _find_scorer(self._scorers, self.top_scorers, player_name)
+
+def _find_scorer(by_name, top_scorers, player_name):
+    """Top scorer entry for a bookmaker player name: exact name first, then a partial match."""
+    scorer = by_name.get(player_name)
+    if scorer is not None:
+        return scorer
+    for scorer in top_scorers:
+        name = scorer["player"]["name"]
+        if name in player_name or player_name in name:
+            return scorer
+    return None
+
+class SnapshotStore:
+    """
+    League snapshots shared across threads (in memory) and worker processes
+    (one memory-mapped file per league in `directory`).
+
+    Files are replaced atomically, so a reader keeps a consistent mapping
+    of the previous snapshot until it picks up the new file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._local = {}  # league_id -> LeagueSnapshot built by this process
+        self._mapped = {}  # league_id -> (file identity, MappedSnapshot)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _path(self, league_id):
+        return os.path.join(self.directory, f"league_{league_id}.snap")
+
+    def publish(self, snapshot):
+        with self._lock:
+            self._local[snapshot.league_id] = snapshot
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(snapshot.league_id)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(snapshot.encode())
+            os.replace(tmp, path)
+        except OSError as e:
+            self.logger.error("Could not write snapshot of %s: %s", snapshot.league_name, e)
+
+    def get(self, league_id):
+        """Latest snapshot of a league (built here or by another worker), or None."""
+        with self._lock:
+            local = self._local.get(league_id)
+        if local is not None:
+            return local
+
+        path = self._path(league_id)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        identity = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            cached = self._mapped.get(league_id)
+            if cached and cached[0] == identity:
+                return cached[1]
+        try:
+            snapshot = MappedSnapshot(path)
+        except (OSError, ValueError) as e:
+            self.logger.error("Could not read snapshot %s: %s", path, e)
+            return None
+        with self._lock:
+            self._mapped[league_id] = (identity, snapshot)
+        return snapshot
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+
+import config
+from metrics import metrics
+
+class LineupCache:
+    """
+    Starting lineups of upcoming fixtures, fetched in multi-fixture requests.
+
+    Fixtures without cached lineups are looked up together (fixtures?ids=
+    returns lineups too), so a full matchday kicking off at once costs one
+    call instead of one per pending bet. Published lineups are kept until
+    kickoff. For fixtures whose lineups are not out yet, next_poll() spaces
+    the checks by the time left before the validation deadline.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self._lineups = {}  # fixture_id -> (kickoff, lineups)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def get_many(self, kickoffs, now=None):
+        """
+        Args:
+            kickoffs: {fixture_id: kickoff as a Unix time}
+        Returns:
+            {fixture_id: lineups} for the fixtures whose lineups are published
+        """
+        now = now or time.time()
+        with self._lock:
+            for fixture_id in [fid for fid, (kickoff, _) in self._lineups.items() if kickoff < now]:
+                del self._lineups[fixture_id]
+            missing = [fid for fid in kickoffs if fid not in self._lineups]
+
+        metrics.inc("lineup_cache_total", len(kickoffs) - len(missing), result="hit")
+        if missing:
+            fetched = self.api.get_fixtures_by_ids(missing)
+            found = 0
+            with self._lock:
+                for fixture_obj in fetched:
+                    fixture_id = fixture_obj["fixture"]["id"]
+                    lineups = fixture_obj.get("lineups") or []
+                    if fixture_id in kickoffs and len(lineups) >= 2:
+                        self._lineups[fixture_id] = (kickoffs[fixture_id], lineups)
+                        found += 1
+            metrics.inc("lineup_cache_total", len(missing), result="miss")
+            self.logger.info("Lineups published for %s/%d fixtures", found, len(missing))
+
+        with self._lock:
+            return {fid: self._lineups[fid][1] for fid in kickoffs if fid in self._lineups}
+
+    def next_poll(self, kickoff, now=None):
+        """
+        When to look again for lineups that are not out yet: a quarter of the
+        time left before the last validation, within the configured bounds.
+        """
+        now = now or time.time()
+        remaining = kickoff - config.VALIDATION_MIN_MINUTES * 60 - now
+        delay = min(max(remaining / 4, config.LINEUP_POLL_MIN_SECONDS), config.LINEUP_POLL_MAX_SECONDS)
+        return now + delay
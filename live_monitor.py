@@ -0,0 +1,289 @@
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+if __name__ == "__main__":
+    # An offline replay never calls Telegram or the API: don't require their credentials
+    for name in ("TELEGRAM_TOKEN", "TELEGRAM_CHAT_ID", "API_KEY"):
+        os.environ.setdefault(name, "replay")
+
+import config
+from bet_record import Bet
+
+# In-play odds market names (odds/live) -> market ids used in bet keys
+LIVE_MARKETS = {
+    "Fulltime Result": 1,
+    "Match Winner": 1,
+    "Both Teams To Score": 8,
+    "Both Teams Score": 8,
+    "Over/Under Line": 5,
+    "Match Goals": 5,
+    "Goals Over/Under": 5,
+}
+
+def parse_live_odds(entry):
+    """{(market_id, selection): odd} of one odds/live entry, suspended prices left out."""
+    odds = {}
+    for market in entry.get("odds") or []:
+        market_id = LIVE_MARKETS.get(market.get("name"))
+        if market_id is None:
+            continue
+        for value in market.get("values") or []:
+            if value.get("suspended"):
+                continue
+            selection = value["value"]
+            if market_id == 5:
+                if value.get("handicap") and " " not in selection:
+                    selection = f"{selection} {value['handicap']}"
+                if selection.split(" ")[0] not in ("Over", "Under"):
+                    continue
+            try:
+                odds[(market_id, selection)] = float(value["odd"])
+            except (TypeError, ValueError):
+                continue
+    return odds
+
+class LiveState:
+    """What the previous poll saw of one fixture."""
+
+    __slots__ = ("status", "minute", "extra", "home_goals", "away_goals", "odds")
+
+    def __init__(self, status, minute, extra, home_goals, away_goals, odds):
+        self.status = status
+        self.minute = minute
+        self.extra = extra
+        self.home_goals = home_goals
+        self.away_goals = away_goals
+        self.odds = odds
+
+class LiveMonitor:
+    """
+    In-play monitoring of this worker's leagues.
+
+    Each poll costs two calls (live fixtures, then live odds only if a
+    fixture is in play) and is compared with the previous one: fixtures
+    whose score, minute and odds didn't move are skipped, the model is only
+    re-run on a score/minute/status change, and otherwise only the prices
+    that changed are re-evaluated. The poll interval keeps the worker within
+    its share of LIVE_API_CALLS_PER_MINUTE.
+
+    Polls can be recorded to a JSON lines file and replayed with ReplayFeed.
+    """
+
+    CALLS_PER_POLL = 2
+
+    def __init__(self, api, model, leagues, on_value=None, record_path=None, clock=time.time, sleep=time.sleep):
+        """
+        Args:
+            api: FootballAPI, or a ReplayFeed
+            model: InPlayModel
+            leagues: {name: id} to monitor
+            on_value: Called with each value Bet found
+            record_path: JSON lines file each poll's responses are appended to
+        """
+        self.api = api
+        self.model = model
+        self.leagues = leagues
+        self.league_ids = set(leagues.values())
+        self.on_value = on_value
+        self.record_path = record_path
+        self.clock = clock
+        self.sleep = sleep
+        self.logger = logging.getLogger(__name__)
+
+        self.states = {}  # fixture_id -> LiveState
+        self.probs = {}  # fixture_id -> model probabilities
+        self.alerted = set()  # bet keys already sent
+        self.polls = 0
+        self.skipped = 0  # fixtures unchanged since the previous poll
+        self._live = False
+
+    def poll(self):
+        """One poll: fetch, diff and evaluate. Returns the value bets found."""
+        fixtures = self.api.get_live_fixtures(sorted(self.league_ids))
+        fixtures = [f for f in fixtures if f["league"]["id"] in self.league_ids]
+        odds = self.api.get_live_odds() if fixtures else []
+        self.polls += 1
+        self._live = bool(fixtures)
+        if self.record_path and fixtures:
+            self._record(fixtures, odds)
+        return self.process(fixtures, odds)
+
+    def process(self, fixtures, odds_entries):
+        odds_by_fixture = {e["fixture"]["id"]: parse_live_odds(e) for e in odds_entries}
+        values = []
+        live_ids = set()
+        for fixture_obj in fixtures:
+            try:
+                values.extend(self._process_fixture(fixture_obj, odds_by_fixture))
+                live_ids.add(fixture_obj["fixture"]["id"])
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error("Error processing live fixture: %s", e)
+
+        # Finished (or no longer listed) fixtures
+        for fixture_id in set(self.states) - live_ids:
+            del self.states[fixture_id]
+            self.probs.pop(fixture_id, None)
+            self.model.forget(fixture_id)
+            self.alerted = {key for key in self.alerted if not key.startswith(f"{fixture_id}:")}
+        return values
+
+    def _process_fixture(self, fixture_obj, odds_by_fixture):
+        fixture = fixture_obj["fixture"]
+        fixture_id = fixture["id"]
+        goals = fixture_obj["goals"]
+        previous = self.states.get(fixture_id)
+        # Odds missing from this poll: keep the last prices seen
+        odds = odds_by_fixture.get(fixture_id, previous.odds if previous else {})
+        state = LiveState(
+            fixture["status"]["short"], fixture["status"]["elapsed"] or 0, fixture["status"].get("extra") or 0,
+            goals["home"] or 0, goals["away"] or 0, odds,
+        )
+        self.states[fixture_id] = state
+
+        match_changed = previous is None or (
+            (previous.status, previous.minute, previous.extra, previous.home_goals, previous.away_goals)
+            != (state.status, state.minute, state.extra, state.home_goals, state.away_goals)
+        )
+        if match_changed:
+            self.probs[fixture_id] = self.model.update(
+                fixture_id, fixture_obj["teams"]["home"]["id"], fixture_obj["teams"]["away"]["id"],
+                state.minute, state.home_goals, state.away_goals, state.extra,
+            )
+            changed = odds.keys()
+        else:
+            changed = [key for key, odd in odds.items() if previous.odds.get(key) != odd]
+            if not changed:
+                self.skipped += 1
+                return []
+
+        probs = self.probs[fixture_id]
+        values = []
+        for key in changed:
+            bet = self._evaluate(fixture_obj, state, key, probs.get(key), odds[key])
+            if bet is not None:
+                values.append(bet)
+        return values
+
+    def _evaluate(self, fixture_obj, state, key, prob, odd):
+        """A Bet when the price beats the model by LIVE_MIN_EDGE, once per selection and match."""
+        if prob is None:
+            return None
+        # A near-certain model outcome would otherwise get the maximum Kelly stake
+        prob = min(prob, config.LIVE_MAX_PROBABILITY)
+        if prob < config.LIVE_MIN_PROBABILITY or prob * odd - 1 < config.LIVE_MIN_EDGE:
+            return None
+        market_id, selection = key
+        fixture_id = fixture_obj["fixture"]["id"]
+        bet_key = f"{fixture_id}:{market_id}:{selection}"
+        if bet_key in self.alerted:
+            return None
+        self.alerted.add(bet_key)
+
+        home = fixture_obj["teams"]["home"]["name"]
+        away = fixture_obj["teams"]["away"]["name"]
+        kickoff = datetime.fromisoformat(fixture_obj["fixture"]["date"].replace("Z", "+00:00")).astimezone()
+        return Bet(
+            f"{home} vs {away}",
+            kickoff.strftime("%Y-%m-%d"), kickoff.strftime("%H:%M"),
+            fixture_obj["league"]["name"],
+            _bet_type(market_id, selection, home, away),
+            odd,
+            int(round(prob * 100)),
+            f"⚡ En direct {_minute_label(state)} ({state.home_goals}-{state.away_goals}) | 📊 Probabilité modèle {prob:.0%} pour une cote de {odd}",
+            fixture_id=fixture_id,
+            match_id=f"live_{fixture_id}",
+            bet_key=bet_key,
+        )
+
+    def interval(self):
+        """Seconds until the next poll, within this worker's share of the per-minute quota."""
+        if not self._live:
+            return config.LIVE_IDLE_SECONDS
+        budget = config.LIVE_API_CALLS_PER_MINUTE / config.WORKER_COUNT
+        delay = max(config.LIVE_POLL_SECONDS, 60 * self.CALLS_PER_POLL / budget)
+        # The API reports what is left of the current minute: wait for the next one if it's not enough
+        remaining = getattr(self.api, "minute_remaining", None)
+        if remaining is not None and remaining < self.CALLS_PER_POLL:
+            delay = max(delay, 60 - self.clock() % 60)
+        return delay
+
+    def run(self, stop=None, max_polls=None):
+        """
+        Poll until `stop` (a threading.Event) is set, `max_polls` is reached
+        or a replayed feed runs out.
+        """
+        self.logger.info("Live monitoring started for %d leagues", len(self.leagues))
+        while not (stop and stop.is_set()) and (max_polls is None or self.polls < max_polls):
+            if getattr(self.api, "exhausted", False):
+                break
+            try:
+                for bet in self.poll():
+                    self.logger.info("Live value: %r", bet)
+                    if self.on_value:
+                        self.on_value(bet)
+            except Exception as e:
+                self.logger.error("Live poll error: %s", e)
+            self.sleep(self.interval())
+        self.logger.info("Live monitoring stopped after %s polls (%s unchanged fixtures skipped)", self.polls, self.skipped)
+
+    def _record(self, fixtures, odds):
+        try:
+            with open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"t": self.clock(), "fixtures": fixtures, "odds": odds}, separators=(",", ":")) + "\n")
+        except OSError as e:
+            self.logger.error("Could not record live poll: %s", e)
+
+def _minute_label(state):
+    return f"{state.minute}+{state.extra}'" if state.extra else f"{state.minute}'"
+
+def _bet_type(market_id, selection, home, away):
+    if market_id == 1:
+        return {"Home": f"Victoire {home}", "Away": f"Victoire {away}"}.get(selection, "Match nul")
+    if market_id == 8:
+        return "Les 2 équipes marquent" if selection == "Yes" else "Les 2 équipes ne marquent pas"
+    side, _, line = selection.partition(" ")
+    return f"{'Plus' if side == 'Over' else 'Moins'} de {line} Buts"
+
+class ReplayFeed:
+    """
+    Stand-in for FootballAPI's live endpoints that plays back polls recorded
+    by LiveMonitor (one JSON object per line: fixtures and odds responses).
+    """
+
+    def __init__(self, path):
+        with open(path, encoding="utf-8") as f:
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.position = 0
+        self.minute_remaining = None
+
+    @property
+    def exhausted(self):
+        return self.position >= len(self.frames)
+
+    def get_live_fixtures(self, league_ids):
+        if self.exhausted:
+            return []
+        self.position += 1
+        return self.frames[self.position - 1]["fixtures"]
+
+    def get_live_odds(self):
+        return self.frames[self.position - 1]["odds"] if self.position else []
+
+if __name__ == "__main__":
+    # Replay a recorded feed offline: python live_monitor.py --replay live_feed.jsonl
+    from analyzer import BetAnalyzer
+    from inplay_model import InPlayModel
+
+    parser = argparse.ArgumentParser(description="Replay recorded in-play polls through the live model")
+    parser.add_argument("--replay", required=True, help="JSON lines file recorded with LIVE_RECORD_FILE")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    feed = ReplayFeed(args.replay)
+    league_ids = {f["league"]["name"]: f["league"]["id"] for frame in feed.frames for f in frame["fixtures"]}
+    monitor = LiveMonitor(feed, InPlayModel(BetAnalyzer()), league_ids, sleep=lambda seconds: None)
+    monitor.run()
@@ -0,0 +1,115 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from datetime import date, datetime
+
+import config
+from metrics import metrics
+
+CONSOLE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Log arguments of these types can't change before the writer thread formats them
+IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None), date)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, thread, worker, message (and traceback)."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "worker": config.WORKER_INDEX,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file would exceed max_bytes or every rotate_seconds, whichever comes first."""
+
+    def __init__(self, filename, max_bytes, backup_count, rotate_seconds):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_seconds = rotate_seconds
+        # Counted from the file's first record, so a restart doesn't postpone the rotation
+        self.rollover_at = self._started_at() + rotate_seconds if rotate_seconds else None
+
+    def _started_at(self):
+        """Time of the first record in the current file (now for a new or unreadable file)."""
+        try:
+            with open(self.baseFilename, encoding="utf-8") as f:
+                first = f.readline()
+            return datetime.fromisoformat(json.loads(first)["ts"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return time.time()
+
+    def shouldRollover(self, record):
+        if self.rollover_at and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_seconds:
+            self.rollover_at = time.time() + self.rotate_seconds
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread as they are: message formatting,
+    JSON encoding and disk I/O all happen off the caller's thread. Never
+    blocks: when the queue is full the record is dropped and counted.
+
+    Records with mutable arguments (lists, dicts, objects) are the exception:
+    their message is formatted right away, since the caller may change them
+    before the writer gets to the record.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        if args:
+            values = args.values() if isinstance(args, dict) else args
+            if not all(isinstance(value, IMMUTABLE_ARGS) for value in values):
+                record = copy.copy(record)
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("log_records_dropped_total")
+
+def setup_logging():
+    """
+    Route all logging through a bounded queue to a background writer (JSON
+    lines to LOG_FILE with rotation, plain text to the console).
+
+    Returns:
+        The running QueueListener (stopped, and flushed, at exit)
+    """
+    file_handler = RotatingLogHandler(
+        config.LOG_FILE, config.LOG_MAX_BYTES, config.LOG_BACKUP_COUNT, config.LOG_ROTATE_HOURS * 3600,
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(config.LOG_LEVEL)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,359 +1,296 @@
 import time
-import schedule
+
+# Cold-start clock, started before any other import
+_BOOT = time.perf_counter()
+
 import logging
-from datetime import datetime
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
 
 import config
-from api_client import FootballAPI
-from analyzer import BetAnalyzer
-from telegram_bot import BettingBot
-from bet_tracker import BetTracker
-from kelly_criterion import KellyCriterion
-
-# Configure Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log"),
-        logging.StreamHandler()
-    ]
-)
+from app_context import AppContext
+from log_setup import setup_logging
+from analysis_cycle import AnalysisCycle
+from metrics import metrics, start_http_server
+from settlement import Settlement
+from team_ratings import result_from_fixture
+
+# Configure Logging (queued, written by a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-def run_analysis():
+def run_analysis(ctx):
     logger.info("Starting analysis cycle...")
-    
-    api = FootballAPI()
-    analyzer = BetAnalyzer()
-    bot = BettingBot()
-    tracker = BetTracker()
-    kelly = KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
-    
-    all_bets = []
-    
-    for league_name, league_id in config.LEAGUES.items():
-        logger.info(f"Checking {league_name}...")
-        
-        # 0. Get Top Scorers & Standings (Cached for this run)
-        top_scorers = api.get_top_scorers(league_id)
-        standings = api.get_standings(league_id)
-        
-        # Helper to find rank
-        def get_rank(team_id, standings_list):
-            for row in standings_list:
-                if row['team']['id'] == team_id:
-                    return row['rank']
-            return 10 # Default middle rank if not found
-        
-        # 1. Get Fixtures with Odds
-        fixtures = api.get_fixtures_with_odds(league_id)
-        
-        if not fixtures:
-            logger.warning(f"No fixtures found for {league_name}")
-            continue
-            
-        for fixture_obj in fixtures:
-            try:
-                fixture = fixture_obj["fixture"]
-                
-                # Date Filter (Next 3 days)
-                match_date = datetime.fromisoformat(fixture["date"].replace("Z", "+00:00"))
-                if match_date > datetime.now(match_date.tzinfo) + datetime.timedelta(days=3):
-                    continue
-
-                # Check Odds availability
-                if not fixture_obj.get("bookmakers"):
-                    continue
-                    
-                odds = fixture_obj["bookmakers"][0]["bets"][0]["values"]
-                home_odd = next((float(o["odd"]) for o in odds if o["value"] == "Home"), 0)
-                away_odd = next((float(o["odd"]) for o in odds if o["value"] == "Away"), 0)
-                
-                if home_odd == 0 or away_odd == 0:
-                    continue
 
-                # Get Team Stats
-                home_team = fixture_obj["teams"]["home"]
-                away_team = fixture_obj["teams"]["away"]
-                
-                home_stats = api.get_team_stats(home_team["id"], league_id)
-                away_stats = api.get_team_stats(away_team["id"], league_id)
-                
-                if not home_stats or not away_stats:
-                    continue
-                
-                # --- LEVEL 3: DROPPING ODDS CHECK ---
-                # Create a unique match ID (e.g., "2024-05-20_PSG_Lyon")
-                match_id = f"{fixture['date'][:10]}_{home_team['name']}_{away_team['name']}".replace(" ", "")
-                drop_alerts = tracker.check_dropping_odds(match_id, home_odd, away_odd)
-                
-                # If significant drop, we can boost confidence or just add it to reasons
-                drop_reason = " | ".join(drop_alerts) if drop_alerts else None
-                # ------------------------------------
-                
-                # --- NEW: STANDINGS CHECK ---
-                home_rank = get_rank(home_team["id"], standings)
-                away_rank = get_rank(away_team["id"], standings)
-                rank_reason = analyzer.analyze_standings(home_rank, away_rank)
-                # ----------------------------
-
-                # Helper to get odds by ID
-                def get_bet_values(bet_id):
-                    for b in fixture_obj["bookmakers"][0]["bets"]:
-                        if b["id"] == bet_id:
-                            return b["values"]
-                    return []
-
-                # 1. MATCH WINNER (ID 1)
-                # Analyze Home Bet
-                reason_home = analyzer.analyze_bet(home_stats, away_stats, home_odd, "home", home_team["name"], away_team["name"])
-                if reason_home or (drop_reason and "DOMICILE" in drop_reason) or (rank_reason and "Avantage" in rank_reason and home_rank < away_rank):
-                    full_reason = reason_home if reason_home else ""
-                    if drop_reason and "DOMICILE" in drop_reason:
-                        full_reason = f"{drop_reason} | {full_reason}" if full_reason else drop_reason
-                    if rank_reason and home_rank < away_rank:
-                         full_reason = f"{rank_reason} | {full_reason}" if full_reason else rank_reason
-                    
-                    if full_reason:
-                        confidence = analyzer.calculate_confidence(home_stats, home_odd, "home")
-                        if drop_reason and "DOMICILE" in drop_reason: confidence = min(100, confidence + 15)
-                        if rank_reason and home_rank < away_rank: confidence = min(100, confidence + 10) # Boost for rank
-                        stake_info = kelly.get_recommendation(home_odd, confidence)
-                        
-                        all_bets.append({
-                            "match": f"{home_team['name']} vs {away_team['name']}",
-                            "date": fixture["date"][:10],
-                            "heure": fixture["date"][11:16],
-                            "ligue": league_name,
-                            "pari": f"Victoire {home_team['name']}",
-                            "cote": home_odd,
-                            "raison": full_reason,
-                            "confiance": confidence,
-                            "stake": stake_info['stake'],
-                            "recommendation": stake_info['recommendation'],
-                            "fixture_id": fixture["id"],
-                            "match_id": match_id
-                        })
-
-                # Analyze Away Bet
-                reason_away = analyzer.analyze_bet(home_stats, away_stats, away_odd, "away", away_team["name"], home_team["name"])
-                if reason_away or (drop_reason and "EXTÉRIEUR" in drop_reason) or (rank_reason and "Avantage" in rank_reason and away_rank < home_rank):
-                    full_reason = reason_away if reason_away else ""
-                    if drop_reason and "EXTÉRIEUR" in drop_reason:
-                        full_reason = f"{drop_reason} | {full_reason}" if full_reason else drop_reason
-                    if rank_reason and away_rank < home_rank:
-                         full_reason = f"{rank_reason} | {full_reason}" if full_reason else rank_reason
-                        
-                    if full_reason:
-                        confidence = analyzer.calculate_confidence(away_stats, away_odd, "away")
-                        if drop_reason and "EXTÉRIEUR" in drop_reason: confidence = min(100, confidence + 15)
-                        if rank_reason and away_rank < home_rank: confidence = min(100, confidence + 10) # Boost for rank
+    # Kickoff times seen this cycle, used to plan the next one
+    cycle = AnalysisCycle(ctx.api, ctx.analyzer, ctx.tracker, ctx.kelly, ctx.analysis_memo, ctx.leagues, ctx.ratings, ctx.snapshots)
+    return ctx.profiler.run("analysis", cycle.run)
 
-                        stake_info = kelly.get_recommendation(away_odd, confidence)
-                        
-                        all_bets.append({
-                            "match": f"{home_team['name']} vs {away_team['name']}",
-                            "date": fixture["date"][:10],
-                            "heure": fixture["date"][11:16],
-                            "ligue": league_name,
-                            "pari": f"Victoire {away_team['name']}",
-                            "cote": away_odd,
-                            "raison": full_reason,
-                            "confiance": confidence,
-                            "stake": stake_info['stake'],
-                            "recommendation": stake_info['recommendation'],
-                            "fixture_id": fixture["id"],
-                            "match_id": match_id
-                        })
-
-                # 2. OVER/UNDER 1.5 GOALS (ID 5)
-                ou_values = get_bet_values(5)
-                over_15_odd = next((float(o["odd"]) for o in ou_values if o["value"] == "Over 1.5"), 0)
-                if over_15_odd > 0:
-                    reason_ou = analyzer.analyze_over15(home_stats, away_stats, over_15_odd)
-                    if reason_ou:
-                        confidence = 80 # High base confidence for Over 1.5 strategy
-                        stake_info = kelly.get_recommendation(over_15_odd, confidence)
-                        all_bets.append({
-                            "match": f"{home_team['name']} vs {away_team['name']}",
-                            "date": fixture["date"][:10],
-                            "heure": fixture["date"][11:16],
-                            "ligue": league_name,
-                            "pari": "Plus de 1.5 Buts",
-                            "cote": over_15_odd,
-                            "raison": reason_ou,
-                            "confiance": confidence,
-                            "stake": stake_info['stake'],
-                            "recommendation": stake_info['recommendation'],
-                            "fixture_id": fixture["id"],
-                            "match_id": match_id
-                        })
-
-                # 3. BOTH TEAMS TO SCORE (ID 8)
-                btts_values = get_bet_values(8)
-                btts_yes_odd = next((float(o["odd"]) for o in btts_values if o["value"] == "Yes"), 0)
-                if btts_yes_odd > 0:
-                    reason_btts = analyzer.analyze_btts(home_stats, away_stats, btts_yes_odd)
-                    if reason_btts:
-                        confidence = 75
-                        stake_info = kelly.get_recommendation(btts_yes_odd, confidence)
-                        all_bets.append({
-                            "match": f"{home_team['name']} vs {away_team['name']}",
-                            "date": fixture["date"][:10],
-                            "heure": fixture["date"][11:16],
-                            "ligue": league_name,
-                            "pari": "Les 2 équipes marquent",
-                            "cote": btts_yes_odd,
-                            "raison": reason_btts,
-                            "confiance": confidence,
-                            "stake": stake_info['stake'],
-                            "recommendation": stake_info['recommendation'],
-                            "fixture_id": fixture["id"],
-                            "match_id": match_id
-                        })
-                
-                # 4. GOALSCORERS (ID 4)
-                if top_scorers:
-                    scorer_values = get_bet_values(4)
-                    if scorer_values:
-                        # Check only players with odds > 2.0 (filtered in analyzer)
-                        # Optimization: Only check players in top_scorers list to avoid looping 100 players
-                        # But odds list has player names.
-                        for odd_obj in scorer_values:
-                            player_name = odd_obj["value"]
-                            player_odd = float(odd_obj["odd"])
-                            
-                            reason_scorer = analyzer.analyze_goalscorer(player_name, player_odd, top_scorers)
-                            if reason_scorer:
-                                confidence = 70 # Base confidence for goalscorers
-                                stake_info = kelly.get_recommendation(player_odd, confidence)
-                                all_bets.append({
-                                    "match": f"{home_team['name']} vs {away_team['name']}",
-                                    "date": fixture["date"][:10],
-                                    "heure": fixture["date"][11:16],
-                                    "ligue": league_name,
-                                    "pari": f"Buteur: {player_name}",
-                                    "cote": player_odd,
-                                    "raison": reason_scorer,
-                                    "confiance": confidence,
-                                    "stake": stake_info['stake'],
-                                    "recommendation": stake_info['recommendation'],
-                                    "fixture_id": fixture["id"],
-                                    "match_id": match_id
-                                })
-                    
-            except Exception as e:
-                logger.error(f"Error processing fixture: {e}")
-                continue
-
-    # Sort and Save to Pending
-    if all_bets:
-        all_bets.sort(key=lambda x: x["confiance"], reverse=True)
-        top_bets = all_bets[:5]
-        
-        for bet in top_bets:
-            # Save to pending bets
-            tracker.add_pending_bet(bet, bet['fixture_id'], bet['match_id'])
-            
-        logger.info(f"Saved {len(top_bets)} pending bets")
-    else:
-        logger.info("No value bets found this cycle.")
+def update_ratings(ctx):
+    """Fetch results finished since the last stored one and fold each new one into the ratings."""
+    for league_name, league_id in ctx.leagues.items():
+        try:
+            # Re-read the last stored day: fixtures finishing late that day may be missing
+            since = ctx.tracker.get_latest_result_date(league_id)
+            fixtures = ctx.api.get_finished_fixtures(league_id, since=since)
+            new_results = ctx.tracker.record_results(result_from_fixture(f) for f in fixtures)
+            for result in new_results:
+                ctx.ratings.update(result)
+            if new_results:
+                logger.info("Ratings updated with %d results for %s", len(new_results), league_name)
+        except Exception as e:
+            logger.error("Ratings update error for %s: %s", league_name, e)
+
+@metrics.timed("cycle_seconds", cycle="validation")
+def run_validation(ctx, fixture_ids=None):
+    """Check pending bets (optionally only for some fixtures) and validate with lineups."""
+    ctx.profiler.run("validation", validate_pending_bets, ctx, fixture_ids)
 
-def run_validation():
-    """Check pending bets and validate with lineups."""
+def validate_pending_bets(ctx, fixture_ids=None):
     logger.info("Starting validation cycle...")
     
-    api = FootballAPI()
-    analyzer = BetAnalyzer()
-    bot = BettingBot()
-    tracker = BetTracker()
+    analyzer, bot, tracker = ctx.analyzer, ctx.bot, ctx.tracker
     
-    pending_bets = tracker.get_pending_bets()
+    # Lease the rows so another worker never validates (and sends) the same bet
+    owner = f"{ctx.worker_id}:{uuid.uuid4().hex[:8]}"
+    pending_bets = tracker.claim_pending_bets(owner, config.LEASE_SECONDS, fixture_ids)
+
+    # Fixtures inside the lineup window, fetched together rather than once per bet
+    now = time.time()
+    due = {}
+    for p_bet in pending_bets:
+        try:
+            kickoff = kickoff_timestamp(p_bet['bet_data'])
+        except (TypeError, ValueError):
+            continue
+        if config.VALIDATION_MIN_MINUTES <= (kickoff - now) / 60 <= config.LINEUP_WINDOW_MINUTES:
+            due[p_bet['fixture_id']] = kickoff
+    lineups_by_fixture = ctx.lineups.get_many(due, now) if due else {}
     
     for p_bet in pending_bets:
+        settled = False
         try:
             bet_data = p_bet['bet_data']
-            match_date = datetime.fromisoformat(bet_data['date'] + "T" + bet_data['heure'] + ":00")
-            # Assuming date is YYYY-MM-DD and heure is HH:MM
-            # We need to be careful with timezone. Let's assume local time or handle it simpler.
-            # Actually, let's use the created_at or just check the API for time.
-            
-            # Better: Check time difference now
-            # We need a robust way to parse the date string we saved.
-            # bet_data['date'] is "2024-05-20"
-            # bet_data['heure'] is "21:00"
-            match_dt = datetime.strptime(f"{bet_data['date']} {bet_data['heure']}", "%Y-%m-%d %H:%M")
+            minutes_diff = (kickoff_timestamp(bet_data) - now) / 60
             
-            # Add timezone info if needed, but let's assume system time matches
-            time_diff = match_dt - datetime.now()
-            minutes_diff = time_diff.total_seconds() / 60
-            
-            # If match is in 10 to 75 minutes (Lineups usually out 60 mins before)
-            if 10 <= minutes_diff <= 75:
-                logger.info(f"Validating match {bet_data['match']}...")
+            # Inside the lineup window (lineups usually out 60 mins before kickoff)
+            if config.VALIDATION_MIN_MINUTES <= minutes_diff <= config.LINEUP_WINDOW_MINUTES:
+                logger.info("Validating match %s...", bet_data.match)
                 
-                lineups = api.get_fixture_lineups(p_bet['fixture_id'])
+                lineups = lineups_by_fixture.get(p_bet['fixture_id'])
                 
-                if lineups and len(lineups) >= 2:
+                if lineups:
                     # Extract StartXI
                     home_xi = lineups[0]['startXI']
                     away_xi = lineups[1]['startXI']
                     
-                    is_valid, reason = analyzer.validate_lineup(bet_data, home_xi, away_xi)
+                    # Published by whichever worker analyzed this league
+                    snapshot = ctx.snapshots.get(config.LEAGUES.get(bet_data.league))
+                    top_scorers = snapshot.top_scorers if snapshot else ()
+                    is_valid, reason = analyzer.validate_lineup(bet_data, home_xi, away_xi, top_scorers)
                     
                     if is_valid:
                         # Add validation reason
-                        bet_data['raison'] += f" | {reason}"
+                        bet_data.reason += f" | {reason}"
                         
                         # Send and Record
-                        bet_id = tracker.record_bet(bet_data, bet_data['stake'])
+                        bet_id = tracker.record_bet(bet_data, bet_data.stake)
                         bot.send_bet_with_buttons(bet_data, bet_id)
+                        settled = True
                         
-                        # Remove from pending
-                        tracker.remove_pending_bet(p_bet['id'])
-                        logger.info(f"Validated and sent bet {bet_id}")
+                        # Close the pending row (kept so later cycles don't re-queue it)
+                        tracker.close_pending_bet(p_bet['id'], "sent")
+                        logger.info("Validated and sent bet %s", bet_id)
                     else:
-                        logger.info(f"Bet invalid due to lineup: {reason}")
-                        tracker.remove_pending_bet(p_bet['id'])
+                        logger.info("Bet invalid due to lineup: %s", reason)
+                        tracker.close_pending_bet(p_bet['id'], "rejected")
+                        settled = True
                 else:
                     logger.info("Lineups not yet available.")
             
             elif minutes_diff < 0:
                 # Match started, remove pending
                 tracker.remove_pending_bet(p_bet['id'])
+                settled = True
                 
         except Exception as e:
-            logger.error(f"Error validating bet {p_bet['id']}: {e}")
-
-def start_scheduler():
-    schedule.every(2).hours.do(run_analysis)
-    schedule.every(15).minutes.do(run_validation)
-    logger.info("Scheduler started (Analysis: 2h, Validation: 15m)...")
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
-
-def start_bot_polling():
-    bot = BettingBot()
-    tracker = BetTracker()
+            logger.error("Error validating bet %s: %s", p_bet['id'], e)
+        finally:
+            if not settled:
+                # Not decided yet: the next check, on any worker, can claim it again
+                tracker.release_pending_bet(p_bet['id'], owner)
+
+    # Lineups still missing: look again sooner as kickoff gets closer (one batch per kickoff)
+    waiting = {}
+    for fixture_id, kickoff in due.items():
+        if fixture_id not in lineups_by_fixture:
+            waiting.setdefault(kickoff, set()).add(fixture_id)
+    for kickoff, fixtures in waiting.items():
+        ctx.scheduler.schedule_at(ctx.lineups.next_poll(kickoff), ("lineups", kickoff, "retry"), run_validation, ctx, fixtures)
+
+def run_maintenance(ctx):
+    """Archive stale rows, compact old bets and vacuum the database."""
+    logger.info("Starting maintenance...")
+    try:
+        ctx.tracker.run_maintenance()
+    except Exception as e:
+        logger.error("Maintenance error: %s", e)
+
+def run_settlement(ctx):
+    """Settle finished bets from their final scores and post a summary."""
+    logger.info("Starting settlement...")
+    try:
+        settled = Settlement(ctx.api, ctx.tracker, ctx.kelly).run()
+    except Exception as e:
+        logger.error("Settlement error: %s", e)
+        return
+    if not settled:
+        return
+    icons = {"won": "✅", "lost": "❌", "void": "↩️"}
+    lines = [f"{icons[result]} {bet['match']} - {bet['bet_type']} ({profit:+.2f}€)" for bet, result, profit in settled]
+    total = sum(profit for _, _, profit in settled)
+    ctx.bot.send_message(
+        "🏁 Résultats automatiques\n\n" + "\n".join(lines)
+        + f"\n\n💰 Bilan : {total:+.2f}€ | Bankroll : {ctx.kelly.bankroll:.2f}€"
+    )
+
+def kickoff_timestamp(bet_data):
+    """Kickoff of a pending bet as a Unix time (same clock as run_validation)."""
+    return bet_data.kickoff
+
+def schedule_validations(ctx):
+    """Plan lineup checks at T-60/T-30/T-10 and a cleanup at kickoff for every pending fixture."""
+    scheduler = ctx.scheduler
+    now = time.time()
+    # Fixtures kicking off together share their checks, so their lineups come in one request
+    by_kickoff = {}
+    for p_bet in ctx.tracker.get_pending_bets():
+        try:
+            kickoff = kickoff_timestamp(p_bet['bet_data'])
+        except (TypeError, ValueError):
+            continue
+        by_kickoff.setdefault(kickoff, set()).add(p_bet['fixture_id'])
+    for kickoff, fixtures in by_kickoff.items():
+        for offset in config.VALIDATION_OFFSETS_MINUTES:
+            run_at = kickoff - offset * 60
+            if run_at > now:
+                scheduler.schedule_at(run_at, ("lineups", kickoff, offset), run_validation, ctx, fixtures)
+        # Past kickoff run_validation drops whatever is still pending
+        scheduler.schedule_at(max(kickoff + 60, now), ("expire", kickoff), run_validation, ctx, fixtures)
+
+def next_analysis_time(kickoffs, now):
+    """
+    Plan the next analysis cycle around the matchday calendar.
+
+    On matchdays analyses run every ANALYSIS_INTERVAL_HOURS plus one shortly
+    before the next kickoff's lineup window. Otherwise the agent sleeps until
+    ANALYSIS_LOOKAHEAD_HOURS before the next kickoff (at most ANALYSIS_IDLE_HOURS).
+    """
+    idle = now + config.ANALYSIS_IDLE_HOURS * 3600
+    upcoming = sorted(k for k in kickoffs if k > now)
+    if not upcoming:
+        return idle
+    if upcoming[0] - now > config.ANALYSIS_LOOKAHEAD_HOURS * 3600:
+        return min(idle, upcoming[0] - config.ANALYSIS_LOOKAHEAD_HOURS * 3600)
+
+    next_run = now + config.ANALYSIS_INTERVAL_HOURS * 3600
+    for kickoff in upcoming:
+        pre_kickoff = kickoff - config.PRE_KICKOFF_ANALYSIS_MINUTES * 60
+        if pre_kickoff > now + 300:
+            return min(next_run, pre_kickoff)
+    return next_run
+
+def next_daily_time(hhmm, now):
+    """Next occurrence of a local HH:MM time."""
+    hour, minute = map(int, hhmm.split(":"))
+    run_at = datetime.fromtimestamp(now).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at.timestamp() <= now:
+        run_at += timedelta(days=1)
+    return run_at.timestamp()
+
+def start_scheduler(ctx):
+    scheduler = ctx.scheduler
+
+    def analysis_job():
+        kickoffs = []
+        try:
+            update_ratings(ctx)
+            kickoffs = run_analysis(ctx) or []
+        finally:
+            schedule_validations(ctx)
+            run_at = next_analysis_time(kickoffs, time.time())
+            scheduler.schedule_at(run_at, "analysis", analysis_job)
+            logger.info("Next analysis at %s", datetime.fromtimestamp(run_at).strftime("%Y-%m-%d %H:%M"))
+
+    def settlement_job():
+        try:
+            run_settlement(ctx)
+        finally:
+            scheduler.schedule_at(time.time() + config.SETTLEMENT_INTERVAL_MINUTES * 60, "settlement", settlement_job)
+
+    def maintenance_job():
+        try:
+            run_maintenance(ctx)
+        finally:
+            scheduler.schedule_at(next_daily_time(config.MAINTENANCE_TIME, time.time()), "maintenance", maintenance_job)
+
+    # Pending bets from before a restart get their lineup checks back
+    schedule_validations(ctx)
+    scheduler.schedule_at(time.time(), "analysis", analysis_job)
+    if ctx.is_leader:
+        scheduler.schedule_at(next_daily_time(config.MAINTENANCE_TIME, time.time()), "maintenance", maintenance_job)
+        scheduler.schedule_at(time.time(), "settlement", settlement_job)
+    logger.info("Scheduler started (lineups at T-%s min, Maintenance: %s)...", config.VALIDATION_OFFSETS_MINUTES, config.MAINTENANCE_TIME)
+    scheduler.run_forever()
+
+def register_handlers(bot, tracker, profiler=None, kelly=None):
+    """Attach the bet result callbacks (and the admin commands) to the bot."""
+    settling = set()
+    settling_lock = threading.Lock()
+
+    @bot.bot.message_handler(commands=["profile"])
+    def profile_command(message):
+        if profiler is None or str(message.chat.id) != str(config.ADMIN_CHAT_ID):
+            return
+        cycles = profiler.arm(*message.text.split()[1:])
+        bot.send_admin(f"🔬 Profilage activé pour le prochain cycle : {', '.join(cycles)}")
     
     @bot.bot.callback_query_handler(func=lambda call: True)
     def callback_query(call):
         try:
             action, bet_id = call.data.split("_")
             bet_id = int(bet_id)
+            if action not in ("win", "loss"):
+                return
+
+            # Double-taps may be handled concurrently: only one settles the bet
+            with settling_lock:
+                if bet_id in settling:
+                    bot.bot.answer_callback_query(call.id, "⏳ Déjà en cours...")
+                    return
+                settling.add(bet_id)
+            try:
+                result = "won" if action == "win" else "lost"
+                settled = tracker.update_result(bet_id, result, 0, only_unsettled=True)
+            finally:
+                with settling_lock:
+                    settling.discard(bet_id)
+
+            if not settled:
+                bot.bot.answer_callback_query(call.id, "ℹ️ Pari déjà réglé")
+                return
+            if kelly:
+                # Same as the automatic settlement: stakes follow the realized profit
+                kelly.update_bankroll(config.BANKROLL + tracker.get_realized_profit())
             
             if action == "win":
-                # Calculate profit
-                # We need to fetch the bet to get odds and stake
-                # For now, let's just mark it as won. 
-                # Ideally BetTracker should handle profit calc.
-                # Let's update BetTracker to calculate profit on update
-                tracker.update_result(bet_id, "won", 0) # Profit calc needed in tracker
                 bot.bot.answer_callback_query(call.id, "✅ Pari marqué comme GAGNÉ !")
+                label, markup = bot.settle_markup(call.message.reply_markup, bet_id)
+                result_line = f"✅ RÉSULTAT {label}: GAGNÉ" if label else "✅ RÉSULTAT: GAGNÉ"
                 bot.bot.edit_message_text(chat_id=call.message.chat.id, message_id=call.message.message_id, 
-                                          text=f"{call.message.text}\n\n✅ RÉSULTAT: GAGNÉ")
+                                          text=f"{call.message.text}\n\n{result_line}", reply_markup=markup)
                 
                 # Celebration GIF
                 import random
@@ -364,33 +301,90 @@ def start_bot_polling():
                     bot.bot.send_animation(call.message.chat.id, random.choice(gifs), caption="🤑 BOOOOM ! ENCAISSÉ !")
                 except:
                     pass
-            elif action == "loss":
-                tracker.update_result(bet_id, "lost", 0)
+            else:
                 bot.bot.answer_callback_query(call.id, "❌ Pari marqué comme PERDU")
+                label, markup = bot.settle_markup(call.message.reply_markup, bet_id)
+                result_line = f"❌ RÉSULTAT {label}: PERDU" if label else "❌ RÉSULTAT: PERDU"
                 bot.bot.edit_message_text(chat_id=call.message.chat.id, message_id=call.message.message_id, 
-                                          text=f"{call.message.text}\n\n❌ RÉSULTAT: PERDU")
+                                          text=f"{call.message.text}\n\n{result_line}", reply_markup=markup)
         except Exception as e:
-            logger.error(f"Callback error: {e}")
+            logger.error("Callback error: %s", e)
+
+def start_live(ctx):
+    """Monitor in-play fixtures of this worker's leagues and send value bets."""
+    # Only live mode needs the in-play model
+    from inplay_model import InPlayModel
+    from live_monitor import LiveMonitor
+
+    def send_value(bet):
+        ctx.kelly.apply(bet)
+        if not bet.stake:
+            return
+        # Recorded with its fixture and bet key, so the settlement job resolves it
+        bet_id = ctx.tracker.record_bet(bet, bet.stake)
+        ctx.bot.send_bet_with_buttons(bet, bet_id)
+
+    monitor = LiveMonitor(
+        ctx.api, InPlayModel(ctx.analyzer, ctx.ratings), ctx.leagues,
+        on_value=send_value, record_path=config.LIVE_RECORD_FILE,
+    )
+    monitor.run()
+
+def start_bot_polling(ctx):
+    register_handlers(ctx.bot, ctx.tracker, ctx.profiler, ctx.kelly)
+
+    if config.WEBHOOK_URL:
+        start_webhook(ctx)
+        return
 
     logger.info("Bot polling started...")
-    bot.bot.infinity_polling()
+    ctx.bot.bot.infinity_polling()
+
+def start_webhook(ctx):
+    """Receive updates through a webhook, callbacks run on a bounded worker pool."""
+    # Only webhook mode needs the HTTP server
+    from webhook_server import WebhookServer
+
+    server = WebhookServer(ctx.bot.bot)
+    server.register(config.WEBHOOK_URL)
+    server.serve_forever()
 
 if __name__ == "__main__":
-    import threading
-    
+    if config.IS_WEB_DYNO and not config.WEBHOOK_URL:
+        # Would be a second leader next to worker.1 (two pollers, every job run twice)
+        logger.error("web dyno started without WEBHOOK_URL: exiting, scale web to 0 in polling mode")
+        sys.exit(0)
+
+    ctx = AppContext()
+    if config.METRICS_PORT:
+        start_http_server(config.METRICS_PORT)
+
+    boot_time = time.perf_counter() - _BOOT
+    if boot_time > config.STARTUP_BUDGET_SECONDS:
+        logger.warning("Cold start took %.2fs (budget %ss)", boot_time, config.STARTUP_BUDGET_SECONDS)
+    else:
+        logger.info("Cold start took %.2fs", boot_time)
+
     # Initial run
-    try:
-        bot = BettingBot()
-        bot.send_welcome()
-        # Run analysis once in a separate thread so it doesn't block polling start
-        threading.Thread(target=run_analysis).start()
-    except Exception as e:
-        logger.error(f"Startup error: {e}")
+    if ctx.is_leader:
+        try:
+            ctx.bot.send_welcome()
+        except Exception as e:
+            logger.error("Startup error: %s", e)
 
-    # Start Scheduler Thread
-    scheduler_thread = threading.Thread(target=start_scheduler)
+    # Start Scheduler Thread (runs the first analysis right away)
+    scheduler_thread = threading.Thread(target=start_scheduler, args=(ctx,))
     scheduler_thread.daemon = True
     scheduler_thread.start()
+
+    if config.LIVE_MODE:
+        live_thread = threading.Thread(target=start_live, args=(ctx,))
+        live_thread.daemon = True
+        live_thread.start()
     
     # Start Bot Polling (Main Thread)
-    start_bot_polling()
+    if ctx.is_leader:
+        start_bot_polling(ctx)
+    else:
+        # Telegram allows a single poller/webhook: other workers only analyze and validate
+        scheduler_thread.join()
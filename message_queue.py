@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+import logging
+from datetime import datetime
+
+from telebot.apihelper import ApiTelegramException
+
+import config
+from metrics import metrics
+
+class MessageQueue:
+    """
+    Outbound Telegram queue drained by a dedicated sender thread.
+
+    Producers only enqueue, so they never block on network I/O. The sender
+    respects a global and a per-chat rate limit, retries 429 responses after
+    the server-provided `retry_after`, and merges bets whose kickoffs fall in
+    the same window into a single message.
+    """
+
+    IDLE_TIMEOUT = 60  # Sender thread exits after this many idle seconds
+    MAX_RETRIES = 3
+
+    def __init__(self, deliver, render_bets):
+        """
+        Args:
+            deliver: Callable(chat_id, text, **kwargs) doing the actual API call
+            render_bets: Callable(list of (bet_data, bet_id)) -> (text, kwargs)
+        """
+        self.deliver = deliver
+        self.render_bets = render_bets
+        self.logger = logging.getLogger(__name__)
+
+        self.queue = queue.Queue()
+        self.min_interval = 1.0 / config.TELEGRAM_GLOBAL_RATE
+        self.chat_interval = config.TELEGRAM_CHAT_INTERVAL
+        self.merge_window = config.TELEGRAM_MERGE_WINDOW_MINUTES * 60
+        self.linger = config.TELEGRAM_BATCH_LINGER
+
+        self._next_global = 0.0
+        self._next_chat = {}
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def put_text(self, chat_id, text, **kwargs):
+        """Queue a plain message."""
+        self._put({"kind": "text", "chat_id": chat_id, "text": text, "kwargs": kwargs})
+
+    def put_bet(self, chat_id, bet_data, bet_id):
+        """Queue a bet, to be merged with other bets kicking off in the same window."""
+        self._put({"kind": "bet", "chat_id": chat_id, "bet": (bet_data, bet_id)})
+
+    def flush(self, timeout=None):
+        """Wait until every queued message has been handled (True if drained)."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _put(self, item):
+        self.queue.put(item)
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="telegram-sender", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    # Re-check under the lock so a concurrent put() restarts us if needed
+                    if self.queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            batch = [item]
+            if item["kind"] == "bet":
+                batch += self._collect_more()
+
+            try:
+                for chat_id, text, kwargs in self._render(batch):
+                    try:
+                        self._send(chat_id, text, kwargs)
+                    except Exception as e:
+                        self.logger.error("Failed to send Telegram message: %s", e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _collect_more(self):
+        """Linger briefly to gather more items queued right after a bet."""
+        batch = []
+        deadline = time.monotonic() + self.linger
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _kickoff_window(self, bet_data):
+        try:
+            kickoff = datetime.strptime(f"{bet_data.date} {bet_data.time}", "%Y-%m-%d %H:%M")
+            return int(kickoff.timestamp()) // self.merge_window
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _render(self, batch):
+        """Turn a batch into (chat_id, text, kwargs) messages, merging bets by kickoff window."""
+        order = []
+        groups = {}
+        for item in batch:
+            if item["kind"] == "text":
+                order.append((item["chat_id"], item["text"], item["kwargs"]))
+                continue
+            key = (item["chat_id"], self._kickoff_window(item["bet"][0]))
+            if key not in groups:
+                groups[key] = []
+                # The group is sent at the position of its first bet
+                order.append(key)
+            groups[key].append(item["bet"])
+
+        rendered = []
+        for entry in order:
+            if len(entry) == 2:
+                for text, kwargs in self._render_group(groups[entry]):
+                    rendered.append((entry[0], text, kwargs))
+            else:
+                rendered.append(entry)
+        return rendered
+
+    def _render_group(self, bets):
+        """
+        Render a kickoff window's bets as few messages as possible, each
+        within Telegram's message length limit (a single bet is never split).
+        """
+        messages = []
+        current, rendered = [], None
+        for bet in bets:
+            candidate = self.render_bets(current + [bet])
+            if current and len(candidate[0]) > config.TELEGRAM_MAX_MESSAGE_LENGTH:
+                messages.append(rendered)
+                current, rendered = [bet], self.render_bets([bet])
+            else:
+                current, rendered = current + [bet], candidate
+        messages.append(rendered)
+        return messages
+
+    def _wait_for_slot(self, chat_id):
+        now = time.monotonic()
+        wait = max(self._next_global, self._next_chat.get(chat_id, 0.0)) - now
+        if wait > 0:
+            time.sleep(wait)
+            now = time.monotonic()
+        self._next_global = now + self.min_interval
+        self._next_chat[chat_id] = now + self.chat_interval
+
+    def _send(self, chat_id, text, kwargs):
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._wait_for_slot(chat_id)
+            try:
+                with metrics.timer("telegram_send_seconds"):
+                    self.deliver(chat_id, text, **kwargs)
+                metrics.inc("telegram_messages_total", status="sent")
+                return
+            except ApiTelegramException as e:
+                if e.error_code != 429 or attempt == self.MAX_RETRIES:
+                    metrics.inc("telegram_messages_total", status="failed")
+                    raise
+                metrics.inc("telegram_rate_limited_total")
+                retry_after = e.result_json.get("parameters", {}).get("retry_after", 1)
+                self.logger.warning("Telegram rate limit hit, retrying in %ss", retry_after)
+                # Hold back every chat, the limit may be global
+                self._next_global = time.monotonic() + retry_after
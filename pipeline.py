@@ -0,0 +1,136 @@
+import queue
+import logging
+import threading
+import time
+
+from metrics import metrics
+from profiler import profiler
+
+_DONE = object()
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    fn(item, emit) processes one item and calls emit(x) for every item it
+    passes downstream (zero, one or many). With batch_size > 1, fn receives a
+    list of up to batch_size items instead, collected for at most
+    batch_timeout seconds. on_close(emit) runs once after the stage's last
+    item, e.g. to flush an aggregate.
+    """
+
+    def __init__(self, name, fn, workers=1, queue_size=32, batch_size=1, batch_timeout=0.5, on_close=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.on_close = on_close
+
+        self.next = None
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self._finished = 0
+        self._lock = threading.Lock()
+
+class Pipeline:
+    """
+    Chain of stages connected by bounded queues.
+
+    Every stage runs its own pool of worker threads, so I/O-bound stages
+    (HTTP, DB) overlap with CPU-bound ones. A full queue blocks the upstream
+    workers, which gives backpressure without unbounded buffering.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        for upstream, downstream in zip(stages, stages[1:]):
+            upstream.next = downstream
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, items):
+        """Feed items to the first stage and block until every stage has drained."""
+        threads = []
+        for stage in self.stages:
+            for i in range(stage.workers):
+                t = threading.Thread(target=profiler.wrap_thread(self._work), args=(stage,), name=f"{stage.name}-{i}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        first = self.stages[0]
+        for item in items:
+            first.queue.put(item)
+        for _ in range(first.workers):
+            first.queue.put(_DONE)
+
+        for t in threads:
+            t.join()
+
+        for stage in self.stages:
+            self.logger.info("Stage %s: %d items, %.2fs busy", stage.name, stage.processed, stage.busy_seconds)
+
+    def _emitter(self, stage):
+        if stage.next is None:
+            return lambda item: None
+        return stage.next.queue.put
+
+    def _next_batch(self, stage):
+        """Get up to batch_size items; returns (items, done)."""
+        item = stage.queue.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = stage.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _work(self, stage):
+        emit = self._emitter(stage)
+        done = False
+        while not done:
+            if stage.batch_size > 1:
+                batch, done = self._next_batch(stage)
+                payloads = [batch] if batch else []
+            else:
+                item = stage.queue.get()
+                done = item is _DONE
+                payloads = [] if done else [item]
+
+            for payload in payloads:
+                start = time.perf_counter()
+                try:
+                    stage.fn(payload, emit)
+                except Exception as e:
+                    self.logger.error("Error in stage %s: %s", stage.name, e)
+                elapsed = time.perf_counter() - start
+                metrics.observe("pipeline_stage_seconds", elapsed, stage=stage.name)
+                with stage._lock:
+                    stage.busy_seconds += elapsed
+                    stage.processed += len(payload) if stage.batch_size > 1 else 1
+
+        with stage._lock:
+            stage._finished += 1
+            last = stage._finished == stage.workers
+        if not last:
+            return
+
+        # Last worker out closes the stage and tells the next one to finish
+        if stage.on_close:
+            try:
+                stage.on_close(emit)
+            except Exception as e:
+                self.logger.error("Error closing stage %s: %s", stage.name, e)
+        if stage.next is not None:
+            for _ in range(stage.next.workers):
+                stage.next.queue.put(_DONE)
@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+import config
+
+class ProfileSession:
+    """cProfile + tracemalloc capture of one cycle, including its worker threads."""
+
+    def __init__(self, cycle):
+        # Only loaded when a profile was actually requested
+        import cProfile
+        import tracemalloc
+
+        self.cycle = cycle
+        self._cProfile = cProfile
+        self._tracemalloc = tracemalloc
+        self.profiles = []
+        self._lock = threading.Lock()
+        self._own_tracing = False
+
+    def start(self):
+        if not self._tracemalloc.is_tracing():
+            self._tracemalloc.start()
+            self._own_tracing = True
+        self.main = self._cProfile.Profile()
+        self.main.enable()
+
+    def stop(self):
+        self.main.disable()
+        snapshot = self._tracemalloc.take_snapshot()
+        if self._own_tracing:
+            self._tracemalloc.stop()
+        return snapshot
+
+    def wrap_thread(self, target):
+        """Profile a worker thread's target too (cProfile only sees the thread that enabled it)."""
+        def run(*args, **kwargs):
+            profile = self._cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+: the session's profiler already covers every thread
+                return target(*args, **kwargs)
+            try:
+                return target(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self.profiles.append(profile)
+        return run
+
+class CycleProfiler:
+    """
+    On-demand profiling of the next analysis/validation cycle.
+
+    A cycle is profiled only once it has been armed (PROFILE_CYCLES at
+    startup or the /profile admin command); otherwise run() is a plain call.
+    The profile and top allocation sites are written to timestamped files in
+    PROFILE_DIR and a short hotspot summary goes to report(text).
+    """
+
+    CYCLES = ("analysis", "validation")
+
+    def __init__(self, report=None, out_dir=None, top_n=None):
+        self.report = report
+        self.out_dir = out_dir or config.PROFILE_DIR
+        self.top_n = top_n or config.PROFILE_TOP_N
+        self.logger = logging.getLogger(__name__)
+        self._armed = set()
+        self._lock = threading.Lock()
+        self.session = None  # Active session, picked up by Pipeline worker threads
+
+    def arm(self, *cycles):
+        """Profile the next run of each given cycle (all cycles by default)."""
+        cycles = [c for c in cycles if c in self.CYCLES] or list(self.CYCLES)
+        with self._lock:
+            self._armed.update(cycles)
+        self.logger.info("Profiling armed for: %s", ', '.join(cycles))
+        return cycles
+
+    def wrap_thread(self, target):
+        session = self.session
+        return session.wrap_thread(target) if session else target
+
+    def run(self, cycle, fn, *args, **kwargs):
+        with self._lock:
+            armed = cycle in self._armed and self.session is None
+            if armed:
+                self._armed.discard(cycle)
+                self.session = ProfileSession(cycle)
+        if not armed:
+            return fn(*args, **kwargs)
+
+        session = self.session
+        session.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            snapshot = session.stop()
+            self.session = None
+            try:
+                self._write_report(session, snapshot)
+            except Exception as e:
+                self.logger.error("Could not write %s profile: %s", cycle, e)
+
+    def _write_report(self, session, snapshot):
+        import io
+        import pstats
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{session.cycle}_{datetime.now():%Y%m%d_%H%M%S}")
+
+        stats = pstats.Stats(session.main, *session.profiles)
+        stats.dump_stats(base + ".prof")
+
+        allocations = snapshot.statistics("lineno")
+        with open(base + "_alloc.txt", "w", encoding="utf-8") as f:
+            for stat in allocations[:100]:
+                f.write(f"{stat}\n")
+
+        # Hotspots by own time (cumulative time is dominated by thread/queue waits)
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("tottime").print_stats(self.top_n)
+        hotspots = [
+            line.strip() for line in out.getvalue().splitlines()
+            if line.strip()[:1].isdigit() and "function calls" not in line
+        ]
+        top_alloc = [
+            f"{stat.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{stat.traceback[0].lineno} "
+            f"{stat.size / 1024:.0f} KiB"
+            for stat in allocations[:self.top_n]
+        ]
+
+        self.logger.info("Profile of %s cycle written to %s.prof", session.cycle, base)
+        if self.report:
+            # Telegram caps messages at 4096 characters
+            self.report((
+                f"🔬 Profil du cycle {session.cycle} ({base}.prof)\n\n"
+                "⏱️ Temps propre (ncalls tottime percall cumtime percall fonction):\n"
+                + "\n".join(hotspots)
+                + "\n\n🧠 Allocations:\n"
+                + "\n".join(top_alloc)
+            )[:4000])
+
+# Process-wide profiler, armed from config or the /profile command
+profiler = CycleProfiler()
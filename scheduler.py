@@ -0,0 +1,89 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+class KickoffScheduler:
+    """
+    Deadline scheduler built on a min-heap of (run_at, job).
+
+    The loop sleeps until the earliest deadline (or indefinitely when nothing
+    is due) and is woken early whenever a sooner job is added. Jobs are keyed:
+    scheduling an existing key moves it, so re-planning the same fixture never
+    piles up duplicate wakeups.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._heap = []
+        self._jobs = {}  # key -> heap entry currently valid for that key
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+
+    def schedule_at(self, run_at, key, fn, *args):
+        """Run fn(*args) at Unix time run_at, replacing any job with the same key."""
+        entry = [run_at, next(self._seq), key, fn, args]
+        with self._cond:
+            self._jobs[key] = entry
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def cancel(self, key):
+        with self._cond:
+            # Lazy deletion: the stale heap entry is skipped when popped
+            self._jobs.pop(key, None)
+
+    def has_job(self, key):
+        with self._cond:
+            return key in self._jobs
+
+    def next_run(self):
+        """Unix time of the earliest pending job, or None."""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap and self._jobs.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+
+    def _next_due(self):
+        """Block until a job is due and pop it (None once stopped)."""
+        with self._cond:
+            while self._running:
+                self._drop_stale()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                entry = heapq.heappop(self._heap)
+                del self._jobs[entry[2]]
+                return entry
+        return None
+
+    def run_forever(self):
+        self._running = True
+        self.logger.info("Kickoff scheduler started")
+        while True:
+            entry = self._next_due()
+            if entry is None:
+                return
+            _, _, key, fn, args = entry
+            # Long jobs (an analysis cycle) must not delay the next lineup check
+            threading.Thread(target=self._run_job, args=(key, fn, args), daemon=True).start()
+
+    def _run_job(self, key, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self.logger.error("Scheduled job %s failed: %s", key, e)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
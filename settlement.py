@@ -0,0 +1,172 @@
+import logging
+import time
+import unicodedata
+from datetime import datetime
+
+import config
+
+FINISHED_STATUSES = ("FT", "AET", "PEN")
+VOID_STATUSES = ("CANC", "ABD", "AWD", "WO")  # Awarded/walkover: not played, void like the bookmakers
+POSTPONED_STATUSES = ("PST",)  # Void once the match is not played within POSTPONED_VOID_HOURS
+NOT_SCORER_GOALS = ("Own Goal", "Missed Penalty")
+
+def _name_key(name):
+    """(surname, first initial or "") of a player name, ignoring accents, case and dots."""
+    plain = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    parts = plain.replace(".", " ").split()
+    if not parts:
+        return None
+    return parts[-1], parts[0][0] if len(parts) > 1 else ""
+
+def _player_ref(player):
+    return player.get("id") or player.get("name")
+
+def _fixture_players(fixture_obj):
+    """Every player named in the fixture payload: events, then lineups and player stats when included."""
+    for event in fixture_obj.get("events") or []:
+        yield event["player"]
+    for lineup in fixture_obj.get("lineups") or []:
+        for entry in (lineup.get("startXI") or []) + (lineup.get("substitutes") or []):
+            yield entry["player"]
+    for team in fixture_obj.get("players") or []:
+        for entry in team.get("players") or []:
+            yield entry["player"]
+
+def _find_player(selection, fixture_obj):
+    """
+    Player of the fixture a scorer selection names, matched on surname and
+    first initial ("Kylian Mbappé" is "K. Mbappé").
+
+    Returns:
+        The player's id (name when the payload has no id), or None when no
+        player or more than one matches
+    """
+    wanted = _name_key(selection)
+    if wanted is None:
+        return None
+    surname, initial = wanted
+    matches = set()
+    for player in _fixture_players(fixture_obj):
+        key = _name_key(player.get("name"))
+        if key and key[0] == surname and (not initial or not key[1] or key[1] == initial):
+            matches.add(_player_ref(player))
+    return matches.pop() if len(matches) == 1 else None
+
+def settle_market(market_id, selection, fixture_obj):
+    """
+    Outcome of one selection on a finished fixture: "won", "lost", "void", or
+    None while the result is not final. Markets settle on the 90-minute score.
+    Postponed fixtures return None here; Settlement voids them after a delay.
+    A scorer selection that names no single player of the fixture also
+    returns None and is left to manual settlement.
+
+    Args:
+        market_id: API-Football bet id (1 = 1X2, 4 = goalscorer, 5 = goals, 8 = BTTS)
+        selection: "Home"/"Draw"/"Away", "Over 1.5", "Yes"/"No" or a player name
+        fixture_obj: Fixture payload including score and events
+    """
+    status = fixture_obj["fixture"]["status"]["short"]
+    if status in VOID_STATUSES:
+        return "void"
+    if status not in FINISHED_STATUSES:
+        return None
+
+    fulltime = (fixture_obj.get("score") or {}).get("fulltime") or fixture_obj["goals"]
+    home, away = fulltime["home"], fulltime["away"]
+    if home is None or away is None:
+        return None
+
+    if market_id == 1:
+        won = {"Home": home > away, "Draw": home == away, "Away": away > home}.get(selection)
+    elif market_id == 5:
+        side, _, line = selection.partition(" ")
+        won = (home + away > float(line)) if side == "Over" else (home + away < float(line))
+    elif market_id == 8:
+        both = home > 0 and away > 0
+        won = both if selection == "Yes" else not both
+    elif market_id == 4:
+        player = _find_player(selection, fixture_obj)
+        if player is None:
+            return None
+        won = any(
+            event["type"] == "Goal" and event["detail"] not in NOT_SCORER_GOALS
+            and (event["time"]["elapsed"] or 0) <= 90
+            and _player_ref(event["player"]) == player
+            for event in fixture_obj.get("events") or []
+        )
+    else:
+        return None
+
+    if won is None:
+        return None
+    return "won" if won else "lost"
+
+class Settlement:
+    """
+    Automatic settlement of the open bets.
+
+    Final scores are fetched in multi-fixture requests (one call per
+    FIXTURES_PER_REQUEST fixtures, not one per bet), every supported market
+    is resolved, and all results are written in one transaction. The Kelly
+    bankroll then follows the realized profit.
+    """
+
+    def __init__(self, api, tracker, kelly=None):
+        self.api = api
+        self.tracker = tracker
+        self.kelly = kelly
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, now=None):
+        """
+        Returns:
+            List of (bet, result, profit) that were settled
+        """
+        now = now or time.time()
+        # Only matches that should be over by now
+        due = [bet for bet in self.tracker.get_unsettled_bets() if self._kickoff(bet) + config.SETTLEMENT_DELAY_MINUTES * 60 <= now]
+        if not due:
+            return []
+
+        fixture_ids = sorted({bet["fixture_id"] for bet in due})
+        fixtures = {f["fixture"]["id"]: f for f in self.api.get_fixtures_by_ids(fixture_ids)}
+
+        settlements = []
+        for bet in due:
+            fixture = fixtures.get(bet["fixture_id"])
+            try:
+                _, market_id, selection = bet["bet_key"].split(":", 2)
+                result = settle_market(int(market_id), selection, fixture) if fixture else None
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error("Cannot settle bet %s: %s", bet['id'], e)
+                continue
+            if result is None and fixture and self._postponed_too_long(fixture, bet, now):
+                result = "void"
+            if result is None:
+                continue
+            stake = bet["stake"] or 0
+            profit = {"won": stake * bet["odds"] - stake, "lost": -stake}.get(result, 0)
+            settlements.append((bet, result, round(profit, 2)))
+
+        settled_ids = self.tracker.update_results([(bet["id"], result, profit) for bet, result, profit in settlements])
+        settled = [s for s in settlements if s[0]["id"] in settled_ids]
+        self.logger.info("Settled %d of %d due bets (%d fixtures fetched)", len(settled), len(due), len(fixture_ids))
+
+        if self.kelly and settled:
+            self.kelly.update_bankroll(config.BANKROLL + self.tracker.get_realized_profit())
+            self.logger.info("Bankroll now %.2f€", self.kelly.bankroll)
+        return settled
+
+    def _postponed_too_long(self, fixture, bet, now):
+        """A postponed match still unplayed POSTPONED_VOID_HOURS after the bet's kickoff is never retried again."""
+        return (
+            fixture["fixture"]["status"]["short"] in POSTPONED_STATUSES
+            and self._kickoff(bet) + config.POSTPONED_VOID_HOURS * 3600 <= now
+        )
+
+    @staticmethod
+    def _kickoff(bet):
+        try:
+            return datetime.strptime(f"{bet['date']} {bet['time']}", "%Y-%m-%d %H:%M").timestamp()
+        except ValueError:
+            return float("inf")
@@ -0,0 +1,110 @@
+import logging
+
+import config
+
+def result_from_fixture(fixture_obj):
+    """(fixture_id, league_id, date, home_id, away_id, home_goals, away_goals) from a finished fixture payload."""
+    try:
+        goals = fixture_obj["goals"]
+        if goals["home"] is None or goals["away"] is None:
+            return None
+        return (
+            fixture_obj["fixture"]["id"],
+            fixture_obj["league"]["id"],
+            fixture_obj["fixture"]["date"],
+            fixture_obj["teams"]["home"]["id"],
+            fixture_obj["teams"]["away"]["id"],
+            int(goals["home"]),
+            int(goals["away"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class Rating:
+    """Attack/defense strength of one team, by venue, as exponentially weighted goal averages."""
+
+    __slots__ = (
+        "home_for", "home_against", "away_for", "away_against",
+        "home_played", "home_wins", "away_played", "away_wins", "form",
+    )
+
+    def __init__(self):
+        self.home_for = config.RATINGS_PRIOR_HOME_GOALS
+        self.home_against = config.RATINGS_PRIOR_AWAY_GOALS
+        self.away_for = config.RATINGS_PRIOR_AWAY_GOALS
+        self.away_against = config.RATINGS_PRIOR_HOME_GOALS
+        self.home_played = self.home_wins = self.away_played = self.away_wins = 0
+        self.form = ""
+
+    @property
+    def played(self):
+        return self.home_played + self.away_played
+
+class TeamRatings:
+    """
+    Per-team ratings built from the local results store.
+
+    Each finished fixture updates both teams in O(1): their venue goal
+    averages start as the mean of the first results, then move towards the
+    new score by RATINGS_ALPHA, so recent form weighs more than season-long
+    averages. stats() exposes a rating in the
+    shape of the API's teams/statistics response, so BetAnalyzer uses it
+    without a per-team API call.
+    """
+
+    def __init__(self, alpha=None, min_matches=None):
+        self.alpha = alpha if alpha is not None else config.RATINGS_ALPHA
+        self.min_matches = min_matches if min_matches is not None else config.RATINGS_MIN_MATCHES
+        self.ratings = {}  # team_id -> Rating
+        self.logger = logging.getLogger(__name__)
+
+    def update(self, result):
+        """Apply one finished fixture (a result_from_fixture tuple)."""
+        _, _, _, home_id, away_id, home_goals, away_goals = result
+        home = self.ratings.get(home_id) or self.ratings.setdefault(home_id, Rating())
+        away = self.ratings.get(away_id) or self.ratings.setdefault(away_id, Rating())
+
+        # Plain running mean over the first 1/alpha games of a venue, so the
+        # prior is gone after the first result; exponential weighting after
+        a = max(self.alpha, 1.0 / (home.home_played + 1))
+        home.home_for += a * (home_goals - home.home_for)
+        home.home_against += a * (away_goals - home.home_against)
+        a = max(self.alpha, 1.0 / (away.away_played + 1))
+        away.away_for += a * (away_goals - away.away_for)
+        away.away_against += a * (home_goals - away.away_against)
+
+        home.home_played += 1
+        away.away_played += 1
+        if home_goals > away_goals:
+            home.home_wins += 1
+            home.form, away.form = (home.form + "W")[-5:], (away.form + "L")[-5:]
+        elif home_goals < away_goals:
+            away.away_wins += 1
+            home.form, away.form = (home.form + "L")[-5:], (away.form + "W")[-5:]
+        else:
+            home.form, away.form = (home.form + "D")[-5:], (away.form + "D")[-5:]
+
+    def replay(self, results):
+        """Rebuild the ratings from stored results, oldest first."""
+        count = 0
+        for result in results:
+            self.update(result)
+            count += 1
+        self.logger.info("Ratings rebuilt from %s results (%d teams)", count, len(self.ratings))
+
+    def stats(self, team_id):
+        """Rating as a teams/statistics-shaped dict, or None until the team has enough results at both venues."""
+        r = self.ratings.get(team_id)
+        if r is None or min(r.home_played, r.away_played) < self.min_matches:
+            return None
+        return {
+            "form": r.form,
+            "fixtures": {
+                "played": {"home": r.home_played, "away": r.away_played},
+                "wins": {"home": r.home_wins, "away": r.away_wins},
+            },
+            "goals": {
+                "for": {"average": {"home": f"{r.home_for:.1f}", "away": f"{r.away_for:.1f}"}},
+                "against": {"average": {"home": f"{r.home_against:.1f}", "away": f"{r.away_against:.1f}"}},
+            },
+        }
@@ -1,19 +1,35 @@
 import telebot
 import logging
 import config
+from message_queue import MessageQueue
 
 class BettingBot:
-    def __init__(self):
-        self.bot = telebot.TeleBot(config.TELEGRAM_TOKEN)
+    def __init__(self, threaded=True):
+        """
+        Args:
+            threaded: Let telebot run handlers in its own thread pool. Webhook
+                mode passes False since it dispatches updates to its own pool.
+        """
+        if config.TELEGRAM_API_URL:
+            # e.g. a local fake Telegram endpoint: "http://127.0.0.1:8081/bot{0}/{1}"
+            telebot.apihelper.API_URL = config.TELEGRAM_API_URL
+        self.bot = telebot.TeleBot(config.TELEGRAM_TOKEN, threaded=threaded)
         self.chat_id = config.TELEGRAM_CHAT_ID
         self.logger = logging.getLogger(__name__)
+        self.outbox = MessageQueue(self._deliver, self.render_bets)
+
+    def _deliver(self, chat_id, text, **kwargs):
+        """Synchronous API call, only used by the outbound queue's sender thread."""
+        self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        self.logger.info("Message sent to Telegram")
 
     def send_message(self, message):
-        try:
-            self.bot.send_message(chat_id=self.chat_id, text=message)
-            self.logger.info("Message sent to Telegram")
-        except Exception as e:
-            self.logger.error(f"Failed to send Telegram message: {e}")
+        """Queue a message for the sender thread (never blocks on the network)."""
+        self.outbox.put_text(self.chat_id, message)
+
+    def send_admin(self, message):
+        """Queue a message for the admin chat (profiling reports, ops notices)."""
+        self.outbox.put_text(config.ADMIN_CHAT_ID, message)
 
     def send_welcome(self):
         self.send_message("✅ Agent Paris Intelligence activé ! Prêt à analyser les matchs.")
@@ -24,45 +40,87 @@ class BettingBot:
             
         msg = "🎯 TOP PARIS DU JOUR\n\n"
         for i, bet in enumerate(bets, 1):
-            msg += f"{i}. {bet['match']}\n"
-            msg += f"   📅 {bet['date']} à {bet['heure']}\n"
-            msg += f"   🎭 {bet['ligue']}\n"
-            msg += f"   🎯 Pari: {bet['pari']}\n"
-            msg += f"   💰 Cote: {bet['cote']}\n"
-            msg += f"   📈 Confiance: {bet['confiance']}%\n"
-            msg += f"   💵 {bet['recommendation']}\n"
-            msg += f"   {bet['raison']}\n\n"
+            msg += f"{i}. {bet.match}\n"
+            msg += f"   📅 {bet.date} à {bet.time}\n"
+            msg += f"   🎭 {bet.league}\n"
+            msg += f"   🎯 Pari: {bet.bet_type}\n"
+            msg += f"   💰 Cote: {bet.odds}\n"
+            msg += f"   📈 Confiance: {bet.confidence}%\n"
+            msg += f"   💵 {bet.recommendation}\n"
+            msg += f"   {bet.reason}\n\n"
         return msg
 
-    def send_bet_with_buttons(self, bet_data, bet_id):
-        """Send a single bet with interactive buttons and premium formatting."""
-        from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-        
-        markup = InlineKeyboardMarkup()
-        markup.row_width = 2
-        markup.add(
-            InlineKeyboardButton("✅ Gagné", callback_data=f"win_{bet_id}"),
-            InlineKeyboardButton("❌ Perdu", callback_data=f"loss_{bet_id}")
-        )
-        
+    def _format_bet(self, bet_data):
         # Create confidence bar (e.g., [🟩🟩🟩🟩⬜])
-        conf_score = bet_data['confiance']
+        conf_score = bet_data.confidence
         blocks = int(conf_score / 20)
         bar = "🟩" * blocks + "⬜" * (5 - blocks)
         
         # Format Reasons as bullet points
-        reasons_list = bet_data['raison'].split(' | ')
+        reasons_list = bet_data.reason.split(' | ')
         formatted_reasons = "\n".join([f"• {r}" for r in reasons_list])
         
-        msg = f"🚨 **{bet_data['pari']}** @ **{bet_data['cote']}**\n"
-        msg += f"⚽️ {bet_data['match']}\n"
+        msg = f"🚨 **{bet_data.bet_type}** @ **{bet_data.odds}**\n"
+        msg += f"⚽️ {bet_data.match}\n"
         msg += f"🛡 Confiance: `{bar}` {conf_score}%\n"
-        msg += f"💵 **{bet_data['recommendation']}**\n\n"
+        msg += f"💵 **{bet_data.recommendation}**\n\n"
         msg += f"{formatted_reasons}"
+        return msg
+
+    def render_bets(self, bets):
+        """
+        Render one or more (bet_data, bet_id) into a single message.
+
+        Bets sharing a kickoff window are merged, each with its own pair of
+        result buttons labelled by position.
+        """
+        from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
         
-        try:
-            self.bot.send_message(chat_id=self.chat_id, text=msg, reply_markup=markup, parse_mode="Markdown")
-            self.logger.info(f"Sent interactive bet {bet_id}")
-        
-        except Exception as e:
-            self.logger.error(f"Failed to send interactive message: {e}")
+        markup = InlineKeyboardMarkup()
+        markup.row_width = 2
+
+        if len(bets) == 1:
+            bet_data, bet_id = bets[0]
+            markup.add(
+                InlineKeyboardButton("✅ Gagné", callback_data=f"win_{bet_id}"),
+                InlineKeyboardButton("❌ Perdu", callback_data=f"loss_{bet_id}")
+            )
+            return self._format_bet(bet_data), {"reply_markup": markup, "parse_mode": "Markdown"}
+
+        first = bets[0][0]
+        blocks = [f"⏰ {len(bets)} PARIS - Coup d'envoi {first.date} vers {first.time}"]
+        for i, (bet_data, bet_id) in enumerate(bets, 1):
+            blocks.append(f"#{i} {self._format_bet(bet_data)}")
+            markup.add(
+                InlineKeyboardButton(f"✅ #{i}", callback_data=f"win_{bet_id}"),
+                InlineKeyboardButton(f"❌ #{i}", callback_data=f"loss_{bet_id}")
+            )
+        return "\n\n".join(blocks), {"reply_markup": markup, "parse_mode": "Markdown"}
+
+    def send_bet_with_buttons(self, bet_data, bet_id):
+        """Queue a single bet with interactive buttons and premium formatting."""
+        self.outbox.put_bet(self.chat_id, bet_data, bet_id)
+        self.logger.info("Queued interactive bet %s", bet_id)
+
+    def settle_markup(self, markup, bet_id):
+        """
+        Remove a settled bet's buttons from a (possibly merged) message.
+
+        Returns:
+            (label, remaining_markup): label is "#n" for merged messages (else
+            None), remaining_markup is None once no buttons are left
+        """
+        from telebot.types import InlineKeyboardMarkup
+
+        if markup is None:
+            return None, None
+
+        label = None
+        remaining = InlineKeyboardMarkup()
+        for row in markup.keyboard:
+            if any(btn.callback_data in (f"win_{bet_id}", f"loss_{bet_id}") for btn in row):
+                text = row[0].text.split(" ", 1)[-1]
+                label = text if text.startswith("#") else None
+                continue
+            remaining.keyboard.append(row)
+        return label, (remaining if remaining.keyboard else None)
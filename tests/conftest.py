@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# config refuses to load without these; tests never reach the real services
+os.environ.setdefault("TELEGRAM_TOKEN", "123456:test-token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "1")
+os.environ.setdefault("API_KEY", "test-key")
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "bot.log"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    """BetTracker on a fresh SQLite file."""
+    from bet_tracker import BetTracker
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    return BetTracker()
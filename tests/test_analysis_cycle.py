@@ -0,0 +1,46 @@
+import pytest
+
+import config
+from analysis_cycle import AnalysisCycle
+from analyzer import BetAnalyzer
+from benchmarks.synthetic import SyntheticAPI, SyntheticData
+from kelly_criterion import KellyCriterion
+
+@pytest.fixture
+def data(monkeypatch):
+    data = SyntheticData(leagues=2, fixtures_per_league=6)
+    monkeypatch.setattr(config, "LEAGUES", data.leagues())
+    monkeypatch.setattr(config, "TOP_BETS", 100)
+    return data
+
+def pending_stakes(tracker):
+    return {row["bet_key"]: row["bet_data"].stake for row in tracker.get_pending_bets()}
+
+def test_reused_bets_follow_the_bankroll(data, tracker):
+    api, analyzer = SyntheticAPI(data), BetAnalyzer()
+    kelly = KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
+    memo = {}
+
+    AnalysisCycle(api, analyzer, tracker, kelly, memo).run()
+    before = pending_stakes(tracker)
+    assert before
+
+    kelly.update_bankroll(config.BANKROLL * 2)
+    cycle = AnalysisCycle(api, analyzer, tracker, kelly, memo)
+    cycle.run()
+
+    assert cycle._reused == len(memo)  # Same payloads: nothing recomputed
+    after = pending_stakes(tracker)
+    assert after.keys() == before.keys()
+    assert all(after[key] > before[key] for key in before if before[key])
+
+def test_unchanged_bankroll_leaves_stored_bets_alone(data, tracker):
+    api, analyzer = SyntheticAPI(data), BetAnalyzer()
+    kelly = KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
+    memo = {}
+
+    AnalysisCycle(api, analyzer, tracker, kelly, memo).run()
+    fingerprints = {key: bet.fingerprint for key, (_, bet) in memo.items() if bet}
+    AnalysisCycle(api, analyzer, tracker, kelly, memo).run()
+
+    assert fingerprints and {key: bet.fingerprint for key, (_, bet) in memo.items() if bet} == fingerprints
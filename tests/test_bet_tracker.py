@@ -0,0 +1,95 @@
+import csv
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from bet_tracker import BetTracker
+
+def make_legacy_db(path):
+    """bets.db as left by the versions that still had odds_history."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE odds_history (
+            match_id TEXT PRIMARY KEY, opening_home_odd REAL, opening_away_odd REAL,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE odds_history_archive (
+            match_id TEXT PRIMARY KEY, opening_home_odd REAL, opening_away_odd REAL, last_updated TIMESTAMP
+        );
+        INSERT INTO odds_history VALUES ('m1', 2.1, 3.4, '2026-10-18 10:00:00'), ('m2', 1.8, 0, '2026-10-18 11:00:00');
+        INSERT INTO odds_history_archive VALUES ('old', 2.5, 2.7, '2026-01-01 10:00:00');
+    """)
+    conn.commit()
+    conn.close()
+
+def test_odds_history_openings_are_migrated_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    make_legacy_db("bets.db")
+
+    # Workers booting together: one migrates, the others find the table gone
+    errors = []
+    def boot():
+        try:
+            BetTracker()
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=boot) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+    conn = sqlite3.connect("bets.db")
+    openings = conn.execute("SELECT match_id, market_id, selection, odd FROM opening_odds ORDER BY 1, 3").fetchall()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    archived = conn.execute("SELECT match_id FROM odds_history_archive").fetchall()
+    conn.close()
+
+    assert openings == [("m1", 1, "Away", 3.4), ("m1", 1, "Home", 2.1), ("m2", 1, "Home", 1.8)]
+    assert "odds_history" not in tables
+    assert archived == [("old",)]  # Rows archived by the retention job are kept
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+def test_export_opening_odds_round_trip(tracker, tmp_path):
+    tracker.check_dropping_odds_bulk({"m1": {(1, "Home"): 2.1, (5, "Over 2.5"): 1.9}})
+
+    assert tracker.export_table("opening_odds", str(tmp_path / "open.csv")) == 2
+    header, *rows = read_csv(tmp_path / "open.csv")
+    assert header == ["match_id", "market_id", "selection", "odd", "created_at"]
+    assert sorted((r[0], int(r[1]), r[2], float(r[3])) for r in rows) == [("m1", 1, "Home", 2.1), ("m1", 5, "Over 2.5", 1.9)]
+
+    pq = pytest.importorskip("pyarrow.parquet")  # Optional dependency
+    assert tracker.export_table("opening_odds", str(tmp_path / "open.parquet"), fmt="parquet") == 2
+    table = pq.read_table(tmp_path / "open.parquet")
+    assert sorted(zip(table["selection"].to_pylist(), table["odd"].to_pylist())) == [("Home", 2.1), ("Over 2.5", 1.9)]
+
+def test_export_odds_ticks_round_trip_with_date_bounds(tracker, tmp_path):
+    now = int(time.time())
+    tracker.record_odds_ticks([(10, 1, "Home", 8, 2.05)], ts=now - 7200)
+    tracker.record_odds_ticks([(10, 1, "Home", 8, 1.95), (10, 1, "Away", 8, 3.8)], ts=now - 60)
+    since = datetime.fromtimestamp(now - 3600).isoformat()
+
+    assert tracker.export_table("odds_ticks", str(tmp_path / "ticks.csv"), since=since) == 2
+    header, *rows = read_csv(tmp_path / "ticks.csv")
+    assert header == ["fixture_id", "market_id", "selection_id", "bookmaker_id", "ts", "price"]
+    assert sorted(int(r[5]) for r in rows) == [1950, 3800]
+    assert {int(r[4]) for r in rows} == {now - 60}
+
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    assert tracker.export_table("odds_ticks", str(tmp_path / "ticks.parquet"), fmt="parquet") == 3
+    table = pq.read_table(tmp_path / "ticks.parquet")
+    assert table.schema.field("price").type == pa.int64()
+    assert sorted(table["price"].to_pylist()) == [1950, 2050, 3800]
+
+def test_empty_export_keeps_the_header(tracker, tmp_path):
+    assert tracker.export_table("odds_ticks", str(tmp_path / "empty.csv")) == 0
+    assert read_csv(tmp_path / "empty.csv") == [["fixture_id", "market_id", "selection_id", "bookmaker_id", "ts", "price"]]
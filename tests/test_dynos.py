@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(code_or_args, tmp_path, **env):
+    args = code_or_args if isinstance(code_or_args, list) else ["-c", code_or_args]
+    environ = {k: v for k, v in os.environ.items() if k not in ("DYNO", "WEBHOOK_URL", "WORKER_INDEX")}
+    environ.update(env, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, *args], cwd=tmp_path, env=environ, capture_output=True, text=True, timeout=60)
+
+@pytest.mark.parametrize("dyno, webhook, index", [
+    ("worker.1", None, 0),
+    ("worker.3", None, 2),
+    ("web.1", "https://app.example", 0),
+    ("worker.1", "https://app.example", 1),
+    ("worker.2", "https://app.example", 2),
+])
+def test_worker_index_from_dyno_name(tmp_path, dyno, webhook, index):
+    env = {"DYNO": dyno}
+    if webhook:
+        env["WEBHOOK_URL"] = webhook
+    result = run("import config; print(config.WORKER_INDEX)", tmp_path, **env)
+    assert result.stdout.strip() == str(index), result.stderr
+
+def test_web_dyno_exits_in_polling_mode(tmp_path):
+    result = run([os.path.join(ROOT, "main.py")], tmp_path, DYNO="web.1")
+    assert result.returncode == 0
+    assert "web dyno started without WEBHOOK_URL" in result.stderr
+    assert not os.path.exists(tmp_path / "bets.db")  # Left before touching the database
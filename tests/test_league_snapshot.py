@@ -0,0 +1,43 @@
+from analyzer import BetAnalyzer
+from bet_record import Bet
+from league_snapshot import DEFAULT_RANK, LeagueSnapshot, MappedSnapshot, SnapshotStore
+
+TOP_SCORERS = [
+    {"player": {"id": 278, "name": "K. Mbappé"}, "statistics": [{"team": {"id": 85, "name": "PSG"}, "goals": {"total": 9}}]},
+    {"player": {"id": 483, "name": "O. Dembélé"}, "statistics": [{"team": {"id": 85, "name": "PSG"}, "goals": {"total": 6}}]},
+    {"player": {"id": 1143, "name": "A. Lacazette"}, "statistics": [{"team": {"id": 80, "name": "Lyon"}, "goals": {"total": 7}}]},
+]
+
+def make_snapshot():
+    stats = {85: {"goals": {"for": {"average": {"home": "2.4"}}}}, 80: {"goals": {"for": {"average": {"away": "1.1"}}}}}
+    return LeagueSnapshot(61, "Ligue 1", {85: 1, 80: 6, 81: 2}, TOP_SCORERS, stats)
+
+def test_other_worker_reads_the_published_file(tmp_path):
+    snapshot = make_snapshot()
+    SnapshotStore(str(tmp_path)).publish(snapshot)
+
+    mapped = SnapshotStore(str(tmp_path)).get(61)  # Another process: nothing in memory
+
+    assert isinstance(mapped, MappedSnapshot)
+    assert mapped.league_name == "Ligue 1"
+    assert [mapped.rank(t) for t in (85, 80, 81, 999)] == [1, 6, 2, DEFAULT_RANK]
+    assert mapped.stats(85) == snapshot.stats(85)
+    assert mapped.stats(81) is None
+    assert mapped.scorer("Mbappé")["player"]["id"] == 278
+    assert mapped.scorers_fp == snapshot.scorers_fp
+
+def test_missing_league_has_no_snapshot(tmp_path):
+    assert SnapshotStore(str(tmp_path)).get(61) is None
+
+def lineup(*names):
+    return [{"player": {"name": name}} for name in names]
+
+def test_win_bet_flags_missing_top_scorer():
+    bet = Bet("PSG vs Lyon", "2026-10-19", "21:00", "Ligue 1", "Victoire PSG", 1.9, 72, "r")
+    analyzer = BetAnalyzer()
+
+    valid, reason = analyzer.validate_lineup(bet, lineup("O. Dembélé"), lineup("A. Lacazette"), TOP_SCORERS)
+    assert valid and reason.endswith("⚠️ Top buteur absent: K. Mbappé")
+
+    valid, reason = analyzer.validate_lineup(bet, lineup("K. Mbappé"), lineup("A. Lacazette"), TOP_SCORERS)
+    assert (valid, reason) == (True, "✅ Compo officielle disponible")
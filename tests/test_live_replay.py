@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import config
+from analyzer import BetAnalyzer
+from inplay_model import InPlayModel, time_left
+from live_monitor import LiveMonitor, ReplayFeed
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FEED = os.path.join(FIXTURES, "live_feed.jsonl")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def replay():
+    feed = ReplayFeed(FEED)
+    sent = []
+    monitor = LiveMonitor(feed, InPlayModel(BetAnalyzer()), {"Ligue 1": 61}, on_value=sent.append, sleep=lambda seconds: None)
+    monitor.run()
+    return monitor, sent
+
+def test_replay_sends_the_value_bet_once():
+    monitor, sent = replay()
+
+    assert [bet.bet_key for bet in sent] == ["1350201:1:Home"]
+    bet = sent[0]
+    assert (bet.bet_type, bet.odds, bet.confidence) == ("Victoire Paris Saint Germain", 1.4, 78)
+    assert bet.reason.startswith("⚡ En direct 62' (1-0)")
+
+    assert monitor.polls == 5
+    assert monitor.skipped == 2  # Same minute, score and prices as the previous poll
+    assert list(monitor.states) == [1350202]  # Finished fixtures are forgotten
+
+def test_no_near_certain_alert_in_added_time():
+    # Marseille lead 2-0 at 90+3 and Home is offered at 1.08
+    _, sent = replay()
+    assert not [bet for bet in sent if bet.fixture_id == 1350202]
+
+def test_added_time_keeps_goals_possible():
+    model = InPlayModel(BetAnalyzer())
+    assert time_left(90, 3) == config.LIVE_STOPPAGE_MINUTES - 3
+    assert time_left(90, 12) == config.LIVE_MIN_MINUTES_LEFT
+    assert time_left(0) == 90 + config.LIVE_STOPPAGE_MINUTES
+
+    probs = model.update(1, 85, 80, 90, 0, 0, extra=8)
+    assert 0 < probs[(5, "Over 0.5")] < 1
+
+def test_replay_cli_runs_without_credentials(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k not in ("TELEGRAM_TOKEN", "TELEGRAM_CHAT_ID", "API_KEY")}
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "live_monitor.py"), "--replay", FEED],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Live value: Bet('Victoire Paris Saint Germain' @ 1.4" in result.stderr
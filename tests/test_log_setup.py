@@ -0,0 +1,46 @@
+import json
+import logging
+import queue
+import time
+from datetime import datetime
+
+from log_setup import LazyQueueHandler, RotatingLogHandler
+
+def make_record(msg, *args):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+def test_mutable_args_are_formatted_when_logged():
+    log_queue = queue.Queue()
+    handler = LazyQueueHandler(log_queue)
+    pending = [1, 2]
+
+    handler.emit(make_record("pending %s", pending))
+    pending.append(3)
+
+    assert log_queue.get_nowait().getMessage() == "pending [1, 2]"
+
+def test_immutable_args_are_left_to_the_writer():
+    log_queue = queue.Queue()
+    record = make_record("%d bets for %s", 3, "PSG")
+    LazyQueueHandler(log_queue).emit(record)
+
+    queued = log_queue.get_nowait()
+    assert queued is record and queued.args == (3, "PSG")
+
+def test_rotation_counts_from_the_first_record_of_the_file(tmp_path):
+    path = tmp_path / "bot.log"
+    day = 24 * 3600
+    first = datetime.fromtimestamp(time.time() - day - 60).isoformat(timespec="milliseconds")
+    path.write_text(json.dumps({"ts": first, "message": "boot"}) + "\n", encoding="utf-8")
+
+    # Restarted a day after the file was started: rotate on the next record
+    handler = RotatingLogHandler(str(path), 10 ** 6, 2, day)
+    assert handler.shouldRollover(make_record("hello"))
+    handler.doRollover()
+    assert not handler.shouldRollover(make_record("hello"))
+    handler.close()
+
+def test_new_file_rotates_after_a_full_period(tmp_path):
+    handler = RotatingLogHandler(str(tmp_path / "bot.log"), 10 ** 6, 2, 3600)
+    assert 3590 < handler.rollover_at - time.time() <= 3600
+    handler.close()
@@ -0,0 +1,35 @@
+import config
+from bet_record import Bet
+from message_queue import MessageQueue
+from telegram_bot import BettingBot
+
+def make_bet(i):
+    reason = f"📊 Forme {i}: " + "victoire nette à domicile, attaque en forme, " * 8
+    return Bet(f"Équipe {i} vs Équipe {i + 100}", "2026-10-19", "21:00", "Ligue 1", f"Victoire Équipe {i}", 1.9, 70, reason)
+
+def test_merged_window_is_split_at_the_message_limit():
+    sent = []
+    outbox = MessageQueue(lambda chat_id, text, **kwargs: sent.append((text, kwargs)), BettingBot(threaded=False).render_bets)
+    outbox.linger = 0.5
+    outbox.chat_interval = 0
+
+    for i in range(1, 21):
+        outbox.put_bet("1", make_bet(i), i)
+    assert outbox.flush(timeout=10)
+
+    assert len(sent) > 1
+    assert all(len(text) <= config.TELEGRAM_MAX_MESSAGE_LENGTH for text, _ in sent)
+    # Every bet is sent once, with its own result buttons
+    buttons = [b.callback_data for _, kwargs in sent for row in kwargs["reply_markup"].keyboard for b in row]
+    assert sorted(buttons) == sorted([f"win_{i}" for i in range(1, 21)] + [f"loss_{i}" for i in range(1, 21)])
+
+def test_small_window_stays_one_message():
+    sent = []
+    outbox = MessageQueue(lambda chat_id, text, **kwargs: sent.append(text), BettingBot(threaded=False).render_bets)
+    outbox.linger = 0.5
+
+    for i in range(1, 4):
+        outbox.put_bet("1", make_bet(i), i)
+    assert outbox.flush(timeout=10)
+
+    assert len(sent) == 1 and sent[0].startswith("⏰ 3 PARIS")
@@ -0,0 +1,74 @@
+import os
+import threading
+import uuid
+
+import pytest
+
+from bet_record import Bet
+
+BETS = 40
+WORKERS = 4
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def leases_tracker(request, tmp_path, monkeypatch):
+    """BetTracker on SQLite, and on Postgres when TEST_DATABASE_URL points at a throwaway database."""
+    from bet_tracker import BetTracker
+
+    monkeypatch.chdir(tmp_path)
+    if request.param == "postgres":
+        url = os.getenv("TEST_DATABASE_URL")
+        if not url:
+            pytest.skip("TEST_DATABASE_URL not set")
+        monkeypatch.setenv("DATABASE_URL", url)
+    else:
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    tracker = BetTracker()
+    conn = tracker._get_connection()
+    conn.cursor().execute("DELETE FROM pending_bets")
+    conn.commit()
+    conn.close()
+    return tracker
+
+def add_bets(tracker):
+    for i in range(BETS):
+        bet = Bet(f"Home {i} vs Away {i}", "2026-10-19", "21:00", "Ligue 1", "Victoire Home", 1.9, 70, "r")
+        tracker.add_pending_bet(bet, 1000 + i, f"m{i}", f"{1000 + i}:1:Home", "fp")
+
+def test_concurrent_claims_never_share_a_row(leases_tracker):
+    add_bets(leases_tracker)
+    claimed = {n: [] for n in range(WORKERS)}
+    start = threading.Barrier(WORKERS)
+    errors = []
+
+    def worker(n):
+        try:
+            start.wait()
+            while True:
+                rows = leases_tracker.claim_pending_bets(f"worker-{n}:{uuid.uuid4().hex}", 300, limit=3)
+                if not rows:
+                    return
+                claimed[n] += [row["id"] for row in rows]
+        except Exception as e:  # Surfaced in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(WORKERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    every_claim = [bet_id for ids in claimed.values() for bet_id in ids]
+    assert len(every_claim) == len(set(every_claim)) == BETS
+
+def test_released_and_expired_leases_can_be_claimed_again(leases_tracker):
+    add_bets(leases_tracker)
+    first = leases_tracker.claim_pending_bets("a", 300, limit=2)
+    expired = leases_tracker.claim_pending_bets("b", -1, limit=2)
+    leases_tracker.release_pending_bet(first[0]["id"], "a")
+
+    again = {row["id"] for row in leases_tracker.claim_pending_bets("c", 300)}
+    assert first[0]["id"] in again
+    assert first[1]["id"] not in again
+    assert {row["id"] for row in expired} <= again
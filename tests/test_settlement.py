@@ -0,0 +1,139 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import config
+from api_client import FootballAPI
+from kelly_criterion import KellyCriterion
+from settlement import Settlement, settle_market
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+FT, AET, CANC, PST, AWD = 1350101, 1350102, 1350103, 1350104, 1350105
+
+def load_payload():
+    with open(os.path.join(FIXTURES, "fixtures_by_ids.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def recorded(fixture_id):
+    return next(f for f in load_payload()["response"] if f["fixture"]["id"] == fixture_id)
+
+class RecordedAPI(FootballAPI):
+    """FootballAPI answering fixtures?ids= from the recorded payload."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def _get(self, endpoint, params=None):
+        assert endpoint == "fixtures"
+        self.requests.append(params["ids"])
+        ids = {int(fid) for fid in params["ids"].split("-")}
+        return [f for f in load_payload()["response"] if f["fixture"]["id"] in ids]
+
+class FakeTracker:
+    def __init__(self, bets):
+        self.bets = bets
+        self.results = {}
+
+    def get_unsettled_bets(self):
+        return [bet for bet in self.bets if bet["id"] not in self.results]
+
+    def update_results(self, settlements):
+        updated = set()
+        for bet_id, result, profit in settlements:
+            if bet_id not in self.results:
+                self.results[bet_id] = (result, profit)
+                updated.add(bet_id)
+        return updated
+
+    def get_realized_profit(self):
+        return sum(profit for _, profit in self.results.values())
+
+def make_bet(bet_id, fixture_id, market_id, selection, odds=2.0, stake=10):
+    return {
+        "id": bet_id, "fixture_id": fixture_id, "bet_key": f"{fixture_id}:{market_id}:{selection}",
+        "date": "2026-10-19", "time": "21:00", "match": "Match", "bet_type": selection, "odds": odds, "stake": stake,
+    }
+
+KICKOFF = datetime(2026, 10, 19, 21, 0).timestamp()
+
+@pytest.mark.parametrize("market_id, selection, expected", [
+    (1, "Home", "won"),
+    (1, "Draw", "lost"),
+    (5, "Over 2.5", "won"),
+    (5, "Under 3.5", "won"),
+    (8, "Yes", "won"),
+    (4, "K. Mbappé", "won"),
+    (4, "Mbappé", "won"),
+    (4, "Kylian Mbappe", "won"),    # Bookmaker spelling of the event's "K. Mbappé"
+    (4, "A. Lacazette", "won"),     # Penalty in stoppage time (90+4)
+    (4, "N. Tagliafico", "lost"),   # Own goal
+    (4, "O. Dembélé", "lost"),      # Only a card
+])
+def test_full_time(market_id, selection, expected):
+    assert settle_market(market_id, selection, recorded(FT)) == expected
+
+@pytest.mark.parametrize("selection", [
+    "Erling Haaland",   # Not in this fixture
+    "E. Mbappé",        # Same surname, other player
+    "",
+])
+def test_unknown_scorer_is_left_unsettled(selection):
+    assert settle_market(4, selection, recorded(FT)) is None
+
+def test_scorer_found_in_the_lineups():
+    fixture = dict(recorded(FT), lineups=[
+        {"team": {"id": 85}, "startXI": [{"player": {"id": 1100, "name": "B. Barcola"}}], "substitutes": []},
+    ])
+    assert settle_market(4, "Bradley Barcola", fixture) == "lost"  # Played, did not score
+
+@pytest.mark.parametrize("market_id, selection, expected", [
+    (1, "Draw", "won"),              # 1-1 after 90 minutes, 3-2 after extra time
+    (1, "Home", "lost"),
+    (5, "Over 2.5", "lost"),
+    (8, "Yes", "won"),
+    (4, "M. Greenwood", "won"),
+    (4, "P. Aubameyang", "lost"),    # Scored in extra time only
+])
+def test_after_extra_time_uses_the_90_minute_score(market_id, selection, expected):
+    assert settle_market(market_id, selection, recorded(AET)) == expected
+
+@pytest.mark.parametrize("fixture_id, expected", [(CANC, "void"), (AWD, "void"), (PST, None)])
+def test_not_played(fixture_id, expected):
+    assert settle_market(1, "Home", recorded(fixture_id)) == expected
+
+def test_run_settles_every_due_bet_in_one_request():
+    tracker = FakeTracker([
+        make_bet(1, FT, 1, "Home", odds=1.8),
+        make_bet(2, FT, 4, "N. Tagliafico"),
+        make_bet(3, AET, 1, "Draw", odds=3.4),
+        make_bet(4, CANC, 8, "Yes"),
+        make_bet(5, PST, 1, "Home"),
+        make_bet(6, AWD, 1, "Home"),
+    ])
+    api = RecordedAPI()
+    kelly = KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
+
+    settled = Settlement(api, tracker, kelly).run(now=KICKOFF + 3 * 3600)
+
+    assert api.requests == [f"{FT}-{AET}-{CANC}-{PST}-{AWD}"]
+    assert {bet["id"]: (result, profit) for bet, result, profit in settled} == {
+        1: ("won", 8.0), 2: ("lost", -10), 3: ("won", 24.0), 4: ("void", 0), 6: ("void", 0),
+    }
+    assert kelly.bankroll == config.BANKROLL + 22.0
+
+    # The postponed match is retried until it is played or POSTPONED_VOID_HOURS have passed
+    assert 5 not in tracker.results
+    late = KICKOFF + config.POSTPONED_VOID_HOURS * 3600
+    settled = Settlement(api, tracker, kelly).run(now=late)
+    assert [(bet["id"], result) for bet, result, _ in settled] == [(5, "void")]
+
+def test_run_skips_bets_before_the_settlement_delay():
+    tracker = FakeTracker([make_bet(1, FT, 1, "Home")])
+    api = RecordedAPI()
+
+    assert Settlement(api, tracker).run(now=KICKOFF + 60) == []
+    assert api.requests == []
@@ -0,0 +1,44 @@
+from analyzer import BetAnalyzer
+from team_ratings import TeamRatings
+
+def low_scoring_season(ratings, team_id=1, games=4):
+    # 1-0, 0-0, 0-1... at both venues, against different opponents
+    scores = [(1, 0), (0, 0), (0, 1), (1, 1)]
+    for i in range(games):
+        home_goals, away_goals = scores[i % len(scores)]
+        ratings.update((i, 61, "2026-09-01", team_id, 100 + i, home_goals, away_goals))
+        ratings.update((50 + i, 61, "2026-09-02", 200 + i, team_id, away_goals, home_goals))
+
+def test_low_scoring_team_is_not_rated_an_open_match():
+    ratings = TeamRatings()
+    low_scoring_season(ratings, team_id=1)
+    low_scoring_season(ratings, team_id=2)
+    home, away = ratings.stats(1), ratings.stats(2)
+
+    analyzer = BetAnalyzer()
+    # One goal a game on average, whatever the priors (2.7 together) say
+    assert abs(sum(analyzer.expected_goals(home, away)) - 1.0) < 0.1
+    assert analyzer.analyze_over15(home, away, 1.35) is None
+
+def test_no_rating_from_the_other_venue_alone():
+    ratings = TeamRatings()
+    for i in range(6):
+        ratings.update((i, 61, "2026-09-01", 100 + i, 1, 0, 0))  # Team 1 only played away
+        ratings.update((10 + i, 61, "2026-09-01", 2, 200 + i, 0, 0))  # Team 2 only at home
+    # Hosting 2, team 1 would be rated on its untouched home prior
+    assert ratings.stats(1) is None and ratings.stats(2) is None
+
+def test_first_result_replaces_the_prior():
+    ratings = TeamRatings()
+    ratings.update((1, 61, "2026-09-01", 1, 2, 0, 0))
+    assert ratings.ratings[1].home_for == 0 and ratings.ratings[2].away_against == 0
+
+def test_stats_wait_for_results_at_both_venues():
+    ratings = TeamRatings(min_matches=3)
+    for i in range(6):
+        ratings.update((i, 61, "2026-09-01", 1, 100 + i, 2, 1))
+    assert ratings.stats(1) is None  # Six home games, the away averages would still be the prior
+
+    for i in range(3):
+        ratings.update((10 + i, 61, "2026-09-02", 200 + i, 1, 1, 1))
+    assert ratings.stats(1)["fixtures"]["played"] == {"home": 6, "away": 3}
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+
+import config
+from bet_record import Bet
+from kelly_criterion import KellyCriterion
+from main import register_handlers
+from telegram_bot import BettingBot
+from webhook_server import WebhookServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FakeTelegram:
+    """Local stand-in for the Bot API: records every call and answers ok."""
+
+    def __init__(self):
+        self.calls = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                url = urlparse(self.path)
+                method = url.path.rsplit("/", 1)[-1]
+                params = dict(parse_qsl(url.query))
+                length = int(self.headers.get("Content-Length", 0))
+                if length:
+                    params.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+                fake.calls.append((method, params))
+
+                result = True
+                if method.startswith(("edit", "send")):
+                    result = {"message_id": 77, "date": 0, "chat": {"id": 1, "type": "private"}, "text": params.get("text", "")}
+                body = json.dumps({"ok": True, "result": result}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/bot{{0}}/{{1}}"
+
+    def wait_for(self, method, count=1, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            found = [params for name, params in self.calls if name == method]
+            if len(found) >= count:
+                return found
+            time.sleep(0.02)
+        raise AssertionError(f"{method} not called {count} time(s): {self.calls}")
+
+@pytest.fixture
+def telegram(monkeypatch):
+    import telebot
+
+    fake = FakeTelegram()
+    monkeypatch.setattr(config, "TELEGRAM_API_URL", fake.api_url)
+    monkeypatch.setattr(telebot.apihelper, "API_URL", fake.api_url)
+    yield fake
+    fake.httpd.shutdown()
+
+@pytest.fixture
+def kelly():
+    return KellyCriterion(config.BANKROLL, config.KELLY_FRACTION)
+
+@pytest.fixture
+def server(telegram, tracker, kelly):
+    bot = BettingBot(threaded=False)
+    register_handlers(bot, tracker, kelly=kelly)
+    server = WebhookServer(bot.bot, host="127.0.0.1", port=0, path="/telegram", secret="s3cret", workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+def post_update(server, payload, secret="s3cret"):
+    host, port = server.address
+    request = urllib.request.Request(
+        f"http://{host}:{port}/telegram", data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status
+
+def load_update():
+    with open(os.path.join(FIXTURES, "callback_loss_update.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_callback_settles_bet_and_edits_message(server, telegram, tracker, kelly):
+    bet_id = tracker.record_bet(Bet("PSG vs Lyon", "2026-10-19", "21:00", "Ligue 1", "Victoire PSG", 1.9, 72, "r"), 10)
+    assert bet_id == 1
+
+    assert post_update(server, load_update()) == 200
+
+    answer = telegram.wait_for("answerCallbackQuery")[0]
+    assert answer["callback_query_id"] == "4382957165213429173"
+    assert "PERDU" in answer["text"]
+
+    edit = telegram.wait_for("editMessageText")[0]
+    assert edit["chat_id"] == "1" and edit["message_id"] == "77"
+    assert edit["text"].endswith("❌ RÉSULTAT: PERDU")
+    assert "reply_markup" not in edit  # The only bet of the message is settled: buttons removed
+
+    assert tracker.get_breakdown()[0]["profit"] == -10
+    assert kelly.bankroll == config.BANKROLL - 10  # Stakes follow manual results too
+
+def test_redelivered_callback_is_answered_without_settling_twice(server, telegram, tracker):
+    tracker.record_bet(Bet("PSG vs Lyon", "2026-10-19", "21:00", "Ligue 1", "Victoire PSG", 1.9, 72, "r"), 10)
+
+    post_update(server, load_update())
+    telegram.wait_for("editMessageText")
+    post_update(server, load_update())
+
+    answers = telegram.wait_for("answerCallbackQuery", count=2)
+    assert answers[1]["text"] == "ℹ️ Pari déjà réglé"
+    assert len([name for name, _ in telegram.calls if name == "editMessageText"]) == 1
+
+def test_rejects_wrong_secret(server, telegram):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post_update(server, load_update(), secret="wrong")
+    assert error.value.code == 403
+    assert telegram.calls == []
@@ -0,0 +1,98 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from telebot.types import Update
+
+import config
+
+class WebhookServer:
+    """
+    Local HTTP endpoint receiving Telegram webhook updates.
+
+    Each update is acknowledged immediately and handed to a bounded worker
+    pool, so a slow callback (DB write, message edit, GIF upload) never holds
+    up the next one. When the pool is saturated the server answers 503 and
+    Telegram redelivers the update later.
+    """
+
+    def __init__(self, bot, host=None, port=None, path=None, secret=None, workers=None, max_pending=None):
+        """
+        Args:
+            bot: telebot.TeleBot with its handlers registered (threaded=False)
+        """
+        self.bot = bot
+        self.host = host or config.WEBHOOK_HOST
+        self.port = port if port is not None else config.WEBHOOK_PORT
+        self.path = path or config.WEBHOOK_PATH
+        self.secret = secret if secret is not None else config.WEBHOOK_SECRET
+        self.logger = logging.getLogger(__name__)
+
+        workers = workers or config.WEBHOOK_WORKERS
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook")
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 4)
+        self.httpd = HTTPServer((self.host, self.port), self._make_handler())
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != server.path:
+                    self.send_error(404)
+                    return
+                if server.secret and self.headers.get("X-Telegram-Bot-Api-Secret-Token") != server.secret:
+                    self.send_error(403)
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                try:
+                    update = Update.de_json(json.loads(body))
+                except Exception as e:
+                    server.logger.error("Invalid webhook payload: %s", e)
+                    self.send_error(400)
+                    return
+
+                if not server.slots.acquire(blocking=False):
+                    self.send_error(503)
+                    return
+                server.pool.submit(server._process, update)
+
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        return Handler
+
+    def _process(self, update):
+        try:
+            self.bot.process_new_updates([update])
+        except Exception as e:
+            self.logger.error("Webhook update error: %s", e)
+        finally:
+            self.slots.release()
+
+    def register(self, url):
+        """Point Telegram at this server's public URL."""
+        self.bot.remove_webhook()
+        self.bot.set_webhook(url=url.rstrip("/") + self.path, secret_token=self.secret or None)
+        self.logger.info("Webhook registered at %s", url)
+
+    def serve_forever(self):
+        self.logger.info("Webhook server listening on %s:%s%s", self.host, self.port, self.path)
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True)